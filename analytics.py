@@ -0,0 +1,179 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from computerplayer import boardMasks, positionKey, solvePosition
+from gameboard import BitBoardclass, Boardclass, boardSymmetries
+from gamelog import readGames
+from renderer import NullRenderer
+
+# The fields counted for each move played from a position, from the side of the player that made it.
+MOVE_FIELDS = ("wins", "ties", "losses", "blunders")
+
+
+def analyzeGames(records: list) -> dict:
+    """A function to count the positions and moves of a list of games.
+
+    Each game is played again on a gameboard object without drawing it. Before each move, the position is looked up
+    under its canonical key, and the move is counted under the matching space of the key along with the result of the
+    game for the player that made it. On 3x3 boards, a move is also counted as a blunder when it makes the result of
+    perfect play worse for the player that made it.
+
+    Args:
+        records: the GameRecords to count
+
+    Returns:
+        a dictionary mapping (size, win_length, key) to a list of the number of times the position was reached and a
+        dictionary mapping each space of the key moved in to a list of its wins, ties, losses and blunders.
+    """
+    positions = {}
+    boards = {}
+    symmetries = {}
+
+    for record in records:
+        board = boards.get((record.size, record.win_length))
+        if board is None:
+            if (record.size, record.win_length) == (3, 3):
+                board = BitBoardclass(renderer=NullRenderer())
+            else:
+                board = Boardclass(size=record.size, win_length=record.win_length, renderer=NullRenderer())
+            boards[(record.size, record.win_length)] = board
+            symmetries[record.size] = boardSymmetries(record.size)
+        board.clearGameBoard()
+
+        for turn, space in enumerate(record.moves):
+            symbol, other_symbol = ("X", "O") if turn % 2 == 0 else ("O", "X")
+            key, symmetry = positionKey(board, symbol, other_symbol)
+
+            position = positions.get((record.size, record.win_length, key))
+            if position is None:
+                position = positions[(record.size, record.win_length, key)] = [0, {}]
+            position[0] += 1
+
+            counts = position[1].get(symmetries[record.size][symmetry][space])
+            if counts is None:
+                counts = position[1][symmetries[record.size][symmetry][space]] = [0, 0, 0, 0]
+            if record.winner == symbol:
+                counts[0] += 1
+            elif record.winner == "":
+                counts[1] += 1
+            else:
+                counts[2] += 1
+
+            if isinstance(board, BitBoardclass):
+                own, other = boardMasks(board, symbol, other_symbol)
+                if -solvePosition(other, own | (1 << space)) < solvePosition(own, other):
+                    counts[3] += 1
+
+            board.placeMove(space // record.size, space % record.size, symbol)
+
+    return positions
+
+
+def mergePositions(total: dict, positions: dict) -> dict:
+    """A function to add the counts of one result of analyzeGames() into another.
+
+    Args:
+        total: the counts to add to, which are changed in place
+        positions: the counts to add
+
+    Returns:
+        the total counts.
+    """
+    for position_key, (occurrences, moves) in positions.items():
+        position = total.get(position_key)
+        if position is None:
+            total[position_key] = [occurrences, moves]
+            continue
+
+        position[0] += occurrences
+        for space, counts in moves.items():
+            total_counts = position[1].get(space)
+            if total_counts is None:
+                position[1][space] = counts
+            else:
+                for field in range(len(MOVE_FIELDS)):
+                    total_counts[field] += counts[field]
+
+    return total
+
+
+def analyzeLog(path: str, chunk_size: int = 10000, processes: int = None) -> dict:
+    """A function to count the positions and moves of every game in a game log.
+
+    The log is read one game at a time and split into chunks that are counted by a pool of worker processes. Only a
+    couple of chunks per worker are read ahead, and the counts of each chunk are merged as soon as it is done, so memory
+    grows with the number of different positions rather than the number of games.
+
+    Args:
+        path: the file of the game log
+        chunk_size: the number of games sent to a worker at once
+        processes: the number of worker processes, which defaults to the number of cores
+
+    Returns:
+        the merged counts of every game; see analyzeGames().
+    """
+    processes = processes or os.cpu_count()
+    games = readGames(path)
+    total = {}
+    pending = set()
+
+    with ProcessPoolExecutor(processes) as executor:
+        while True:
+            while len(pending) < 2 * processes:
+                chunk = list(itertools.islice(games, chunk_size))
+                if not chunk:
+                    break
+                pending.add(executor.submit(analyzeGames, chunk))
+
+            if not pending:
+                return total
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                mergePositions(total, future.result())
+
+
+def formatPosition(size: int, key) -> str:
+    """A function to lay out the position of a canonical key as text.
+
+    Args:
+        size: the number of rows and columns of the board
+        key: the canonical key of the position; see positionKey()
+
+    Returns:
+        a string of each row of the position, with X and O filled in from the number of moves each side has made.
+    """
+    if isinstance(key, int):
+        key = "".join("1" if key >> 9 & 1 << space else "2" if key & 1 << space else "0" for space in range(9))
+
+    symbols = {"0": ".", "1": "X", "2": "O"} if key.count("1") == key.count("2") else {"0": ".", "1": "O", "2": "X"}
+    return "\n".join(" ".join(symbols[code] for code in key[row * size:(row + 1) * size]) for row in range(size))
+
+
+def printReport(positions: dict, top: int) -> None:
+    """A function to print the most common positions with the results of each move played from them.
+
+    Args:
+        positions: the counts of analyzeGames() or analyzeLog()
+        top: the number of positions to print
+    """
+    print(f"Positions: {len(positions)}")
+
+    for (size, win_length, key), (occurrences, moves) in sorted(positions.items(), key=lambda item: -item[1][0])[:top]:
+        print(f"\n{formatPosition(size, key)}\nReached {occurrences} times")
+        for space, (wins, ties, losses, blunders) in sorted(moves.items(), key=lambda item: -sum(item[1][:3])):
+            played = wins + ties + losses
+            print(f"  Move {space + 1}: played {played}, won {wins / played:.1%}, tied {ties / played:.1%}, "
+                  f"lost {losses / played:.1%}, blunders {blunders / played:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count the positions and moves of the games in a game log.")
+    parser.add_argument("path", help="the file of the game log")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="the number of games sent to a worker at once")
+    parser.add_argument("--processes", type=int, help="the number of worker processes, which defaults to the cores")
+    parser.add_argument("--top", type=int, default=10, help="the number of most common positions to print")
+    args = parser.parse_args()
+
+    printReport(analyzeLog(args.path, args.chunk_size, args.processes), args.top)
@@ -0,0 +1,251 @@
+import argparse
+import io
+import json
+import socket
+import threading
+import time
+import tracemalloc
+from gameboard import BitBoardclass, Boardclass
+from gamestate import GameState
+from metrics import Counter, Histogram
+from player1 import Player1
+from player2 import Player2
+from protocol import MSG_MOVE, encodeMove
+from renderer import RENDERERS, NullRenderer
+from timings import summarize
+
+# A game where nobody wins until the board is full, used to time updating the board.
+TIED_GAME = ((0, 0, "X"), (0, 1, "O"), (0, 2, "X"), (1, 1, "O"), (1, 0, "X"), (1, 2, "O"), (2, 1, "X"), (2, 0, "O"),
+             (2, 2, "X"))
+
+
+def timeCalls(function, repeats: int, calls: int = 100) -> dict:
+    """A function to time a function that takes no arguments.
+
+    Each sample is the average time of a batch of calls, so the time taken to read the clock is not counted.
+
+    Args:
+        function: the function to time
+        repeats: the number of samples
+        calls: the number of calls in each sample
+
+    Returns:
+        the summary of the samples; see summarize().
+    """
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            function()
+        samples.append((time.perf_counter_ns() - start) / calls)
+
+    return summarize(samples)
+
+
+def benchmarkBoard(board_type: type, repeats: int) -> dict:
+    """A function to time the operations of a gameboard object.
+
+    Updating the board is timed by resetting it and playing every move of a tied game, once with each renderer, which
+    writes to a string instead of the screen. The other operations are timed one call at a time on the full board.
+
+    Args:
+        board_type: the class of gameboard object to time
+        repeats: the number of samples of each operation
+
+    Returns:
+        a dictionary mapping the name of each operation to the summary of its timings.
+    """
+    board = board_type(player_symbol="X", other_symbol="O")
+    results = {}
+
+    def playGame() -> None:
+        board.resetGameBoard()
+        for row, column, symbol in TIED_GAME:
+            board.updateGameBoard((row, column), symbol)
+
+    for name, renderer_type in RENDERERS.items():
+        board.renderer = NullRenderer() if renderer_type is NullRenderer else renderer_type(io.StringIO())
+        results[f"updateGameBoard_render_{name}"] = timeCalls(playGame, repeats, calls=10)
+
+    results["isWinner"] = timeCalls(lambda: board.isWinner("X"), repeats)
+    results["boardIsFull"] = timeCalls(board.boardIsFull, repeats)
+    results["checkMove"] = timeCalls(lambda: board.checkMove(1, 1), repeats)
+    results["decodeMove"] = timeCalls(lambda: board.decodeMove(5), repeats)
+
+    return results
+
+
+def benchmarkRoundTrip(moves: int) -> dict:
+    """A function to time sending a move between Player 1 and Player 2 over a loopback socket and back.
+
+    Player 2 runs in a thread that sends every move it receives straight back to player 1.
+
+    Args:
+        moves: the number of moves to send
+
+    Returns:
+        the summary of the round trip times; see summarize().
+    """
+    player1 = Player1()
+    player2 = Player2()
+
+    player2.p2socket.bind(("127.0.0.1", 0))
+    player2.p2socket.listen(1)
+    player1.p1socket.connect(player2.p2socket.getsockname())
+    player1.p1socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    player2.clientSocket, player2.clientAddress = player2.p2socket.accept()
+    player2.clientSocket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def echoMoves() -> None:
+        for _ in range(moves):
+            player2.sendData(encodeMove(*player2.receiveData(MSG_MOVE)))
+
+    echo_thread = threading.Thread(target=echoMoves)
+    echo_thread.start()
+
+    samples = []
+    for move in range(moves):
+        start = time.perf_counter_ns()
+        player1.sendData(encodeMove(move % 3, move // 3 % 3))
+        player1.receiveData(MSG_MOVE)
+        samples.append(time.perf_counter_ns() - start)
+
+    echo_thread.join()
+    for open_socket in (player1.p1socket, player2.clientSocket, player2.p2socket):
+        open_socket.close()
+
+    return summarize(samples)
+
+
+def measureMemory(new_game, count: int, park: bool = False) -> float:
+    """A function to measure the memory held by each game of a kind of game object, with tracemalloc.
+
+    Creates the games and plays the first four moves of TIED_GAME in each, as a host holding games in progress would.
+
+    Args:
+        new_game: a function that takes a username and returns a new game object
+        count: the number of games to hold at once
+        park: whether to hold the snapshot() of each game instead of the game object
+
+    Returns:
+        the average number of bytes allocated for each game.
+    """
+    usernames = [f"player{index % 100}" for index in range(count)]
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    games = []
+    for username in usernames:
+        game = new_game(username)
+        game.clearGameBoard()
+        for row, column, symbol in TIED_GAME[:4]:
+            game.placeMove(row, column, symbol)
+        games.append(game.snapshot() if park else game)
+
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    return used / count
+
+
+def benchmarkMemory(count: int) -> dict:
+    """A function to measure the memory of each game for every kind of game object a host can hold.
+
+    Boardclass and BitBoardclass games each get their own NullRenderer, as in a host. GameState is measured both as
+    live game objects and as parked snapshots.
+
+    Args:
+        count: the number of games of each kind to hold at once
+
+    Returns:
+        a dictionary mapping the name of each kind of game object to its bytes per game.
+    """
+    return {
+        "Boardclass": measureMemory(lambda username: Boardclass(current_player=username, renderer=NullRenderer()),
+                                    count),
+        "BitBoardclass": measureMemory(lambda username: BitBoardclass(current_player=username,
+                                                                      renderer=NullRenderer()), count),
+        "GameState": measureMemory(lambda username: GameState(current_player=username), count),
+        "GameState.snapshot": measureMemory(lambda username: GameState(current_player=username), count, park=True),
+    }
+
+
+def runBenchmarks(repeats: int, moves: int) -> dict:
+    """A function to run every benchmark.
+
+    Args:
+        repeats: the number of samples of each board operation
+        moves: the number of moves sent between the players
+
+    Returns:
+        a dictionary mapping the name of each benchmark to the summary of its timings.
+    """
+    results = {}
+    for board_type in (Boardclass, BitBoardclass):
+        for operation, summary in benchmarkBoard(board_type, repeats).items():
+            results[f"{board_type.__name__}.{operation}"] = summary
+    results["round_trip"] = benchmarkRoundTrip(moves)
+
+    counter = Counter("benchmark_total", "Benchmark counter")
+    histogram = Histogram("benchmark_seconds", "Benchmark histogram")
+    results["Counter.inc"] = timeCalls(counter.inc, repeats)
+    results["Histogram.observe"] = timeCalls(lambda: histogram.observe(123456), repeats)
+
+    return results
+
+
+def compareResults(results: dict, baseline: dict, threshold: float) -> list:
+    """A function to compare benchmark results against a saved baseline.
+
+    Args:
+        results: the results of runBenchmarks()
+        baseline: earlier results of runBenchmarks()
+        threshold: the fraction a median time can grow by before it counts as a regression
+
+    Returns:
+        a list of (name, baseline median, new median, ratio, regressed) tuples for the benchmarks found in both
+        results.
+    """
+    comparison = []
+    for name, summary in results.items():
+        if name in baseline:
+            ratio = summary["p50_ns"] / baseline[name]["p50_ns"]
+            comparison.append((name, baseline[name]["p50_ns"], summary["p50_ns"], ratio, ratio > 1 + threshold))
+
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the gameboard operations and moves sent between players.")
+    parser.add_argument("--repeats", type=int, default=1000, help="the number of samples of each board operation")
+    parser.add_argument("--moves", type=int, default=2000, help="the number of moves sent between the players")
+    parser.add_argument("--memory-games", type=int, default=100000,
+                        help="the number of games held at once to measure the memory of each game")
+    parser.add_argument("--output", help="the JSON file to write the results to")
+    parser.add_argument("--baseline", help="a JSON file of earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="the fraction a median time can grow by before it counts as a regression")
+    args = parser.parse_args()
+
+    benchmark_results = runBenchmarks(args.repeats, args.moves)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(benchmark_results, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline_results = json.load(baseline_file)
+
+        regressions = 0
+        for name, old, new, ratio, regressed in compareResults(benchmark_results, baseline_results, args.threshold):
+            regressions += regressed
+            print(f"{name:<55}{old:>12.0f}ns{new:>12.0f}ns{ratio:>8.2f}x{'  REGRESSION' if regressed else ''}")
+        if regressions:
+            raise SystemExit(f"{regressions} benchmarks regressed")
+    else:
+        for name, summary in benchmark_results.items():
+            print(f"{name:<55}p50 {summary['p50_ns']:>10.0f}ns  p99 {summary['p99_ns']:>10.0f}ns")
+
+    for name, bytes_per_game in benchmarkMemory(args.memory_games).items():
+        print(f"{name + ' memory':<55}{bytes_per_game:>14.0f} bytes per game")
@@ -0,0 +1,202 @@
+from gameboard import FULL_MASK, WINNING_POSITIONS, BitBoardclass, Boardclass, boardSymmetries
+from gamestate import GameState
+
+# For each of the 8 symmetries of the board, the bit mask every possible mask is moved to.
+SYMMETRY_MASKS = tuple(
+    tuple(sum(1 << permutation[space] for space in range(9) if mask & (1 << space)) for mask in range(FULL_MASK + 1))
+    for permutation in boardSymmetries(3)
+)
+
+# Values of solved positions for the player to move, keyed by canonicalKey(). Shared by every ComputerPlayer.
+TRANSPOSITION_TABLE = {}
+
+# For each board size, the inverses of its symmetries, made the first time positionKey() sees the size.
+SYMMETRY_ORDERS = {}
+
+
+def boardMasks(board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+    """A function to get the bit masks of the spaces held by each player on a board.
+
+    Args:
+        board: the gameboard object to read the moves from
+        symbol: the symbol of the player whose mask is returned first
+        other_symbol: the symbol of the other player
+
+    Returns:
+        (own, other): a tuple of the 9-bit masks of the spaces held by each symbol.
+    """
+    if isinstance(board, (BitBoardclass, GameState)):
+        return board.masks.get(symbol, 0), board.masks.get(other_symbol, 0)
+
+    own = 0
+    other = 0
+    for row in range(3):
+        for column in range(3):
+            if board.gameboard[row][column] == symbol:
+                own |= 1 << (row * 3 + column)
+            elif board.gameboard[row][column] == other_symbol:
+                other |= 1 << (row * 3 + column)
+
+    return own, other
+
+
+def canonicalKey(own: int, other: int) -> int:
+    """A function to get the key shared by a position and all of its rotations and reflections.
+
+    Args:
+        own: the bit mask of the spaces held by the player to move
+        other: the bit mask of the spaces held by the other player
+
+    Returns:
+        the smallest 18-bit number made from the masks of any of the 8 symmetries of the position.
+    """
+    return min((table[own] << 9) | table[other] for table in SYMMETRY_MASKS)
+
+
+def positionKey(board: Boardclass, symbol: str, other_symbol: str) -> tuple:
+    """A function to get the key shared by the position on a board and all of its rotations and reflections.
+
+    3x3 boards use the 18-bit key of canonicalKey(). Larger boards use the smallest string of the spaces under any of the
+    8 symmetries, with '1' for the player to move, '2' for the other player and '0' for an empty space.
+
+    Args:
+        board: the gameboard object of the position
+        symbol: the symbol of the player to move
+        other_symbol: the symbol of the other player
+
+    Returns:
+        (key, symmetry): a tuple of the canonical key and the index in boardSymmetries() of the symmetry that gives it,
+        which maps the spaces of the board to the spaces of the key.
+    """
+    if (board.size, board.win_length) == (3, 3):
+        own, other = boardMasks(board, symbol, other_symbol)
+        return min(((table[own] << 9) | table[other], index) for index, table in enumerate(SYMMETRY_MASKS))
+
+    orders = symmetryOrders(board.size)
+    codes = {symbol: "1", other_symbol: "2"}
+    spaces = [codes.get(space, "0") for row in board.gameboard for space in row]
+
+    return min(("".join([spaces[space] for space in order]), index) for index, order in enumerate(orders))
+
+
+def symmetryOrders(size: int) -> list:
+    """A function to get the inverses of the symmetries of a board size.
+
+    The value at each index of an inverse is the space that is moved to that index, so reading the spaces of a board in
+    that order gives the board after the symmetry.
+
+    Args:
+        size: the number of rows and columns of the board
+
+    Returns:
+        a list of 8 tuples, in the same order as boardSymmetries().
+    """
+    orders = SYMMETRY_ORDERS.get(size)
+    if orders is None:
+        orders = []
+        for permutation in boardSymmetries(size):
+            order = [0] * len(permutation)
+            for space, moved_space in enumerate(permutation):
+                order[moved_space] = space
+            orders.append(tuple(order))
+        SYMMETRY_ORDERS[size] = orders
+
+    return orders
+
+
+def solvePosition(own: int, other: int) -> int:
+    """A function to find the value of a position with perfect play from both players.
+
+    Uses a negamax search, storing the value of each position in the transposition table under its canonical key so
+    that every symmetric position is only searched once.
+
+    Args:
+        own: the bit mask of the spaces held by the player to move
+        other: the bit mask of the spaces held by the player that moved last
+
+    Returns:
+        1 if the player to move wins, 0 if the game is a tie, and -1 if the player to move loses.
+    """
+    key = canonicalKey(own, other)
+    value = TRANSPOSITION_TABLE.get(key)
+    if value is not None:
+        return value
+
+    if WINNING_POSITIONS[other]:
+        value = -1
+    elif own | other == FULL_MASK:
+        value = 0
+    else:
+        value = -1
+        free = ~(own | other) & FULL_MASK
+        while free:
+            bit = free & -free
+            free ^= bit
+            value = max(value, -solvePosition(other, own | bit))
+            if value == 1:
+                break
+
+    TRANSPOSITION_TABLE[key] = value
+    return value
+
+
+class ComputerPlayer:
+    """A class to create a computer player that always plays the best move.
+
+    Solves the whole game once with a negamax search, and remembers the best move for every position it is asked about
+    so later replies from the same position are a single dictionary lookup.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the computer player and solves the game from an empty board.
+
+        Sets up the dictionary of best moves already chosen and the score of the last move chosen.
+        """
+        self.best_moves = {}
+        self.last_score = 0
+        solvePosition(0, 0)
+
+    def bestMove(self, own: int, other: int) -> tuple[int, int]:
+        """A function to find the best move for the player to move.
+
+        Args:
+            own: the bit mask of the spaces held by the player to move
+            other: the bit mask of the spaces held by the other player
+
+        Returns:
+            (space, score): a tuple of the space of the best move, numbered as row * 3 + column, and its value for the
+            player to move.
+        """
+        best = self.best_moves.get((own, other))
+        if best is not None:
+            return best
+
+        best_space = -1
+        best_score = -2
+        for space in range(9):
+            bit = 1 << space
+            if (own | other) & bit:
+                continue
+            score = -solvePosition(other, own | bit)
+            if score > best_score:
+                best_space = space
+                best_score = score
+
+        best = (best_space, best_score)
+        self.best_moves[(own, other)] = best
+        return best
+
+    def chooseMove(self, board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+        """A function to choose the move for a player on a board.
+
+        Args:
+            board: the gameboard object of the game being played
+            symbol: the symbol of the player to move
+            other_symbol: the symbol of the other player
+
+        Returns:
+            (row, column): a tuple containing the row and column of the best move.
+        """
+        space, self.last_score = self.bestMove(*boardMasks(board, symbol, other_symbol))
+
+        return space // 3, space % 3
@@ -0,0 +1,150 @@
+import argparse
+import mmap
+from computerplayer import ComputerPlayer, boardMasks
+from gameboard import FULL_MASK, WINNING_POSITIONS, Boardclass
+
+DEFAULT_TABLE_PATH = "endgame.bin"
+TABLE_HEADER = b"TTTEND\x01\x00"
+TABLE_SIZE = 3 ** 9
+
+# Entries are one byte: the high bit marks a reachable position, the next two bits hold the value plus one and the
+# low four bits hold the best space, or NO_MOVE when the game is already over.
+REACHABLE = 0x80
+NO_MOVE = 0x0F
+
+# For every bit mask, the sum of 3 ** space over the spaces in the mask.
+BASE3_MASKS = tuple(sum(3 ** space for space in range(9) if mask & (1 << space)) for mask in range(FULL_MASK + 1))
+
+
+def positionIndex(x_mask: int, o_mask: int) -> int:
+    """A function to number a position in base 3.
+
+    Each space counts as 0 when empty, 1 when held by X and 2 when held by O, with space (row * 3 + column) as the digit
+    for 3 ** space.
+
+    Args:
+        x_mask: the bit mask of the spaces held by X
+        o_mask: the bit mask of the spaces held by O
+
+    Returns:
+        the position number, from 0 to 3 ** 9 - 1.
+    """
+    return BASE3_MASKS[x_mask] + 2 * BASE3_MASKS[o_mask]
+
+
+def generateTable(path: str = DEFAULT_TABLE_PATH) -> int:
+    """A function to solve every position reachable from an empty board and write them to a table file.
+
+    Starting from the empty masks (0, 0), with X moving first, visits every reachable position and stores its value
+    for the player to move and its best move at the position's base 3 number.
+
+    Args:
+        path: the file to write the table to
+
+    Returns:
+        the number of reachable positions written.
+    """
+    engine = ComputerPlayer()
+    table = bytearray(TABLE_SIZE)
+    stack = [(0, 0)]
+    count = 0
+
+    while stack:
+        x_mask, o_mask = stack.pop()
+        index = positionIndex(x_mask, o_mask)
+        if table[index]:
+            continue
+
+        x_to_move = bin(x_mask).count("1") == bin(o_mask).count("1")
+        own, other = (x_mask, o_mask) if x_to_move else (o_mask, x_mask)
+
+        if WINNING_POSITIONS[other]:
+            table[index] = REACHABLE | (0 << 4) | NO_MOVE
+        elif own | other == FULL_MASK:
+            table[index] = REACHABLE | (1 << 4) | NO_MOVE
+        else:
+            space, value = engine.bestMove(own, other)
+            table[index] = REACHABLE | ((value + 1) << 4) | space
+
+            free = ~(x_mask | o_mask) & FULL_MASK
+            while free:
+                bit = free & -free
+                free ^= bit
+                stack.append((x_mask | bit, o_mask) if x_to_move else (x_mask, o_mask | bit))
+        count += 1
+
+    with open(path, "wb") as table_file:
+        table_file.write(TABLE_HEADER)
+        table_file.write(table)
+
+    return count
+
+
+class EndgameTable:
+    """A class to look up solved positions in a table file written by generateTable().
+
+    Maps the file into memory read-only, so every process that opens the same table shares one copy of it, and each
+    lookup is a single byte read. Can be used in place of a ComputerPlayer to choose moves.
+    """
+
+    def __init__(self, path: str = DEFAULT_TABLE_PATH) -> None:
+        """Opens and maps the table file.
+
+        Raises:
+            ValueError: an error that occurs when the file is not an endgame table.
+        """
+        with open(path, "rb") as table_file:
+            self.table = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.table) != len(TABLE_HEADER) + TABLE_SIZE or self.table[:len(TABLE_HEADER)] != TABLE_HEADER:
+            self.table.close()
+            raise ValueError(f"{path} is not an endgame table")
+
+        self.last_score = 0
+
+    def lookup(self, index: int) -> tuple[int, int]:
+        """A function to look up a position by its base 3 number.
+
+        Args:
+            index: the position number given by positionIndex()
+
+        Returns:
+            (value, space): a tuple of the value of the position for the player to move, which is 1 for a win, 0 for a
+            tie and -1 for a loss, and the space of the best move, or None if the game is over.
+
+        Raises:
+            KeyError: an error that occurs when the position cannot be reached in a game.
+        """
+        entry = self.table[len(TABLE_HEADER) + index]
+        if not entry & REACHABLE:
+            raise KeyError(index)
+
+        space = entry & NO_MOVE
+        return ((entry >> 4) & 0x03) - 1, None if space == NO_MOVE else space
+
+    def chooseMove(self, board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+        """A function to choose the move for a player on a board.
+
+        Args:
+            board: the gameboard object of the game being played, with X as the first player
+            symbol: the symbol of the player to move
+            other_symbol: the symbol of the other player
+
+        Returns:
+            (row, column): a tuple containing the row and column of the best move.
+        """
+        self.last_score, space = self.lookup(positionIndex(*boardMasks(board, "X", "O")))
+
+        return space // 3, space % 3
+
+    def close(self) -> None:
+        """A function to unmap the table file."""
+        self.table.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the table of every solved tic-tac-toe position.")
+    parser.add_argument("--output", default=DEFAULT_TABLE_PATH, help="the file to write the table to")
+    args = parser.parse_args()
+
+    print("Positions written:", generateTable(args.output))
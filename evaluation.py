@@ -0,0 +1,190 @@
+import argparse
+import itertools
+import sys
+import numpy as np
+from endgame import DEFAULT_TABLE_PATH, NO_MOVE, REACHABLE, TABLE_HEADER, TABLE_SIZE, EndgameTable
+from gameboard import boardSymmetries
+
+# The result of a move that cannot be made, because the space is taken, the game is over or the position cannot be
+# reached in a game.
+ILLEGAL = -2
+
+# Positions are numbered as in endgame.positionIndex(): each space counts as 0 when empty, 1 for X and 2 for O, with
+# space (row * 3 + column) as the digit for 3 ** space.
+POWERS = 3 ** np.arange(9, dtype=np.int32)
+DIGITS = ((np.arange(TABLE_SIZE)[:, None] // POWERS) % 3).astype(np.int8)
+
+# The codes of the characters of a board: a space, '.' or '-' for an empty space, 'X' and 'O'. Other characters are 3.
+CHARACTER_CODES = np.full(256, 3, dtype=np.int8)
+CHARACTER_CODES[[ord(" "), ord("."), ord("-")]] = 0
+CHARACTER_CODES[ord("X")] = 1
+CHARACTER_CODES[ord("O")] = 2
+
+# For every position number, the smallest number of the position under any of the 8 symmetries, which the position
+# shares with its rotations and reflections, and the space each space is moved to by the symmetry that gives it.
+PERMUTATIONS = np.array(boardSymmetries(3))
+SYMMETRY_INDEXES = DIGITS.astype(np.int32) @ POWERS[PERMUTATIONS].T
+CANONICAL = SYMMETRY_INDEXES.min(axis=1)
+SPACE_ORDERS = PERMUTATIONS[SYMMETRY_INDEXES.argmin(axis=1)]
+
+
+class BatchEvaluator:
+    """A class to score every legal move of many positions at once.
+
+    Positions are looked up in an EndgameTable, whose file is mapped into memory and read here as a NumPy array without
+    copying it, so every process evaluating positions shares one copy of the solved game. The results of each canonical
+    position are worked out once, for every move at once, and kept in a dense array with a row for each position
+    number. A batch is reduced to the canonical positions it holds, any missing from the cache are filled in with one
+    vectorized lookup, and the results of every board are read from the cache in its own orientation.
+    """
+
+    def __init__(self, table: EndgameTable) -> None:
+        """Initializes the evaluator.
+
+        Sets the endgame table, a view of its entries, the cache of results, which is filled as positions are seen,
+        and which rows of the cache are filled.
+        """
+        self.table = table
+        self.entries = np.frombuffer(table.table, dtype=np.uint8, offset=len(TABLE_HEADER))
+        self.results = np.full((TABLE_SIZE, 9), ILLEGAL, dtype=np.int8)
+        self.cached = np.zeros(TABLE_SIZE, dtype=bool)
+
+    def fillCache(self, rows: np.ndarray) -> None:
+        """A function to work out the result of every move of a set of canonical positions.
+
+        The result of a move is the value of the position after it for the player who made it, which is the value in
+        the table for the other player with the sign flipped.
+
+        Args:
+            rows: the canonical position numbers to fill in
+        """
+        digits = DIGITS[rows]
+        x_to_move = (digits == 1).sum(axis=1) == (digits == 2).sum(axis=1)
+        children = rows[:, None] + np.where(x_to_move, 1, 2)[:, None] * POWERS
+
+        entries = self.entries[rows]
+        playable = (entries & REACHABLE != 0) & (entries & NO_MOVE != NO_MOVE)
+        legal = playable[:, None] & (digits == 0)
+
+        values = ((self.entries[np.where(legal, children, 0)] >> 4) & 0x03).astype(np.int8) - 1
+        self.results[rows] = np.where(legal, -values, ILLEGAL)
+        self.cached[rows] = True
+
+    def evaluate(self, boards: np.ndarray) -> np.ndarray:
+        """A function to score every legal move of a batch of positions.
+
+        Args:
+            boards: an (N, 9) or (N, 3, 3) array of the spaces of each board, with 0 for an empty space, 1 for X and 2 for
+            O, counting across each row
+
+        Returns:
+            an (N, 9) int8 array of the result of moving to each space for the player to move, which is 1 for a win, 0
+            for a tie, -1 for a loss with perfect play afterwards, and ILLEGAL for a move that cannot be made.
+
+        Raises:
+            ValueError: an error that occurs when a space is not 0, 1 or 2.
+        """
+        boards = np.asarray(boards).reshape(-1, 9)
+        if boards.size and (boards.min() < 0 or boards.max() > 2):
+            raise ValueError("Spaces must be 0 for empty, 1 for X or 2 for O")
+
+        indexes = boards.astype(np.int32) @ POWERS
+        rows = CANONICAL[indexes]
+
+        unique_rows = np.unique(rows)
+        missing = unique_rows[~self.cached[unique_rows]]
+        if len(missing) > 0:
+            self.fillCache(missing)
+
+        return self.results[rows[:, None], SPACE_ORDERS[indexes]]
+
+
+def encodeBoards(boards) -> np.ndarray:
+    """A function to turn boards in the Boardclass layout into an array of space codes for BatchEvaluator.evaluate().
+
+    Args:
+        boards: a list of boards, each given as the gameboard of a Boardclass, which is a list of 3 rows of 3 symbols,
+        or as a string of the 9 symbols counting across each row, using a space, '.' or '-' for an empty space
+
+    Returns:
+        an (N, 9) int8 array of the spaces of each board.
+
+    Raises:
+        ValueError: an error that occurs when a board does not have 9 spaces or holds a symbol other than X and O.
+    """
+    text = "".join(board if isinstance(board, str) else "".join(itertools.chain.from_iterable(board))
+                   for board in boards)
+    if len(text) != 9 * len(boards):
+        raise ValueError("Every board must have 9 spaces")
+
+    codes = CHARACTER_CODES[np.frombuffer(text.encode("latin-1", "replace"), dtype=np.uint8)].reshape(-1, 9)
+    if (codes == 3).any():
+        raise ValueError("Boards may only hold X, O and empty spaces")
+
+    return codes
+
+
+def evaluatePositions(boards, evaluator: BatchEvaluator, chunk_size: int = 65536):
+    """A function to score every legal move of a stream of positions, one chunk at a time.
+
+    Only one chunk of boards and results is held at once, so any number of positions can be evaluated in the same
+    memory.
+
+    Args:
+        boards: an array accepted by BatchEvaluator.evaluate(), or any iterable of boards accepted by encodeBoards()
+        evaluator: the evaluator to score the positions with
+        chunk_size: the number of positions evaluated at once
+
+    Yields:
+        an (N, 9) int8 array of results for each chunk of positions, in the order the positions were given.
+    """
+    if isinstance(boards, np.ndarray):
+        boards = boards.reshape(-1, 9)
+        for start in range(0, len(boards), chunk_size):
+            yield evaluator.evaluate(boards[start:start + chunk_size])
+        return
+
+    iterator = iter(boards)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield evaluator.evaluate(encodeBoards(chunk))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score every legal move of a file of tic-tac-toe positions.")
+    parser.add_argument("input", help="a file with one board of 9 spaces per line, using '.' for empty, or - for stdin")
+    parser.add_argument("--output", default="-", help="the file to write the results to, or - for stdout")
+    parser.add_argument("--endgame-table", default=DEFAULT_TABLE_PATH, help="an endgame table written by endgame.py")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="the number of positions evaluated at once")
+    args = parser.parse_args()
+
+    try:
+        batch_evaluator = BatchEvaluator(EndgameTable(args.endgame_table))
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    # The letter written for each result, indexed by the result minus ILLEGAL.
+    result_letters = np.frombuffer(b".LTW", dtype=np.uint8)
+
+    with input_file, output_file:
+        positions = (line.rstrip("\r\n") for line in input_file if line.strip("\r\n"))
+        while True:
+            lines = list(itertools.islice(positions, args.chunk_size))
+            if not lines:
+                break
+            try:
+                codes = encodeBoards(lines)
+            except ValueError as error:
+                raise SystemExit(f"{args.input}: {error}")
+
+            # Each output line is the board, a space, a letter for the result of each move and a newline.
+            output = np.empty((len(lines), 20), dtype=np.uint8)
+            output[:, :9] = np.frombuffer("".join(lines).encode("latin-1"), dtype=np.uint8).reshape(-1, 9)
+            output[:, 9] = ord(" ")
+            output[:, 10:19] = result_letters[batch_evaluator.evaluate(codes) - ILLEGAL]
+            output[:, 19] = ord("\n")
+            output_file.write(output.tobytes())
@@ -1,16 +1,69 @@
+from renderer import BufferedRenderer
+
+# Bit masks of the eight winning lines, with bit (row * 3 + column) standing for each space on the board.
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100                # diagonals
+)
+FULL_MASK = 0b111111111
+
+# For every possible set of spaces held by one player, whether it contains one of the winning lines.
+WINNING_POSITIONS = tuple(any(mask & line == line for line in WIN_MASKS) for mask in range(FULL_MASK + 1))
+
+
+def boardSymmetries(size: int) -> list:
+    """A function to list the 8 symmetries of a square board.
+
+    Each symmetry is a rotation or reflection of the board, given as a tuple where the value at each index is the
+    space that index is moved to, numbering the spaces as row * size + column.
+
+    Args:
+        size: the number of rows and columns of the board
+
+    Returns:
+        a list of 8 tuples, starting with the identity.
+    """
+    last = size - 1
+    transforms = (
+        lambda row, column: (row, column),
+        lambda row, column: (column, last - row),
+        lambda row, column: (last - row, last - column),
+        lambda row, column: (last - column, row),
+        lambda row, column: (row, last - column),
+        lambda row, column: (last - row, column),
+        lambda row, column: (column, row),
+        lambda row, column: (last - column, last - row)
+    )
+    symmetries = []
+
+    for transform in transforms:
+        permutation = []
+        for space in range(size * size):
+            row, column = transform(space // size, space % size)
+            permutation.append(row * size + column)
+        symmetries.append(tuple(permutation))
+
+    return symmetries
+
+
 class Boardclass:
     """A class to create a gameboard object that stores game information.
 
-    Creates a gameboard object that stores the moves and stats of each player.
+    Creates a gameboard object that stores the moves and stats of each player. The board can be any size, and a player
+    wins by getting the chosen number of symbols in a row, column or diagonal.
     """
 
     def __init__(self, current_player: str = "", last_player: str = "", player_symbol: str = "", other_symbol: str = "",
-                 num_games: int = 0, num_wins: int = 0, num_losses: int = 0, num_ties: int = 0) -> None:
+                 num_games: int = 0, num_wins: int = 0, num_losses: int = 0, num_ties: int = 0, size: int = 3,
+                 win_length: int = 3, renderer=None) -> None:
         """A function to initialize variables for Boardclass to store data used during the game.
 
         Creates variables that represent the gameboard, the current player, the player that last moved, the player's
         symbol, the other player's symbol, the number of games, the number of wins, the number of losses, and the
-        number of ties.
+        number of ties, along with the size of the board, the number in a row needed to win, the number of empty
+        spaces left, the spaces moved in so far in order, the symbol of the player that has won, and the renderer that
+        draws the board, which defaults to drawing the whole board after every change.
         """
 
         self.gameboard = []
@@ -22,6 +75,12 @@ class Boardclass:
         self.num_wins = num_wins
         self.num_losses = num_losses
         self.num_ties = num_ties
+        self.size = size
+        self.win_length = win_length
+        self.empty_spaces = 0
+        self.moves = []
+        self.winner = ""
+        self.renderer = renderer if renderer is not None else BufferedRenderer()
 
     def updateGamesPlayed(self) -> None:
         """A function to update the number of games played.
@@ -33,57 +92,113 @@ class Boardclass:
     def resetGameBoard(self) -> list:
         """A function to reset the gameboard to start a new game.
 
-        Redefines the values of the spaces to empty strings and prints the board so that all the spaces are cleared of
-        moves and symbols.
+        Redefines the values of the spaces to empty strings and draws the board with the renderer so that all the
+        spaces are cleared of moves and symbols.
 
         Returns:
-            self.gameboard: a list of lists, representing the 3 rows, filled with empty strings to represent the nine
-            spaces in a tic-tac-toe board.
-        """
-        line = "-----------------"
-        self.gameboard = [
-            [" ", " ", " "],
-            [" ", " ", " "],
-            [" ", " ", " "]
-        ]
-
-        print(f"  {self.gameboard[0][0]}  |  {self.gameboard[0][1]}  |  {self.gameboard[0][1]}")
-        print(line)
-        print(f"  {self.gameboard[1][0]}  |  {self.gameboard[1][1]}  |  {self.gameboard[1][1]}")
-        print(line)
-        print(f"  {self.gameboard[2][0]}  |  {self.gameboard[2][1]}  |  {self.gameboard[2][1]}")
-        print()
+            self.gameboard: a list of lists, representing the rows, filled with empty strings to represent the spaces
+            in a tic-tac-toe board.
+        """
+        self.clearGameBoard()
+        self.renderer.drawBoard(self)
 
         return self.gameboard
 
-    def updateGameBoard(self, move: str, symbol: str) -> list:
-        """A function to update the game board every time a move is made.
+    def clearGameBoard(self) -> None:
+        """A function to clear every space on the board without drawing it.
 
-        Based on the value inputted into the move variable, assigns the first number as the row and the second number
-        as the column. Adds the player's symbol into the designated space and then prints the gameboard with the updated
-        move.
+        Empties every space, resets the count of empty spaces and clears the moves and the winner.
+        """
+        self.gameboard = [[" "] * self.size for _ in range(self.size)]
+        self.empty_spaces = self.size * self.size
+        self.moves = []
+        self.winner = ""
+
+    def parseMove(self, move) -> tuple[int, int]:
+        """A function to read the row and column out of a move.
+
+        Accepts a (row, column) tuple, a string of the row and column separated by a comma, or a string of 2 digits.
 
         Args:
-            move: a string of 2 numbers that represent the row and column of the move being made
-            symbol: the string 'X' or 'O', representing the symbol of the player making the move
+            move: the move to read
 
         Returns:
-            self.gameboard: a list of lists, representing the 3 rows, filled with strings to represent the nine
-            spaces in a tic-tac-toe board, with the move just made added
+            (row, column): a tuple containing the row and column of the move.
         """
-        line = "-----------------"
+        if isinstance(move, str) and "," in move:
+            move = move.split(",")
+
+        return int(move[0]), int(move[1])
+
+    def placeMove(self, row: int, column: int, symbol: str) -> None:
+        """A function to add a move to the board without drawing it.
 
-        row = int(move[0])
-        column = int(move[1])
+        Adds the player's symbol into the designated space, counts down the empty spaces, records the space as the
+        next move, and records the symbol as the winner if the move completes a line.
 
+        Args:
+            row: the integer representing the row of the move
+            column: the integer representing the column of the move
+            symbol: the string 'X' or 'O', representing the symbol of the player making the move
+        """
         self.gameboard[row][column] = symbol
+        self.empty_spaces -= 1
+        self.moves.append(row * self.size + column)
 
-        print(f"  {self.gameboard[0][0]}  |  {self.gameboard[0][1]}  |  {self.gameboard[0][2]}")
-        print(line)
-        print(f"  {self.gameboard[1][0]}  |  {self.gameboard[1][1]}  |  {self.gameboard[1][2]}")
-        print(line)
-        print(f"  {self.gameboard[2][0]}  |  {self.gameboard[2][1]}  |  {self.gameboard[2][2]}")
-        print()
+        if self.completesLine(row, column, symbol) is True:
+            self.winner = symbol
+
+    def completesLine(self, row: int, column: int, symbol: str) -> bool:
+        """A function to check if the symbol in a space is part of a winning line.
+
+        Counts the matching symbols on both sides of the space along the row, column and both diagonals, looking at
+        most win_length - 1 spaces each way, so only the spaces that could share a winning line with it are looked at.
+
+        Args:
+            row: the integer representing the row of the space
+            column: the integer representing the column of the space
+            symbol: the symbol to look for
+
+        Returns:
+            True if the space is part of win_length or more of the symbol in a row.
+        """
+        for row_step, column_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+
+            for direction in (1, -1):
+                next_row = row + row_step * direction
+                next_column = column + column_step * direction
+                for _ in range(self.win_length - 1):
+                    if not (0 <= next_row < self.size and 0 <= next_column < self.size
+                            and self.gameboard[next_row][next_column] == symbol):
+                        break
+                    count += 1
+                    next_row += row_step * direction
+                    next_column += column_step * direction
+
+            if count >= self.win_length:
+                return True
+
+        return False
+
+    def updateGameBoard(self, move, symbol: str) -> list:
+        """A function to update the game board every time a move is made.
+
+        Based on the value inputted into the move variable, assigns the first number as the row and the second number
+        as the column. Adds the player's symbol into the designated space and then draws the move with the renderer.
+
+        Args:
+            move: the row and column of the move being made, in any form accepted by parseMove()
+            symbol: the string 'X' or 'O', representing the symbol of the player making the move
+
+        Returns:
+            self.gameboard: a list of lists, representing the rows, filled with strings to represent the spaces in a
+            tic-tac-toe board, with the move just made added
+        """
+        row, column = self.parseMove(move)
+
+        self.placeMove(row, column, symbol)
+        self.renderer.drawMove(self, row, column)
 
         return self.gameboard
 
@@ -106,68 +221,28 @@ class Boardclass:
         else:
             return False
 
-    def decodeMove(self, move: int) -> str:
-        """A function to change the move into a string of numbers for the row and column.
+    def decodeMove(self, move: int) -> tuple[int, int]:
+        """A function to change the number of a space into its row and column.
 
-        For each possible move, returns the string of the designated row and column that move exists on the board to
-        change the value of the space from empty to a symbol.
+        Spaces are numbered from 1 starting at the top left corner, going across each row.
 
         Returns:
-            a string containing the number of the row and the number of the column of the space.
-        """
-        if move == 1:
-            return "00"
-        if move == 2:
-            return "01"
-        if move == 3:
-            return "02"
-        if move == 4:
-            return "10"
-        if move == 5:
-            return "11"
-        if move == 6:
-            return "12"
-        if move == 7:
-            return "20"
-        if move == 8:
-            return "21"
-        if move == 9:
-            return "22"
+            (row, column): a tuple containing the row and the column of the space.
+        """
+        return divmod(move - 1, self.size)
 
     def isWinner(self, symbol: str) -> bool:
         """A function to detect when a move results in a win.
 
-        Checks if the symbol exists in a winning pattern.
+        Checks if the symbol completed a winning line when it was placed.
 
         Args:
             symbol: the symbol of the player making the move.
 
         Returns:
-            True if the designated symbol in the argument exists across an entire row.
+            True if the designated symbol in the argument has win_length in a row.
         """
-        if (symbol in self.gameboard[0][0]) and (symbol in self.gameboard[0][1]) and (symbol in self.gameboard[0][2]):
-            return True
-
-        elif (symbol in self.gameboard[1][0]) and (symbol in self.gameboard[1][1]) and (symbol in self.gameboard[1][2]):
-            return True
-
-        elif (symbol in self.gameboard[2][0]) and (symbol in self.gameboard[2][1]) and (symbol in self.gameboard[2][2]):
-            return True
-
-        elif (symbol in self.gameboard[0][0]) and (symbol in self.gameboard[1][0]) and (symbol in self.gameboard[2][0]):
-            return True
-
-        elif (symbol in self.gameboard[0][1]) and (symbol in self.gameboard[1][1]) and (symbol in self.gameboard[2][1]):
-            return True
-
-        elif (symbol in self.gameboard[0][2]) and (symbol in self.gameboard[1][2]) and (symbol in self.gameboard[2][2]):
-            return True
-
-        elif (symbol in self.gameboard[0][0]) and (symbol in self.gameboard[1][1]) and (symbol in self.gameboard[2][2]):
-            return True
-
-        elif (symbol in self.gameboard[0][2]) and (symbol in self.gameboard[1][1]) and (symbol in self.gameboard[2][0]):
-            return True
+        return self.winner == symbol
 
     def boardIsFull(self) -> bool:
         """
@@ -176,17 +251,20 @@ class Boardclass:
         Returns:
              True if all the spaces are taken, False if not.
         """
-        if (" " not in self.gameboard[0]) and (" " not in self.gameboard[1]) and (" " not in self.gameboard[2]):
+        if self.empty_spaces == 0:
             self.num_ties += 1
             return True
         else:
             return False
 
-    def printStats(self) -> None:
+    def printStats(self, store=None) -> None:
         """A function to print the stats at the end of a game.
 
         Prints the current player, last player, number of games played, number of wins, number of losses, and number
-        of ties.
+        of ties. If a stats store is given, also prints the current player's totals over every session.
+
+        Args:
+            store: the StatsStore to read the current player's lifetime totals from
         """
         print("Stats:")
         print("Current Player:", self.current_player)
@@ -196,3 +274,107 @@ class Boardclass:
         print("Number of Losses:", self.num_losses)
         print("Number of Ties:", self.num_ties)
 
+        if store is not None:
+            totals = store.getTotals(self.current_player)
+            print("Lifetime Games Played:", totals["num_games"])
+            print("Lifetime Wins:", totals["num_wins"])
+            print("Lifetime Losses:", totals["num_losses"])
+            print("Lifetime Ties:", totals["num_ties"])
+
+
+class BitBoardclass(Boardclass):
+    """A gameboard object that stores each player's moves as bit masks.
+
+    Keeps the same interface as Boardclass for a 3x3 board, but stores the spaces taken by each symbol as a 9-bit
+    integer so that checking for wins and ties only takes a few integer operations. The gameboard list is still kept up
+    to date so the board can be drawn.
+    """
+
+    def __init__(self, current_player: str = "", last_player: str = "", player_symbol: str = "", other_symbol: str = "",
+                 num_games: int = 0, num_wins: int = 0, num_losses: int = 0, num_ties: int = 0, renderer=None) -> None:
+        """Initializes the Boardclass variables along with the bit masks of the board.
+
+        Creates a dictionary mapping each symbol to the bit mask of the spaces it holds, and a bit mask of all the
+        spaces taken by either player.
+        """
+        super().__init__(current_player, last_player, player_symbol, other_symbol, num_games, num_wins, num_losses,
+                         num_ties, size=3, win_length=3, renderer=renderer)
+        self.masks = {}
+        self.occupied = 0
+
+    def clearGameBoard(self) -> None:
+        """A function to clear every space and bit mask on the board without drawing it."""
+        super().clearGameBoard()
+        self.masks = {}
+        self.occupied = 0
+
+    def placeMove(self, row: int, column: int, symbol: str) -> None:
+        """A function to add a move to the board without drawing it.
+
+        Adds the space to the bit masks, then places the move as Boardclass does, so the empty spaces, the moves and the
+        winner are kept the same way.
+
+        Args:
+            row: the integer representing the row of the move
+            column: the integer representing the column of the move
+            symbol: the string 'X' or 'O', representing the symbol of the player making the move
+        """
+        bit = 1 << (row * 3 + column)
+
+        self.masks[symbol] = self.masks.get(symbol, 0) | bit
+        self.occupied |= bit
+        super().placeMove(row, column, symbol)
+
+    def completesLine(self, row: int, column: int, symbol: str) -> bool:
+        """A function to check if the symbol in a space is part of a winning line.
+
+        Looks up the bit mask of the symbol, which already holds the space, in the precomputed table of winning
+        positions.
+
+        Args:
+            row: the integer representing the row of the space
+            column: the integer representing the column of the space
+            symbol: the symbol to look for
+
+        Returns:
+            True if the spaces held by the symbol contain one of the eight winning lines.
+        """
+        return WINNING_POSITIONS[self.masks.get(symbol, 0)]
+
+    def checkMove(self, row: int, column: int) -> bool:
+        """A function to check if a move being played already exists on the board.
+
+        Args:
+            row: the integer representing the row on the board where the player wants to move
+            column: the integer representing the column on the board where the player wants to move
+
+        Returns:
+            boolean: If the space is empty, returns true. If the space is taken, returns False.
+        """
+        return not self.occupied & (1 << (row * 3 + column))
+
+    def isWinner(self, symbol: str) -> bool:
+        """A function to detect when a move results in a win.
+
+        Looks up the bit mask of the symbol in the precomputed table of winning positions.
+
+        Args:
+            symbol: the symbol of the player making the move.
+
+        Returns:
+            True if the spaces held by the symbol contain one of the eight winning lines.
+        """
+        return WINNING_POSITIONS[self.masks.get(symbol, 0)]
+
+    def boardIsFull(self) -> bool:
+        """
+        A function to check whether all the spaces are filled in a board and increments the tie count.
+
+        Returns:
+             True if all the spaces are taken, False if not.
+        """
+        if self.occupied == FULL_MASK:
+            self.num_ties += 1
+            return True
+        else:
+            return False
@@ -0,0 +1,132 @@
+import argparse
+import struct
+import time
+from collections import namedtuple
+from gameboard import BitBoardclass, Boardclass
+from renderer import BufferedRenderer, NullRenderer
+
+# Each record starts with the time the game ended, the board size, the win length, the winner, the lengths of both
+# usernames and the number of moves. The usernames follow, then one byte per move.
+RECORD_HEADER = struct.Struct("!dBBBBBH")
+WINNERS = ("", "X", "O")
+
+GameRecord = namedtuple("GameRecord", "timestamp p1username p2username size win_length winner moves")
+
+
+class GameLogWriter:
+    """A class to append finished games to a binary game log.
+
+    Games are encoded into a buffer and the buffer is written to the end of the file when each game ends, so the file
+    is only ever added to and a crash loses at most the game being played.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Opens the log file for appending and creates the buffer of encoded games."""
+        self.log_file = open(path, "ab")
+        self.buffer = bytearray()
+
+    def writeGame(self, p1username: str, p2username: str, board: Boardclass, winner: str) -> None:
+        """A function to write a finished game to the log.
+
+        The winner is given by the caller rather than read from the board, so a game lost on time or to a disconnection
+        is recorded as a win for the other player.
+
+        Args:
+            p1username: the username of player 1, who plays X
+            p2username: the username of player 2, who plays O
+            board: the gameboard object of the finished game
+            winner: the symbol of the player that won, or an empty string for a tie
+
+        Raises:
+            ValueError: an error that occurs when the board has more than 256 spaces, so a move does not fit in a byte.
+        """
+        if board.size * board.size > 256:
+            raise ValueError("Moves on boards with more than 256 spaces do not fit in one byte")
+
+        p1name = p1username.encode()[:255]
+        p2name = p2username.encode()[:255]
+
+        self.buffer += RECORD_HEADER.pack(time.time(), board.size, board.win_length, WINNERS.index(winner), len(p1name),
+                                          len(p2name), len(board.moves))
+        self.buffer += p1name
+        self.buffer += p2name
+        self.buffer += bytes(board.moves)
+        self.flush()
+
+    def flush(self) -> None:
+        """A function to write the buffered games to the file."""
+        self.log_file.write(self.buffer)
+        self.log_file.flush()
+        self.buffer.clear()
+
+    def close(self) -> None:
+        """A function to write the buffered games and close the file."""
+        self.flush()
+        self.log_file.close()
+
+
+def readGames(path: str):
+    """A function to read the games in a log one at a time.
+
+    Only one record is read from the file at a time, so logs of any size can be read without loading them into memory.
+
+    Args:
+        path: the file of the game log
+
+    Yields:
+        a GameRecord for each game, in the order they were written, with the moves as bytes.
+
+    Raises:
+        ValueError: an error that occurs when the file ends part way through a record.
+    """
+    with open(path, "rb") as log_file:
+        while True:
+            header = log_file.read(RECORD_HEADER.size)
+            if not header:
+                return
+
+            if len(header) < RECORD_HEADER.size:
+                raise ValueError(f"{path} ends part way through a record")
+            timestamp, size, win_length, winner, p1length, p2length, num_moves = RECORD_HEADER.unpack(header)
+
+            body = log_file.read(p1length + p2length + num_moves)
+            if len(body) < p1length + p2length + num_moves:
+                raise ValueError(f"{path} ends part way through a record")
+
+            yield GameRecord(timestamp, body[:p1length].decode(), body[p1length:p1length + p2length].decode(), size,
+                             win_length, WINNERS[winner], body[p1length + p2length:])
+
+
+def replayGame(record: GameRecord, renderer=None) -> Boardclass:
+    """A function to play the moves of a recorded game on a new gameboard object.
+
+    Args:
+        record: the game to replay
+        renderer: the renderer that draws each move, which defaults to drawing nothing
+
+    Returns:
+        the gameboard object with every move of the game made.
+    """
+    renderer = renderer if renderer is not None else NullRenderer()
+    if (record.size, record.win_length) == (3, 3):
+        board = BitBoardclass(renderer=renderer)
+    else:
+        board = Boardclass(size=record.size, win_length=record.win_length, renderer=renderer)
+
+    board.resetGameBoard()
+    for turn, space in enumerate(record.moves):
+        board.updateGameBoard(divmod(space, record.size), "X" if turn % 2 == 0 else "O")
+
+    return board
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay the games in a game log.")
+    parser.add_argument("path", help="the file of the game log")
+    parser.add_argument("--show", action="store_true", help="draw the board after every move")
+    args = parser.parse_args()
+
+    for game in readGames(args.path):
+        played = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(game.timestamp))
+        print(f"{played} {game.p1username} (X) vs {game.p2username} (O), winner: {game.winner or 'tie'}")
+        replayGame(game, BufferedRenderer() if args.show else None)
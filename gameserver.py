@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from collections import deque
+from computerplayer import ComputerPlayer
+from endgame import EndgameTable
+from gameboard import Boardclass
+from gamestate import GameState
+from protocol import (MSG_GAME_OVER, MSG_HELLO, MSG_MOVE, MSG_REMATCH, FrameReader, ProtocolError, encodeGameOver,
+                      encodeHello, encodeMove)
+from statsstore import StatsStore
+from turnloop import ClockTimeout, GameClock
+
+
+class Match:
+    """A class to run the games between one connected Player 1 and the server playing Player 2.
+
+    Each match has its own GameState, which keeps the memory of each match small when the server holds very many, and
+    the server's moves are chosen by the engine shared by every match.
+    Uses the same messages as player2.py, so an unchanged Player 1 can connect to the server. Player 1 loses a game
+    they do not move in before their clock runs out, and a match that waits too long for player 1 is closed, so
+    abandoned connections do not hold on to their match.
+    """
+
+    def __init__(self, server: "GameServer", reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Initializes the match variables.
+
+        Sets the server the match belongs to, the streams of the connection to player 1 and the reader that splits
+        the data received into messages, player 1's username, and creates the game state and the clock of the match.
+        """
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.frame_reader = FrameReader()
+        self.messages = deque()
+        self.p1username = ""
+        self.p1symbol = "X"
+        self.p2symbol = "O"
+        self.board = GameState(current_player=server.username, player_symbol=self.p2symbol, other_symbol=self.p1symbol)
+        self.clock = GameClock(server.move_time, server.game_time, server.rematch_time)
+
+    async def sendData(self, data: bytes) -> None:
+        """A function to send a message to player 1.
+
+        Args:
+            data: the bytes of a frame made by one of the encode functions in protocol.py.
+        """
+        self.writer.write(data)
+        await self.writer.drain()
+
+    async def receiveData(self, message_type: int, deadline: float = None):
+        """A function to receive a message from player 1.
+
+        Args:
+            message_type: the type of message expected from player 1
+            deadline: the time.monotonic() time the message has to arrive by, or None to wait for as long as it takes
+
+        Returns:
+            the decoded value of the message sent from player 1.
+
+        Raises:
+            ConnectionError: an error that occurs when player 1 has disconnected.
+            ProtocolError: an error that occurs when the message is not of the expected type.
+            asyncio.TimeoutError: an error that occurs when the message has not arrived by the deadline.
+            ClockTimeout: an error that occurs when player 1 says they ran out of time.
+        """
+        while not self.messages:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            data = await asyncio.wait_for(self.reader.read(4096), timeout)
+            if not data:
+                raise ConnectionError("Player 1 disconnected")
+            self.messages.extend(self.frame_reader.feed(data))
+
+        received_type, value = self.messages.popleft()
+        if received_type == MSG_GAME_OVER:
+            raise ClockTimeout(self.p1symbol)
+        if received_type != message_type:
+            raise ProtocolError(f"Expected message type {message_type}, received {received_type}")
+
+        return value
+
+    async def sendUsername(self) -> None:
+        """A function to exchange usernames with player 1, who has as long to say hello as to make a move.
+
+        Raises:
+            ProtocolError: an error that occurs when player 1 plays on a board other than 3x3 with 3 in a row, which
+            ends the match after player 1 is sent the server's board.
+        """
+        size, win_length, username = await self.receiveData(MSG_HELLO, self.clock.startTurn(self.p1symbol, True))
+        self.p1username = sys.intern(username)
+        await self.sendData(encodeHello(self.server.username))
+        if (size, win_length) != (3, 3):
+            raise ProtocolError(f"{username} plays on a {size}x{size} board with {win_length} in a row")
+
+    def checkBoard(self, symbol: str) -> bool:
+        """A function to check the board for a win or a tie after a move.
+
+        Updates the stats of the match, the server and player 1 when the game is over.
+
+        Args:
+            symbol: the symbol of the player that just moved
+
+        Returns:
+            True if a win or a tie is detected.
+        """
+        outcome = ""
+        if self.board.isWinner(symbol) is True:
+            outcome = "win" if symbol == self.p2symbol else "loss"
+        elif self.board.boardIsFull() is True:
+            outcome = "tie"
+
+        if outcome == "":
+            return False
+
+        if outcome == "win":
+            self.board.num_wins += 1
+        elif outcome == "loss":
+            self.board.num_losses += 1
+        self.server.endGame(outcome, self.p1username)
+
+        return True
+
+    async def playGame(self) -> None:
+        """A function to play one game against player 1.
+
+        Player 1 moves first. Each move received is checked before it is added to the board, and the engine's reply is
+        sent back until the game is won or tied. When player 1 runs out of time, the game is recorded as a win for the
+        server and player 1 is told the game is over.
+
+        Raises:
+            ValueError: an error that occurs when player 1 sends a move that is not on the board or is taken.
+            asyncio.TimeoutError: an error that occurs when player 1 runs out of time, which ends the match.
+            ClockTimeout: an error that occurs when player 1 says they ran out of time, which ends the match.
+        """
+        self.board.clearGameBoard()
+        self.board.updateGamesPlayed()
+        self.server.stats.updateGamesPlayed()
+        self.clock.startGame()
+
+        while True:
+            try:
+                row, column = await self.receiveData(MSG_MOVE, self.clock.startTurn(self.p1symbol, True))
+            except (asyncio.TimeoutError, ClockTimeout):
+                self.board.num_wins += 1
+                self.server.endGame("win", self.p1username)
+                self.writer.write(encodeGameOver("win"))
+                raise
+            self.clock.endTurn()
+            if not (0 <= row < 3 and 0 <= column < 3) or self.board.checkMove(row, column) is False:
+                raise ValueError(f"Invalid move from {self.p1username}: {row},{column}")
+
+            self.board.last_player = self.p1username
+            self.board.placeMove(row, column, self.p1symbol)
+            if self.checkBoard(self.p1symbol) is True:
+                return
+
+            row, column = self.server.engine.chooseMove(self.board, self.p2symbol, self.p1symbol)
+            self.board.last_player = self.server.username
+            self.board.placeMove(row, column, self.p2symbol)
+            await self.sendData(encodeMove(row, column))
+            if self.checkBoard(self.p2symbol) is True:
+                return
+
+    async def run(self) -> None:
+        """A function to play games with player 1 until they stop playing or disconnect."""
+        try:
+            await self.sendUsername()
+
+            while True:
+                await self.playGame()
+                if await self.receiveData(MSG_REMATCH, self.clock.rematchDeadline()) is False:
+                    break
+
+        except (ConnectionError, ProtocolError, ValueError, asyncio.TimeoutError, ClockTimeout):
+            pass
+
+        finally:
+            self.writer.close()
+
+
+class GameServer:
+    """A class to host games for many Player 1 clients at once.
+
+    Accepts connections with asyncio so one process can hold thousands of idle and active matches without a thread per
+    connection. Each client is put into its own match against the server, which plays Player 2.
+    """
+
+    def __init__(self, engine=None, username: str = "server", stats_store=None, move_time: float = None,
+                 game_time: float = None, rematch_time: float = None) -> None:
+        """Initializes the server variables.
+
+        Sets the engine used to choose the server's moves, the server's username, the StatsStore that keeps the
+        lifetime stats of each player, the time limits of player 1 in each match, which are passed to its GameClock,
+        the set of running matches, and a gameboard object that holds the stats of every game the server has played.
+        """
+        self.engine = engine if engine is not None else ComputerPlayer()
+        self.username = username
+        self.stats_store = stats_store
+        self.move_time = move_time
+        self.game_time = game_time
+        self.rematch_time = rematch_time
+        self.matches = set()
+        self.stats = Boardclass(current_player=username)
+
+    def endGame(self, outcome: str, p1username: str) -> None:
+        """A function to add the outcome of a finished game to the server's stats and the stats store.
+
+        Args:
+            outcome: a string that dictates the result of the game for the server, which is either a tie, a win, or a
+            loss.
+            p1username: the username of the player the game was against
+        """
+        if self.stats_store is not None:
+            self.stats_store.recordGame(self.username, outcome)
+            self.stats_store.recordGame(p1username, {"win": "loss", "loss": "win"}.get(outcome, outcome))
+
+        if outcome == "tie":
+            self.stats.num_ties += 1
+        elif outcome == "win":
+            self.stats.num_wins += 1
+        elif outcome == "loss":
+            self.stats.num_losses += 1
+
+    async def handleClient(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """A function to start a match for a newly connected client and run it until it ends."""
+        match = Match(self, reader, writer)
+        self.matches.add(match)
+
+        try:
+            await match.run()
+        finally:
+            self.matches.discard(match)
+
+    async def serve(self, host: str, port: int, sock: socket.socket = None) -> None:
+        """A function to accept clients on the host and port until the server is stopped.
+
+        Args:
+            host: the host name or IP address to listen on
+            port: the port to listen on
+            sock: a listening socket to accept clients on instead of binding the host and port
+        """
+        if sock is not None:
+            server = await asyncio.start_server(self.handleClient, sock=sock, backlog=4096)
+        else:
+            server = await asyncio.start_server(self.handleClient, host, port, backlog=4096)
+            print(f"Serving games on {host}:{port}")
+
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host tic-tac-toe games against the computer for many players.")
+    parser.add_argument("--host", default="0.0.0.0", help="the host name or IP address to listen on")
+    parser.add_argument("--port", type=int, default=5000, help="the port to listen on")
+    parser.add_argument("--username", default="server", help="the username sent to each player")
+    parser.add_argument("--endgame-table", help="an endgame table written by endgame.py to choose moves from")
+    parser.add_argument("--stats-db", help="an SQLite file to keep each player's lifetime stats in")
+    parser.add_argument("--move-clock", type=float, default=60.0,
+                        help="the seconds player 1 has for a move before losing the game on time, or 0 for no limit")
+    parser.add_argument("--game-clock", type=float, default=0.0,
+                        help="the seconds player 1 has for all their moves in a game, or 0 for no limit")
+    parser.add_argument("--rematch-timeout", type=float, default=60.0,
+                        help="the seconds to wait for player 1 to say whether they will play again, or 0 for no limit")
+    args = parser.parse_args()
+
+    if args.move_clock < 0 or args.game_clock < 0 or args.rematch_timeout < 0:
+        parser.error("the clocks must not be negative")
+
+    game_server = GameServer(EndgameTable(args.endgame_table) if args.endgame_table else None, args.username,
+                             StatsStore(args.stats_db) if args.stats_db else None, args.move_clock or None,
+                             args.game_clock or None, args.rematch_timeout or None)
+    try:
+        asyncio.run(game_server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        game_server.stats.printStats(game_server.stats_store)
+        if game_server.stats_store is not None:
+            game_server.stats_store.close()
@@ -0,0 +1,227 @@
+import struct
+import sys
+from gameboard import WINNING_POSITIONS
+
+# The stats at the start of a snapshot: games played, wins, losses and ties.
+SNAPSHOT_HEADER = struct.Struct("!IIII")
+
+# One tuple of the player, symbols and board size for each combination in use, shared by every GameState that has it.
+METADATA = {}
+
+# For each (size, win_length), the bit masks of the winning lines through each space, made the first time a
+# GameState of that size is created.
+LINE_MASKS = {}
+
+
+def lineMasks(size: int, win_length: int) -> list:
+    """A function to get the bit masks of every line of win_length spaces through each space of a board.
+
+    Args:
+        size: the number of rows and columns of the board
+        win_length: the number of symbols in a row needed to win
+
+    Returns:
+        a list with a tuple of line masks for each space, numbered as row * size + column.
+    """
+    lines = LINE_MASKS.get((size, win_length))
+    if lines is None:
+        lines = [[] for _ in range(size * size)]
+        for row in range(size):
+            for column in range(size):
+                for row_step, column_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row = row + row_step * (win_length - 1)
+                    end_column = column + column_step * (win_length - 1)
+                    if not (0 <= end_row < size and 0 <= end_column < size):
+                        continue
+                    spaces = [(row + row_step * step) * size + column + column_step * step
+                              for step in range(win_length)]
+                    mask = sum(1 << space for space in spaces)
+                    for space in spaces:
+                        lines[space].append(mask)
+        lines = [tuple(space_lines) for space_lines in lines]
+        LINE_MASKS[(size, win_length)] = lines
+
+    return lines
+
+
+class GameState:
+    """A class to hold the state of a game in as little memory as possible, for hosts that keep very many games.
+
+    Has the variables of Boardclass other than winner and renderer, and the board functions a host plays a game with:
+    updateGamesPlayed(), clearGameBoard(), placeMove(), checkMove(), isWinner() and boardIsFull(). The functions that
+    draw the board or read a typed move, resetGameBoard(), updateGameBoard() and decodeMove(), are left out. It uses
+    __slots__ instead of a dictionary for each object. The whole board is one integer: X's spaces are the low
+    size * size bits, O's spaces are the next size * size bits, and the spaces moved in are a byte each above them, in
+    order. The player, the symbols and the board size are kept in a tuple of interned strings and integers shared by
+    every game that has the same ones. There is no renderer; gameboard builds the rows of the board when they are asked
+    for, so engines and renderers that read it still work.
+
+    snapshot() packs the board and the stats into a few dozen bytes, so a host can park an idle game and restore() it
+    into any GameState with the same metadata later.
+    """
+
+    __slots__ = ("metadata", "last_player", "num_games", "num_wins", "num_losses", "num_ties", "cells")
+
+    def __init__(self, current_player: str = "", last_player: str = "", player_symbol: str = "", other_symbol: str = "",
+                 num_games: int = 0, num_wins: int = 0, num_losses: int = 0, num_ties: int = 0, size: int = 3,
+                 win_length: int = 3) -> None:
+        """Initializes the same variables as Boardclass, with an empty board.
+
+        Raises:
+            ValueError: an error that occurs when the board has more than 256 spaces, so a move does not fit in a byte.
+        """
+        if size * size > 256:
+            raise ValueError("Boards with more than 256 spaces are not supported")
+
+        metadata = (sys.intern(current_player), sys.intern(player_symbol), sys.intern(other_symbol), size, win_length)
+        self.metadata = METADATA.setdefault(metadata, metadata)
+        self.last_player = sys.intern(last_player)
+        self.num_games = num_games
+        self.num_wins = num_wins
+        self.num_losses = num_losses
+        self.num_ties = num_ties
+        self.cells = 0
+        lineMasks(size, win_length)
+
+    @property
+    def current_player(self) -> str:
+        """The player the game belongs to."""
+        return self.metadata[0]
+
+    @property
+    def symbol(self) -> str:
+        """The symbol of the player the game belongs to."""
+        return self.metadata[1]
+
+    @property
+    def other_symbol(self) -> str:
+        """The symbol of the other player."""
+        return self.metadata[2]
+
+    @property
+    def size(self) -> int:
+        """The number of rows and columns of the board."""
+        return self.metadata[3]
+
+    @property
+    def win_length(self) -> int:
+        """The number of symbols in a row needed to win."""
+        return self.metadata[4]
+
+    @property
+    def moves(self) -> bytes:
+        """The spaces moved in so far, in order, numbered as row * size + column."""
+        spaces = self.metadata[3] * self.metadata[3]
+        num_moves = (self.cells & ((1 << 2 * spaces) - 1)).bit_count()
+        return (self.cells >> 2 * spaces).to_bytes(num_moves, "little")
+
+    @property
+    def masks(self) -> dict:
+        """A dictionary mapping each symbol to the bit mask of the spaces it holds, like BitBoardclass.masks."""
+        spaces = self.metadata[3] * self.metadata[3]
+        full = (1 << spaces) - 1
+        return {"X": self.cells & full, "O": self.cells >> spaces & full}
+
+    @property
+    def gameboard(self) -> list:
+        """The rows of the board as lists of symbols, with a space for an empty space, built from the packed board."""
+        size = self.metadata[3]
+        masks = self.masks
+        return [["X" if masks["X"] >> space & 1 else "O" if masks["O"] >> space & 1 else " "
+                 for space in range(row * size, (row + 1) * size)] for row in range(size)]
+
+    @property
+    def empty_spaces(self) -> int:
+        """The number of spaces no one has moved in."""
+        spaces = self.metadata[3] * self.metadata[3]
+        return spaces - (self.cells & ((1 << 2 * spaces) - 1)).bit_count()
+
+    def updateGamesPlayed(self) -> None:
+        """A function to increment the number of games played by 1."""
+        self.num_games += 1
+
+    def clearGameBoard(self) -> None:
+        """A function to clear every space and the moves of the board."""
+        self.cells = 0
+
+    def placeMove(self, row: int, column: int, symbol: str) -> None:
+        """A function to add a move to the board.
+
+        Args:
+            row: the integer representing the row of the move
+            column: the integer representing the column of the move
+            symbol: the string 'X' or 'O', representing the symbol of the player making the move
+        """
+        spaces = self.metadata[3] * self.metadata[3]
+        space = row * self.metadata[3] + column
+        num_moves = (self.cells & ((1 << 2 * spaces) - 1)).bit_count()
+        self.cells |= 1 << (space if symbol == "X" else space + spaces) | space << (2 * spaces + 8 * num_moves)
+
+    def checkMove(self, row: int, column: int) -> bool:
+        """A function to check if a space is empty.
+
+        Returns:
+            boolean: If the space is empty, returns true. If the space is taken, returns False.
+        """
+        spaces = self.metadata[3] * self.metadata[3]
+        space = row * self.metadata[3] + column
+        return not (self.cells >> space | self.cells >> (space + spaces)) & 1
+
+    def isWinner(self, symbol: str) -> bool:
+        """A function to detect when a move results in a win.
+
+        On a 3x3 board, looks up the spaces held by the symbol in the table of winning positions. On other boards, only
+        the lines through the symbol's last move are checked.
+
+        Args:
+            symbol: the symbol of the player making the move.
+
+        Returns:
+            True if the designated symbol in the argument has win_length in a row.
+        """
+        _, _, _, size, win_length = self.metadata
+        mask = self.masks.get(symbol, 0)
+        if (size, win_length) == (3, 3):
+            return WINNING_POSITIONS[mask]
+
+        for space in reversed(self.moves[-2:]):
+            if mask >> space & 1:
+                return any(mask & line == line for line in LINE_MASKS[(size, win_length)][space])
+
+        return False
+
+    def boardIsFull(self) -> bool:
+        """
+        A function to check whether all the spaces are filled in a board and increments the tie count.
+
+        Returns:
+             True if all the spaces are taken, False if not.
+        """
+        if self.empty_spaces == 0:
+            self.num_ties += 1
+            return True
+        else:
+            return False
+
+    def snapshot(self) -> bytes:
+        """A function to pack the stats and the board into bytes.
+
+        The player names and the last player are not included, since they are shared by the games of a host.
+
+        Returns:
+            the bytes to pass to restore().
+
+        Raises:
+            struct.error: an error that occurs when a stat does not fit in 32 bits.
+        """
+        return (SNAPSHOT_HEADER.pack(self.num_games, self.num_wins, self.num_losses, self.num_ties)
+                + self.cells.to_bytes((self.cells.bit_length() + 7) // 8, "little"))
+
+    def restore(self, snapshot: bytes) -> None:
+        """A function to put back the stats and the board packed by snapshot().
+
+        Args:
+            snapshot: the bytes returned by snapshot() for a game of the same size
+        """
+        self.num_games, self.num_wins, self.num_losses, self.num_ties = SNAPSHOT_HEADER.unpack_from(snapshot)
+        self.cells = int.from_bytes(snapshot[SNAPSHOT_HEADER.size:], "little")
@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import ipaddress
+import random
+import socket
+import time
+from collections import Counter, deque
+from gameboard import BitBoardclass
+from gameserver import GameServer
+from protocol import MSG_HELLO, MSG_MOVE, FrameReader, ProtocolError, encodeHello, encodeMove, encodeRematch
+from renderer import NullRenderer
+from timings import summarize
+from tournament import STRATEGIES
+
+
+class Bot:
+    """A class to play games against a game host as a scripted Player 1.
+
+    Sends the same messages as player1.py: the username, then a move and a reply for each turn, and a rematch message
+    after each game. Moves are chosen by a strategy from tournament.py after an optional think time.
+    """
+
+    def __init__(self, username: str, strategy, games: int, rematch_rate: float, think_time: float, timeout: float,
+                 rng: random.Random) -> None:
+        """Initializes the bot variables.
+
+        Args:
+            username: the username sent to the host
+            strategy: the engine that chooses the bot's moves
+            games: the largest number of games the bot plays
+            rematch_rate: the chance of asking to play again after each game, until the bot has played all its games
+            think_time: the longest time in seconds the bot waits before each move, picked at random
+            timeout: the number of seconds to wait for the host before giving up
+            rng: the random number generator for think times and rematches
+        """
+        self.username = username
+        self.strategy = strategy
+        self.games = games
+        self.rematch_rate = rematch_rate
+        self.think_time = think_time
+        self.timeout = timeout
+        self.rng = rng
+        self.board = BitBoardclass(player_symbol="X", other_symbol="O", renderer=NullRenderer())
+        self.frame_reader = FrameReader()
+        self.messages = deque()
+        self.reader = None
+        self.writer = None
+
+    async def receiveData(self, message_type: int):
+        """A function to receive a message from the host.
+
+        Raises:
+            ConnectionError: an error that occurs when the host has disconnected.
+            ProtocolError: an error that occurs when the message is not of the expected type.
+            asyncio.TimeoutError: an error that occurs when the host does not answer in time.
+        """
+        while not self.messages:
+            data = await asyncio.wait_for(self.reader.read(4096), self.timeout)
+            if not data:
+                raise ConnectionError("Host disconnected")
+            self.messages.extend(self.frame_reader.feed(data))
+
+        received_type, value = self.messages.popleft()
+        if received_type != message_type:
+            raise ProtocolError(f"Expected message type {message_type}, received {received_type}")
+
+        return value
+
+    def gameOver(self, symbol: str) -> bool:
+        """A function to check if the last move of a symbol won the game or filled the board."""
+        return self.board.isWinner(symbol) is True or self.board.occupied == 0b111111111
+
+    async def playGame(self, latencies: list) -> None:
+        """A function to play one game, adding the time taken for the host to reply to each move to latencies.
+
+        Raises:
+            ValueError: an error that occurs when the host replies with a move that is not on the board or is taken.
+        """
+        self.board.clearGameBoard()
+
+        while True:
+            if self.think_time:
+                await asyncio.sleep(self.rng.uniform(0, self.think_time))
+
+            row, column = self.strategy.chooseMove(self.board, "X", "O")
+            self.board.placeMove(row, column, "X")
+            start = time.perf_counter_ns()
+            self.writer.write(encodeMove(row, column))
+            if self.gameOver("X") is True:
+                return
+
+            row, column = await self.receiveData(MSG_MOVE)
+            latencies.append(time.perf_counter_ns() - start)
+            if not (0 <= row < 3 and 0 <= column < 3) or self.board.checkMove(row, column) is False:
+                raise ValueError(f"Invalid move from the host: {row},{column}")
+            self.board.placeMove(row, column, "O")
+            if self.gameOver("O") is True:
+                return
+
+    async def run(self, address: tuple, results: "LoadResults") -> None:
+        """A function to connect to the host and play until the bot is done, counting the results.
+
+        Args:
+            address: the host name or IP address and the port of the host
+            results: the results shared by every bot
+        """
+        try:
+            self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(*address), self.timeout)
+            self.writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.writer.write(encodeHello(self.username))
+            await self.receiveData(MSG_HELLO)
+
+            for game in range(self.games):
+                await self.playGame(results.latencies)
+                results.games += 1
+
+                play_again = game + 1 < self.games and self.rng.random() < self.rematch_rate
+                self.writer.write(encodeRematch(play_again))
+                if play_again is False:
+                    break
+            await self.writer.drain()
+
+        except (ConnectionError, ProtocolError, ValueError, asyncio.TimeoutError, OSError) as error:
+            results.errors[type(error).__name__] += 1
+
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+
+class LoadResults:
+    """A class to hold the results of a load test."""
+
+    def __init__(self) -> None:
+        """Initializes the number of games finished, the reply time of each move in nanoseconds, and the number of
+        each type of error."""
+        self.games = 0
+        self.latencies = []
+        self.errors = Counter()
+
+
+def checkLocalhost(host: str) -> None:
+    """A function to make sure a host name only points at this machine.
+
+    Raises:
+        ValueError: an error that occurs when the host resolves to an address that is not a loopback address.
+    """
+    for info in socket.getaddrinfo(host, None):
+        if not ipaddress.ip_address(info[4][0]).is_loopback:
+            raise ValueError(f"{host} is not a loopback address; the load generator only runs on localhost")
+
+
+async def runLoad(host: str, port: int, clients: int, games: int, strategy: str, rematch_rate: float,
+                  think_time: float, timeout: float, username_prefix: str = "bot", seed: int = 0) -> tuple:
+    """A function to play games against a game host with many bots at once.
+
+    When port is 0, a GameServer is started in the same process on a free port of the host and stopped afterwards.
+
+    Args:
+        host: the loopback host name or IP address of the game host
+        port: the port of the game host, or 0 to start one
+        clients: the number of bots connected at once
+        games: the largest number of games each bot plays
+        strategy: the name of the strategy in tournament.STRATEGIES the bots play with
+        rematch_rate: the chance of each bot asking to play again after each game
+        think_time: the longest time in seconds each bot waits before each move
+        timeout: the number of seconds a bot waits for the host before giving up
+        username_prefix: the start of each bot's username, which is followed by the number of the bot
+        seed: the seed of the random number generators of the bots
+
+    Returns:
+        (results, seconds): a tuple of the LoadResults and the time the test took.
+    """
+    checkLocalhost(host)
+
+    server = None
+    if port == 0:
+        server = await asyncio.start_server(GameServer().handleClient, host, 0, backlog=4096)
+        port = server.sockets[0].getsockname()[1]
+
+    # Every bot shares one engine, except random bots, which each get their own seeded random number generator.
+    shared_engine = STRATEGIES[strategy]()
+    bots = []
+    for index in range(clients):
+        engine = shared_engine
+        if strategy == "random":
+            engine = STRATEGIES[strategy]()
+            engine.rng.seed(f"{seed}-{index}-moves")
+        bots.append(Bot(f"{username_prefix}{index}", engine, games, rematch_rate, think_time, timeout,
+                        random.Random(f"{seed}-{index}")))
+
+    results = LoadResults()
+    start = time.perf_counter()
+    await asyncio.gather(*(bot.run((host, port), results) for bot in bots))
+    seconds = time.perf_counter() - start
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    return results, seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many scripted player 1 bots against a game host on this machine.")
+    parser.add_argument("--host", default="127.0.0.1", help="the loopback host name or IP address of the game host")
+    parser.add_argument("--port", type=int, default=0,
+                        help="the port of a running gameserver.py, or 0 to start a game server in this process")
+    parser.add_argument("--clients", type=int, default=1000, help="the number of bots connected at once")
+    parser.add_argument("--games", type=int, default=10, help="the largest number of games each bot plays")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="random", help="the strategy the bots play")
+    parser.add_argument("--rematch-rate", type=float, default=1.0,
+                        help="the chance of a bot asking to play again after each game")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="the longest time in seconds a bot waits before each move")
+    parser.add_argument("--timeout", type=float, default=10.0, help="the seconds a bot waits for the host")
+    parser.add_argument("--username-prefix", default="bot", help="the start of each bot's username")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the bots' random choices")
+    args = parser.parse_args()
+
+    try:
+        load_results, elapsed = asyncio.run(runLoad(args.host, args.port, args.clients, args.games, args.strategy,
+                                                    args.rematch_rate, args.think_time, args.timeout, args.username_prefix,
+                                                    args.seed))
+    except ValueError as error:
+        parser.error(str(error))
+
+    print(f"Games: {load_results.games} in {elapsed:.2f}s ({load_results.games / elapsed:.0f} games per second)")
+    if load_results.latencies:
+        latency = summarize(load_results.latencies)
+        print(f"Move latency: p50 {latency['p50_ns'] / 1e6:.2f}ms  p90 {latency['p90_ns'] / 1e6:.2f}ms  "
+              f"p99 {latency['p99_ns'] / 1e6:.2f}ms  max {latency['max_ns'] / 1e6:.2f}ms")
+    print(f"Errors: {sum(load_results.errors.values())}"
+          + "".join(f"  {name}: {count}" for name, count in load_results.errors.items()))
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+from collections import deque
+from protocol import FRAME_HEADER, MSG_JOIN, ProtocolError, decodePayload, encodeMatch
+
+
+class Lobby:
+    """A class to pair players that connect to one address into matches.
+
+    Each client joins as player 1 or player 2 with a username and a rating. Players waiting for a match are kept in
+    first-in first-out queues indexed by role and rating band, so a join only looks at the front of a few queues no
+    matter how many players are waiting. The longer a player waits, the further away the bands they look in, so a
+    player whose rating is far from everyone else's is still paired. Once two players are paired, each is sent the
+    other's username and the lobby passes the bytes of their game between them unchanged.
+    """
+
+    def __init__(self, rating_band: int = 100, widen_interval: float = 5.0) -> None:
+        """Initializes the lobby variables.
+
+        Sets the width of the rating bands a player is matched within, how often a waiting player looks one band
+        further away, the queues of waiting players for each role and band, and the number of matches made.
+
+        Args:
+            rating_band: players are paired with players in the same or a neighbouring band of this many rating
+            points; 0 pairs players in the order they join regardless of rating
+            widen_interval: the seconds a player waits before each widening of the bands they can be paired from
+        """
+        self.rating_band = rating_band
+        self.widen_interval = widen_interval
+        self.queues = {1: {}, 2: {}}
+        self.num_matches = 0
+
+    def ratingBand(self, rating: int) -> int:
+        """A function to find the band of a rating, which is 0 for every rating when bands are turned off."""
+        return rating // self.rating_band if self.rating_band else 0
+
+    def findOpponent(self, role: int, rating: int, reach: int = 1):
+        """A function to take the longest waiting player that can be paired with a player.
+
+        Looks at the queues of the other role in the player's rating band and then the bands on either side, out to
+        reach bands away, nearest first, so a search costs at most 2 * reach + 1 lookups however many bands are in use.
+        Players that disconnected while waiting or were paired by widening their own
+        search are dropped from the front of the queues as they are found.
+
+        Args:
+            role: the player number the player plays as
+            rating: the rating of the player
+            reach: the number of bands on either side of the player's band to look in
+
+        Returns:
+            the (username, writer, match) entry of the waiting player, or None if nobody can be paired yet.
+        """
+        queues = self.queues[3 - role]
+        band = self.ratingBand(rating)
+        nearby_bands = [band]
+        for distance in range(1, reach + 1):
+            nearby_bands += (band - distance, band + distance)
+
+        for nearby_band in nearby_bands:
+            queue = queues.get(nearby_band)
+            while queue:
+                entry = queue.popleft()
+                if not entry[2].done():
+                    return entry
+            if queue is not None:
+                del queues[nearby_band]
+
+        return None
+
+    async def readJoin(self, reader: asyncio.StreamReader) -> tuple:
+        """A function to read the join message a client sends when it connects.
+
+        Only the bytes of the join frame are read, so everything after it is left for the opponent.
+
+        Returns:
+            a (role, rating, username) tuple.
+
+        Raises:
+            ProtocolError: an error that occurs when the first message is not a valid join.
+        """
+        length, message_type = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+        if message_type != MSG_JOIN or length == 0:
+            raise ProtocolError(f"Expected message type {MSG_JOIN}, received {message_type}")
+
+        role, rating, username = decodePayload(message_type, await reader.readexactly(length - 1))
+        if role not in (1, 2) or not username.isalnum():
+            raise ProtocolError(f"Invalid join as player {role} with username {username!r}")
+
+        return role, rating, username
+
+    async def relay(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """A function to pass everything one player sends to their opponent until either of them disconnects.
+
+        Args:
+            reader: the stream of the player sending
+            writer: the stream of the opponent
+        """
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handleClient(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """A function to put a newly connected client into a match and pass on its moves for as long as it plays.
+
+        A client that can be paired straight away is matched with the longest waiting opponent. Otherwise it waits in
+        the queue of its role and rating band until another client is paired with it, looking for an opponent one band
+        further away every widen_interval seconds, or leaves the queue if it disconnects first. Anything the client
+        sends while it waits is kept and passed on to its opponent before the rest of the game.
+        """
+        try:
+            role, rating, username = await self.readJoin(reader)
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+            writer.close()
+            return
+
+        early_data = bytearray()
+        opponent = self.findOpponent(role, rating)
+        if opponent is None:
+            match = asyncio.get_running_loop().create_future()
+            self.queues[role].setdefault(self.ratingBand(rating), deque()).append((username, writer, match))
+
+            # Reading is the only way to notice a disconnect, so the bytes read while waiting are kept for the opponent.
+            received = asyncio.ensure_future(reader.read(4096))
+            reach = 1
+            disconnected = False
+            while True:
+                await asyncio.wait((match, received), timeout=self.widen_interval or None,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if received.done():
+                    data = received.result() if not received.exception() else b""
+                    if not data or len(early_data) + len(data) > 65536:
+                        disconnected = True
+                        break
+                    early_data += data
+                    received = asyncio.ensure_future(reader.read(4096))
+                    continue
+                if match.done():
+                    break
+                reach += 1
+                opponent = self.findOpponent(role, rating, reach)
+                if opponent is not None:
+                    # Cancelling the match drops this player from its queue, since it pairs with the opponent itself.
+                    match.cancel()
+                    break
+
+            if disconnected is True and not match.done():
+                match.cancel()
+                writer.close()
+                return
+
+            received.cancel()
+            await asyncio.wait((received,))
+            if not received.cancelled() and not received.exception():
+                early_data += received.result()
+            if opponent is None:
+                opponent_writer = match.result()
+
+        if opponent is not None:
+            # Both players are told about the match before either can send a move to the other.
+            opponent_username, opponent_writer, opponent_match = opponent
+            opponent_writer.write(encodeMatch(username))
+            writer.write(encodeMatch(opponent_username))
+            opponent_match.set_result(writer)
+            self.num_matches += 1
+
+        if early_data:
+            opponent_writer.write(early_data)
+        await self.relay(reader, opponent_writer)
+
+    async def serve(self, host: str, port: int) -> None:
+        """A function to accept clients on the host and port until the lobby is stopped.
+
+        Args:
+            host: the host name or IP address to listen on
+            port: the port to listen on
+        """
+        server = await asyncio.start_server(self.handleClient, host, port, backlog=4096)
+        print(f"Lobby open on {host}:{port}")
+
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pair tic-tac-toe players into matches.")
+    parser.add_argument("--host", default="0.0.0.0", help="the host name or IP address to listen on")
+    parser.add_argument("--port", type=int, default=6000, help="the port to listen on")
+    parser.add_argument("--rating-band", type=int, default=100,
+                        help="the width of the rating bands players are paired within, or 0 to pair in join order")
+    parser.add_argument("--widen-interval", type=float, default=5.0,
+                        help="the seconds a waiting player waits before each widening of their search by one band")
+    args = parser.parse_args()
+
+    lobby = Lobby(args.rating_band, args.widen_interval)
+    try:
+        asyncio.run(lobby.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"Matches made: {lobby.num_matches}")
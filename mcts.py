@@ -0,0 +1,354 @@
+import math
+import random
+import time
+from array import array
+from gameboard import Boardclass
+
+
+class PlayoutBoard:
+    """A class to play random games quickly from a position on a board of any size.
+
+    Holds the size and win length of a Boardclass board along with, for every space, the spaces on either side of it
+    in each direction, so checking a move for a win only looks at the lines through it. Positions are bytearrays with
+    one byte for each space, counting across each row, which is 0 for an empty space, 1 for the engine's symbol and 2
+    for the other symbol.
+    """
+
+    def __init__(self, size: int, win_length: int) -> None:
+        """Initializes the size and win length of the board and works out the lines through each space."""
+        self.size = size
+        self.win_length = win_length
+        self.lines = []
+
+        for space in range(size * size):
+            row, column = divmod(space, size)
+            lines = []
+            for row_step, column_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                sides = []
+                for direction in (1, -1):
+                    side = []
+                    for distance in range(1, win_length):
+                        next_row = row + row_step * direction * distance
+                        next_column = column + column_step * direction * distance
+                        if not (0 <= next_row < size and 0 <= next_column < size):
+                            break
+                        side.append(next_row * size + next_column)
+                    sides.append(tuple(side))
+                lines.append(tuple(sides))
+            self.lines.append(tuple(lines))
+
+    def readBoard(self, board: Boardclass, symbol: str, other_symbol: str) -> bytearray:
+        """A function to copy the spaces of a gameboard object into a position.
+
+        Args:
+            board: the gameboard object to copy
+            symbol: the symbol coded as 1
+            other_symbol: the symbol coded as 2
+
+        Returns:
+            the position of the board.
+        """
+        codes = {symbol: 1, other_symbol: 2}
+        return bytearray(codes.get(space, 0) for row in board.gameboard for space in row)
+
+    def completesLine(self, cells: bytearray, space: int, code: int) -> bool:
+        """A function to check if the symbol in a space is part of win_length or more in a row."""
+        for forward, backward in self.lines[space]:
+            count = 1
+            for other_space in forward:
+                if cells[other_space] != code:
+                    break
+                count += 1
+            for other_space in backward:
+                if cells[other_space] != code:
+                    break
+                count += 1
+            if count >= self.win_length:
+                return True
+
+        return False
+
+    def playout(self, cells: bytearray, code: int, rng: random.Random) -> int:
+        """A function to play random moves from a position until the game is over.
+
+        Args:
+            cells: the position to play from, which is changed in place
+            code: the code of the player to move
+            rng: the random number generator that orders the moves
+
+        Returns:
+            the code of the winner, or 0 for a tie.
+        """
+        spaces = [space for space, occupant in enumerate(cells) if occupant == 0]
+        rng.shuffle(spaces)
+
+        for space in spaces:
+            cells[space] = code
+            if self.completesLine(cells, space, code):
+                return code
+            code = 3 - code
+
+        return 0
+
+
+def emptySpaces(cells: bytearray) -> array:
+    """A function to list the empty spaces of a position, as one byte each on boards of up to 256 spaces."""
+    return array("B" if len(cells) <= 256 else "H", [space for space, occupant in enumerate(cells) if occupant == 0])
+
+
+class Node:
+    """A class to hold one position of the search tree, reached by a move from its parent."""
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "code", "result")
+
+    def reset(self, move: int, parent, code: int, untried: list, result: int) -> "Node":
+        """A function to set up the node for a new position, so that nodes can be reused.
+
+        Args:
+            move: the space moved in to reach the position, or -1 for the root
+            parent: the node of the position before the move, or None for the root
+            code: the code of the player that made the move
+            untried: the spaces that can be moved in from the position that have no node yet, or None until the node
+            is first expanded, since most nodes never are
+            result: the code of the winner or 0 for a tie if the game is over, and -1 otherwise
+
+        Returns:
+            the node.
+        """
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.code = code
+        self.result = result
+
+        return self
+
+
+class MCTSPlayer:
+    """A class to create a computer player that searches with Monte Carlo tree search, for boards of any size.
+
+    Until the time for a move runs out, the engine walks down the tree picking moves with UCT, adds a node for one new
+    move, and plays a random game from it on a PlayoutBoard, counting the result in every node on the way back up. The
+    move visited most often is then played. The tree is kept between moves and moved down to the position after each
+    move, and the nodes of positions that can no longer happen are reused, so the number of nodes never goes past a
+    fixed cap. When the cap is reached, the least visited subtrees are given back, so the search keeps growing the tree
+    where it matters. A node only lists its untried moves once it is expanded, in an array of one byte per space, so
+    most nodes hold no list at all.
+    """
+
+    def __init__(self, move_time: float = 1.0, max_nodes: int = 200000, exploration: float = 1.4,
+                 seed: int = None) -> None:
+        """Initializes the computer player.
+
+        Args:
+            move_time: the number of seconds to search for each move
+            max_nodes: the largest number of nodes in the tree, which must hold at least the root
+            exploration: how strongly moves with few visits are tried over moves with good results
+            seed: the seed of the random number generator, for repeatable games
+
+        Raises:
+            ValueError: an error that occurs when max_nodes is less than 1.
+        """
+        if max_nodes < 1:
+            raise ValueError("The tree must be allowed at least 1 node")
+
+        self.move_time = move_time
+        self.max_nodes = max_nodes
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.playout_board = None
+        self.root = None
+        self.root_cells = None
+        self.free_nodes = []
+        self.num_nodes = 0
+        self.last_score = 0
+        self.last_playouts = 0
+        self.playouts_per_second = 0.0
+
+    def newNode(self):
+        """A function to take a node to add to the tree.
+
+        Returns:
+            a node from the nodes given back by recycleTree(), a new node while the tree is under the cap, or None when
+            the cap is reached.
+        """
+        if self.free_nodes:
+            return self.free_nodes.pop()
+        if self.num_nodes < self.max_nodes:
+            self.num_nodes += 1
+            return Node()
+
+        return None
+
+    def recycleTree(self, node: Node, keep: Node = None) -> None:
+        """A function to give back the nodes of a tree so they can be reused.
+
+        Args:
+            node: the root of the tree to give back
+            keep: a node whose subtree is kept
+        """
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node is keep:
+                continue
+            stack.extend(node.children)
+            node.children = []
+            node.untried = None
+            node.parent = None
+            self.free_nodes.append(node)
+
+    def pruneTree(self) -> None:
+        """A function to give back the least visited subtrees once the tree has reached the cap.
+
+        Every subtree below the root's children whose top node has no more visits than half of the nodes is given
+        back, and its move is put back into the untried moves of its parent, so it can be searched again later.
+        """
+        visits = []
+        stack = [child for child in self.root.children]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children)
+            visits.append(node.visits)
+        if not visits:
+            return
+        threshold = sorted(visits)[len(visits) // 2]
+
+        stack = [child for child in self.root.children]
+        while stack:
+            node = stack.pop()
+            kept = []
+            for child in node.children:
+                if child.visits <= threshold:
+                    node.untried.append(child.move)
+                    self.recycleTree(child)
+                else:
+                    kept.append(child)
+            node.children = kept
+            stack.extend(kept)
+
+    def advance(self, move: tuple) -> None:
+        """A function to move the root of the tree down to the position after a move.
+
+        Called with every move made in the game, so the search done for the position the game reaches is kept.
+
+        Args:
+            move: the row and column of the move
+        """
+        if self.root is None:
+            return
+
+        space = move[0] * self.playout_board.size + move[1]
+        child = next((child for child in self.root.children if child.move == space), None)
+        self.root_cells[space] = 3 - self.root.code
+
+        self.recycleTree(self.root, child)
+        self.root = child
+        if child is not None:
+            child.parent = None
+
+    def selectChild(self, node: Node) -> Node:
+        """A function to pick the child of a node with the highest upper confidence bound."""
+        log_visits = math.log(node.visits)
+        best = None
+        best_bound = -1.0
+
+        for child in node.children:
+            bound = child.wins / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+            if bound > best_bound:
+                best = child
+                best_bound = bound
+
+        return best
+
+    def search(self) -> None:
+        """A function to run one playout from the root and count its result in the tree."""
+        if not self.free_nodes and self.num_nodes >= self.max_nodes:
+            self.pruneTree()
+
+        node = self.root
+        cells = bytearray(self.root_cells)
+
+        while node.result < 0 and node.untried is not None and not node.untried and node.children:
+            node = self.selectChild(node)
+            cells[node.move] = node.code
+
+        if node.result < 0 and node.untried is None:
+            node.untried = emptySpaces(cells)
+        if node.result < 0 and node.untried:
+            child = self.newNode()
+            if child is not None:
+                index = self.rng.randrange(len(node.untried))
+                space = node.untried[index]
+                node.untried[index] = node.untried[-1]
+                node.untried.pop()
+
+                code = 3 - node.code
+                cells[space] = code
+                if self.playout_board.completesLine(cells, space, code):
+                    result = code
+                else:
+                    result = -1 if 0 in cells else 0
+                node.children.append(child.reset(space, node, code, None, result))
+                node = child
+
+        winner = node.result if node.result >= 0 else self.playout_board.playout(cells, 3 - node.code, self.rng)
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.code:
+                node.wins += 1
+            elif winner == 0:
+                node.wins += 0.5
+            node = node.parent
+
+    def chooseMove(self, board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+        """A function to choose the move for a player on a board.
+
+        Searches until the move time runs out and plays the move visited most often.
+
+        Args:
+            board: the gameboard object of the game being played
+            symbol: the symbol of the player to move
+            other_symbol: the symbol of the other player
+
+        Returns:
+            (row, column): a tuple containing the row and column of the move.
+        """
+        if self.playout_board is None or (self.playout_board.size, self.playout_board.win_length) != (board.size,
+                                                                                                     board.win_length):
+            self.playout_board = PlayoutBoard(board.size, board.win_length)
+
+        cells = self.playout_board.readBoard(board, symbol, other_symbol)
+        if self.root is None or cells != self.root_cells:
+            if self.root is not None:
+                self.recycleTree(self.root)
+            self.root = self.newNode().reset(-1, None, 2, emptySpaces(cells), -1)
+            self.root_cells = cells
+        elif self.root.untried is None:
+            self.root.untried = emptySpaces(cells)
+
+        start = time.perf_counter()
+        deadline = start + self.move_time
+        playouts = 0
+        while time.perf_counter() < deadline:
+            self.search()
+            playouts += 1
+
+        self.last_playouts = playouts
+        self.playouts_per_second = playouts / (time.perf_counter() - start)
+
+        if self.root.children:
+            best = max(self.root.children, key=lambda child: child.visits)
+            space = best.move
+            self.last_score = 2 * best.wins / best.visits - 1
+        else:
+            space = self.rng.choice(self.root.untried)
+            self.last_score = 0
+
+        move = divmod(space, board.size)
+        self.advance(move)
+        return move
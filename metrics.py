@@ -0,0 +1,248 @@
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from protocol import FRAME_HEADER, MSG_MOVE
+
+# The upper bounds of the histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def formatLabels(labels: dict) -> str:
+    """A function to write labels in the Prometheus text format, or an empty string if there are none."""
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+class Counter:
+    """A class to count events.
+
+    Only the thread playing the game adds to a counter, so adding is a plain integer increment without a lock.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: dict = None) -> None:
+        """Initializes the name, description and labels of the counter and sets its value to 0."""
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels or {}
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        """A function to add to the counter."""
+        self.value += amount
+
+    def render(self) -> list:
+        """A function to write the counter as lines of the Prometheus text format."""
+        return [f"{self.name}{formatLabels(self.labels)} {self.value}"]
+
+
+class Histogram:
+    """A class to count timings in buckets.
+
+    Timings are given in nanoseconds from time.perf_counter_ns() and are only turned into seconds when the histogram
+    is written. Recording a timing finds its bucket with a binary search and adds to two integers, without a lock.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        """Initializes the name, description and bucket bounds of the histogram and sets every count to 0."""
+        self.name = name
+        self.help_text = help_text
+        self.labels = {}
+        self.buckets = buckets
+        self.bounds = [round(bound * 1e9) for bound in buckets]
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum_ns = 0
+
+    def observe(self, duration_ns: int) -> None:
+        """A function to record a timing, in nanoseconds."""
+        self.counts[bisect_left(self.bounds, duration_ns)] += 1
+        self.sum_ns += duration_ns
+
+    def render(self) -> list:
+        """A function to write the histogram as lines of the Prometheus text format."""
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {total}')
+        lines.append(f"{self.name}_sum {self.sum_ns / 1e9}")
+        lines.append(f"{self.name}_count {total}")
+
+        return lines
+
+
+class MetricsRegistry:
+    """A class to hold a set of metrics and serve them over HTTP in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        """Initializes the list of metrics and the HTTP server, which is started by serve()."""
+        self.metrics = []
+        self.server = None
+
+    def counter(self, name: str, help_text: str, labels: dict = None) -> Counter:
+        """A function to add a counter to the registry. Counters with the same name and different labels are allowed."""
+        counter = Counter(name, help_text, labels)
+        self.metrics.append(counter)
+        return counter
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        """A function to add a histogram to the registry."""
+        histogram = Histogram(name, help_text, buckets)
+        self.metrics.append(histogram)
+        return histogram
+
+    def render(self) -> str:
+        """A function to write every metric in the Prometheus text format.
+
+        The metrics are read while the game keeps adding to them, so a scrape can see one metric a moment before
+        another, but never blocks the game.
+
+        Returns:
+            the text of the metrics.
+        """
+        lines = []
+        described = set()
+        for metric in self.metrics:
+            if metric.name not in described:
+                described.add(metric.name)
+                metric_type = "counter" if isinstance(metric, Counter) else "histogram"
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+                lines.append(f"# TYPE {metric.name} {metric_type}")
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host: str, port: int) -> None:
+        """A function to serve the metrics at /metrics from a background thread.
+
+        Args:
+            host: the host name or IP address to listen on
+            port: the port to listen on
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+class PlayerMetrics:
+    """A class to record how a game played by player1.py or player2.py behaves.
+
+    The metrics are added by instrument(), which replaces methods of a player and its gameboard object with versions
+    that time them, so a player without metrics runs exactly as before.
+    """
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        """Adds the counters and histograms of a player to the registry."""
+        self.messages_sent = registry.counter("tictactoe_messages_sent_total", "Messages sent to the other player")
+        self.bytes_sent = registry.counter("tictactoe_bytes_sent_total", "Bytes sent to the other player")
+        self.messages_received = registry.counter("tictactoe_messages_received_total",
+                                                  "Messages received from the other player")
+        self.games_started = registry.counter("tictactoe_games_started_total", "Games started")
+        self.games_finished = {outcome: registry.counter("tictactoe_games_finished_total", "Games finished",
+                                                         {"outcome": outcome}) for outcome in ("win", "loss", "tie")}
+        self.send_time = registry.histogram("tictactoe_send_seconds", "Time to send a message")
+        self.receive_time = registry.histogram("tictactoe_receive_seconds", "Time waiting to receive a message")
+        self.round_trip = registry.histogram("tictactoe_move_round_trip_seconds",
+                                             "Time from sending a move to receiving the other player's move")
+        self.think_time = registry.histogram("tictactoe_think_seconds", "Time to choose and send a move")
+        self.board_update = registry.histogram("tictactoe_update_board_seconds", "Time to add a move to the board")
+        self.board_check = registry.histogram("tictactoe_check_board_seconds",
+                                              "Time to check the board after a move that does not end the game")
+        self.move_sent_ns = 0
+
+    def instrument(self, player, board) -> None:
+        """A function to time the methods of a player and its gameboard object.
+
+        Args:
+            player: the Player1 or Player2 object to time
+            board: the gameboard object the player plays on
+        """
+        perf_counter_ns = time.perf_counter_ns
+        send_data = player.sendData
+        receive_data = player.receiveData
+        player_move = player.playerMove
+        check_board = player.checkBoard
+        start_game = player.startGame
+        end_game = player.endGame
+        update_game_board = board.updateGameBoard
+
+        def sendData(data: bytes) -> None:
+            start = perf_counter_ns()
+            send_data(data)
+            end = perf_counter_ns()
+            self.send_time.observe(end - start)
+            self.messages_sent.inc()
+            self.bytes_sent.inc(len(data))
+            if data[FRAME_HEADER.size - 1] == MSG_MOVE:
+                self.move_sent_ns = end
+
+        def receiveData(message_type: int):
+            start = perf_counter_ns()
+            value = receive_data(message_type)
+            end = perf_counter_ns()
+            self.receive_time.observe(end - start)
+            self.messages_received.inc()
+            if message_type == MSG_MOVE and self.move_sent_ns:
+                self.round_trip.observe(end - self.move_sent_ns)
+                self.move_sent_ns = 0
+            return value
+
+        def playerMove() -> tuple:
+            start = perf_counter_ns()
+            move = player_move()
+            self.think_time.observe(perf_counter_ns() - start)
+            return move
+
+        def checkBoard(symbol: str) -> bool:
+            # Only moves that do not end the game are timed, since ending a game waits for the rematch answer.
+            start = perf_counter_ns()
+            game_over = check_board(symbol)
+            if game_over is False:
+                self.board_check.observe(perf_counter_ns() - start)
+            return game_over
+
+        def startGame() -> None:
+            self.games_started.inc()
+            self.move_sent_ns = 0
+            start_game()
+
+        def endGame(outcome: str) -> None:
+            self.games_finished[outcome].inc()
+            end_game(outcome)
+
+        def updateGameBoard(move, symbol: str) -> list:
+            start = perf_counter_ns()
+            gameboard = update_game_board(move, symbol)
+            self.board_update.observe(perf_counter_ns() - start)
+            return gameboard
+
+        player.sendData = sendData
+        player.receiveData = receiveData
+        player.playerMove = playerMove
+        player.checkBoard = checkBoard
+        player.startGame = startGame
+        player.endGame = endGame
+        board.updateGameBoard = updateGameBoard
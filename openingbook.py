@@ -0,0 +1,167 @@
+import argparse
+import json
+from collections import OrderedDict
+from computerplayer import ComputerPlayer, positionKey, symmetryOrders
+from gameboard import BitBoardclass, Boardclass, boardSymmetries
+from mcts import MCTSPlayer
+from renderer import NullRenderer
+
+
+class OpeningBook:
+    """A class to remember the moves an engine chooses so repeated positions are answered without searching.
+
+    Sits in front of any engine with a chooseMove() function. Moves are stored under the canonical key of the position
+    from positionKey(), so a position and all of its rotations and reflections share one entry, and each move is
+    turned back into a space of the real board when it is looked up. The book holds a fixed number of positions and
+    forgets the least recently used position when it is full.
+    """
+
+    def __init__(self, engine, max_positions: int = 100000, path: str = None) -> None:
+        """Initializes the opening book.
+
+        Args:
+            engine: the engine that chooses the moves of positions not in the book
+            max_positions: the largest number of positions kept in the book
+            path: a file written by saveBook() to load positions from
+        """
+        self.engine = engine
+        self.max_positions = max_positions
+        self.positions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.last_score = 0
+
+        if path is not None:
+            self.loadBook(path)
+
+    def chooseMove(self, board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+        """A function to choose the move for a player on a board from the book, or from the engine if it is not there.
+
+        A move from the engine is only added to the book if it is an empty space on the board, so the move the engine
+        returns when there is nothing left to play is never stored.
+
+        Args:
+            board: the gameboard object of the game being played
+            symbol: the symbol of the player to move
+            other_symbol: the symbol of the other player
+
+        Returns:
+            (row, column): a tuple containing the row and column of the move.
+        """
+        key, symmetry = positionKey(board, symbol, other_symbol)
+        book_key = (board.size, board.win_length, key)
+
+        entry = self.positions.get(book_key)
+        if entry is not None:
+            self.hits += 1
+            self.positions.move_to_end(book_key)
+            space, self.last_score = entry
+            return divmod(symmetryOrders(board.size)[symmetry][space], board.size)
+
+        self.misses += 1
+        row, column = self.engine.chooseMove(board, symbol, other_symbol)
+        self.last_score = self.engine.last_score
+
+        if 0 <= row < board.size and 0 <= column < board.size and board.checkMove(row, column) is True:
+            self.positions[book_key] = (boardSymmetries(board.size)[symmetry][row * board.size + column],
+                                        self.last_score)
+            if len(self.positions) > self.max_positions:
+                self.positions.popitem(last=False)
+
+        return row, column
+
+    def advance(self, move: tuple) -> None:
+        """A function to pass a move made in the game on to the engine, if the engine follows the game.
+
+        Args:
+            move: the row and column of the move
+        """
+        if hasattr(self.engine, "advance"):
+            self.engine.advance(move)
+
+    def loadBook(self, path: str) -> None:
+        """A function to add the positions saved in a file to the book.
+
+        Args:
+            path: a file written by saveBook()
+        """
+        with open(path) as book_file:
+            for size, win_length, key, space, score in json.load(book_file):
+                self.positions[(size, win_length, key)] = (space, score)
+                if len(self.positions) > self.max_positions:
+                    self.positions.popitem(last=False)
+
+    def saveBook(self, path: str) -> None:
+        """A function to write the positions in the book to a file, from least to most recently used.
+
+        Args:
+            path: the file to write
+        """
+        with open(path, "w") as book_file:
+            json.dump([[*book_key, space, score] for book_key, (space, score) in self.positions.items()], book_file)
+
+
+def fillBook(book: OpeningBook, size: int, win_length: int, depth: int) -> int:
+    """A function to add every position up to a number of moves into a game to the book.
+
+    Positions are visited one number of moves at a time, skipping positions already seen under the same canonical key
+    and positions where the game is over.
+
+    Args:
+        book: the opening book to fill
+        size: the number of rows and columns of the board
+        win_length: the number of symbols in a row needed to win
+        depth: the number of moves into the game to stop at
+
+    Returns:
+        the number of positions added.
+    """
+    if (size, win_length) == (3, 3):
+        board = BitBoardclass(renderer=NullRenderer())
+    else:
+        board = Boardclass(size=size, win_length=win_length, renderer=NullRenderer())
+
+    positions = [()]
+    for moves_made in range(depth + 1):
+        symbol, other_symbol = ("X", "O") if moves_made % 2 == 0 else ("O", "X")
+        seen = set()
+        next_positions = []
+
+        for moves in positions:
+            board.clearGameBoard()
+            for turn, space in enumerate(moves):
+                board.placeMove(space // size, space % size, "X" if turn % 2 == 0 else "O")
+            if board.isWinner(other_symbol) is True or board.empty_spaces == 0:
+                continue
+
+            key, _ = positionKey(board, symbol, other_symbol)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            book.chooseMove(board, symbol, other_symbol)
+            next_positions.extend(moves + (space,) for space in range(size * size)
+                                  if board.checkMove(space // size, space % size) is True)
+
+        positions = next_positions
+
+    return book.misses
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write an opening book of the moves an engine chooses.")
+    parser.add_argument("--output", default="book.json", help="the file to write the opening book to")
+    parser.add_argument("--size", type=int, default=3, help="the number of rows and columns of the board")
+    parser.add_argument("--win-length", type=int, default=3, help="the number of symbols in a row needed to win")
+    parser.add_argument("--depth", type=int, default=2, help="the number of moves into the game to add positions for")
+    parser.add_argument("--engine", choices=("perfect", "mcts"), default="perfect", help="the engine choosing moves")
+    parser.add_argument("--move-time", type=float, default=1.0, help="the seconds the mcts engine searches each move")
+    args = parser.parse_args()
+
+    if args.engine == "perfect" and (args.size, args.win_length) != (3, 3):
+        parser.error("the perfect engine only plays on a 3x3 board with 3 in a row; use --engine mcts")
+
+    opening_book = OpeningBook(ComputerPlayer() if args.engine == "perfect" else MCTSPlayer(args.move_time),
+                               max_positions=10 ** 9)
+    print(f"Added {fillBook(opening_book, args.size, args.win_length, args.depth)} positions")
+    opening_book.saveBook(args.output)
@@ -1,5 +1,21 @@
+import argparse
 import socket
-from gameboard import Boardclass
+import sys
+import time
+from collections import deque
+from computerplayer import ComputerPlayer
+from gameboard import BitBoardclass, Boardclass
+from gamelog import GameLogWriter
+from mcts import MCTSPlayer
+from metrics import MetricsRegistry, PlayerMetrics
+from openingbook import OpeningBook
+from protocol import (MSG_GAME_OVER, MSG_HELLO, MSG_MATCH, MSG_MOVE, FrameReader, ProtocolError, encodeGameOver,
+                      encodeHello, encodeJoin, encodeMove, encodeRematch)
+from renderer import RENDERERS
+from statsstore import StatsStore
+from tabularplayer import DEFAULT_POLICY_PATH, TabularPlayer
+from tracing import Tracer
+from turnloop import ClockTimeout, GameClock, TurnLoop
 
 
 class Player1:
@@ -12,17 +28,37 @@ class Player1:
     to print at the end of the game session.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, computer: bool = False, engine=None, stats_store=None, game_log=None, clock=None, size: int = 3,
+                 win_length: int = 3) -> None:
         """Initializes player variables to store and use data throughout the game.
 
         Sets initial values for the player usernames, player 1's socket, and symbols of both players to store and use
-        the variables during the game.
+        the variables during the game, along with the reader that splits data received from player 2 into messages.
+        If computer is True, a computer player chooses player 1's moves, using the engine if one is given and the
+        perfect ComputerPlayer otherwise. If a StatsStore is given, the result of each game is added to player 1's
+        lifetime stats. If a GameLogWriter is given, each finished game is written
+        to the game log. If a GameClock is given, each move must be made within its time limits, and a player that runs
+        out of time loses the game; the deadline of the turn being played is kept in deadline. Player 1 also times
+        player 2's moves with their own clock, giving them grace seconds more, so a player 2 that stops playing without
+        disconnecting still loses on time. The size and win length of the board are sent to player 2, who must play on
+        the same board.
         """
         self.p1username = ""
         self.p2username = ""
         self.p1socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.p1symbol = "X"
         self.p2symbol = "O"
+        self.engine = (engine if engine is not None else ComputerPlayer()) if computer else None
+        self.frame_reader = FrameReader()
+        self.messages = deque()
+        self.stats_store = stats_store
+        self.game_log = game_log
+        self.clock = clock if clock is not None else GameClock()
+        self.turn_loop = None
+        self.deadline = None
+        self.session_over = False
+        self.size = size
+        self.win_length = win_length
 
     def askForHostInfo(self) -> tuple:
         """Prompts user for host information of player 2.
@@ -63,11 +99,12 @@ class Player1:
             try:
                 self.connect()
                 connection = True
-                self.sendUsername()
 
             except:
                 self.tryAgain()
 
+        self.sendUsername()
+
     def tryAgain(self) -> None:
         """A function to re-prompt the user after the connection attempt fails.
 
@@ -82,63 +119,168 @@ class Player1:
 
             if (try_again == "n") or (try_again == "N"):
                 quit()
-    def sendUsername(self) -> None:
-        """A function to exchange usernames between players 1 and 2.
+    def joinLobby(self, address: tuple, rating: int) -> None:
+        """A function to join a lobby and wait to be paired with a player 2.
+
+        Connects player 1's socket to the lobby, sends player 1's username and rating to join as player 1, and waits
+        for the lobby to send the username of the player 2 it was paired with. Both usernames are then displayed on the
+        screen, and the rest of the game is sent through the lobby, starting with the hellos that check both players
+        play on the same board.
+
+        Args:
+            address: the host name or IP address and the port of the lobby
+            rating: player 1's rating, used to pair them with a player 2 of a similar rating
+        """
+        self.p1socket.connect(address)
+        print('Connection Successful!\n')
 
-        Continues to loop until a valid alphanumeric username is inputted for player 1. After a valid username is
-        inputted, the username is sent to Player 2, and the username of player 2 is received. Both usernames are then
-        displayed on the screen.
+        self.askForUsername()
+        self.sendData(encodeJoin(1, rating, self.p1username))
+        print("Waiting for the lobby to find a player 2...")
+        self.p2username = self.receiveData(MSG_MATCH)
+        self.sendData(encodeHello(self.p1username, self.size, self.win_length))
+        size, win_length, _ = self.receiveData(MSG_HELLO)
+        self.checkBoardSize(size, win_length)
+        print("\nPlayer 1:", self.p1username)
+        print("Player 2:", self.p2username)
+        print()
+
+    def askForUsername(self) -> None:
+        """A function to prompt the user for player 1's username.
+
+        Continues to loop until a valid alphanumeric username is inputted for player 1. When the computer plays player
+        1, its username is 'computer'.
         """
-        invalid_user = True
+        invalid_user = self.engine is None
+        if invalid_user is False:
+            self.p1username = "computer"
+
         while invalid_user is True:
             self.p1username = input("Please enter an alphanumeric username for Player 1:\n")
 
             if self.p1username.isalnum():
                 invalid_user = False
 
-        self.sendData(self.p1username)
+    def sendUsername(self) -> None:
+        """A function to exchange usernames between players 1 and 2.
+
+        Calls askForUsername() for player 1's username, which is sent to Player 2 with the size and win length of
+        player 1's board, and the username and board of player 2 are received. Both usernames are then displayed on the
+        screen.
+        """
+        self.askForUsername()
+        self.sendData(encodeHello(self.p1username, self.size, self.win_length))
         print("\nPlayer 1:", self.p1username)
-        self.p2username = self.receiveData()
+        size, win_length, self.p2username = self.receiveData(MSG_HELLO)
+        self.checkBoardSize(size, win_length)
         print("Player 2:", self.p2username)
         print()
 
-    def sendData(self, data: str) -> None:
-        """A function to send data strings to player 2.
+    def checkBoardSize(self, size: int, win_length: int) -> None:
+        """A function to refuse the game when player 2 plays on a different board than player 1.
+
+        Args:
+            size: the number of rows and columns of player 2's board
+            win_length: the number of symbols in a row player 2 needs to win
+
+        Raises:
+            SystemExit: an error that closes the program when the boards differ, after closing the connection.
+        """
+        if (size, win_length) != (self.size, self.win_length):
+            self.p1socket.close()
+            sys.exit(f"Player 2 plays on a {size}x{size} board with {win_length} in a row, but player 1 plays on a "
+                     f"{self.size}x{self.size} board with {self.win_length} in a row; start both players with the same "
+                     f"--size and --win-length")
 
-        Uses player 1's socket to encode and send data to player 2.
+    def sendData(self, data: bytes) -> None:
+        """A function to send a message to player 2.
+
+        Uses player 1's socket to send a frame made by one of the encode functions in protocol.py to player 2.
 
         Args:
-            data: a string to send to player 2.
+            data: the bytes of the frame to send to player 2.
         """
-        self.p1socket.sendall(data.encode())
+        self.p1socket.sendall(data)
+
+    def getTurnLoop(self) -> TurnLoop:
+        """A function to get the turn loop that waits for player 2 and the keyboard, creating it the first time."""
+        if self.turn_loop is None:
+            self.turn_loop = TurnLoop(self.p1socket)
 
-    def receiveData(self) -> str:
-        """A function to receive data from player 2.
+        return self.turn_loop
 
-        Uses player 1's socket to receive and decode data strings from player 2.
+    def readSocket(self) -> None:
+        """A function to read the data waiting on player 1's socket and keep every whole frame in it.
+
+        Raises:
+            ConnectionError: an error that occurs when player 2 has disconnected.
+            ClockTimeout: an error that occurs when player 2 has sent the end of the game because a player ran out of
+            time.
+        """
+        data = self.p1socket.recv(4096)
+        if not data:
+            raise ConnectionError("Player 2 disconnected")
+        self.messages.extend(self.frame_reader.feed(data))
+
+        for received_type, value in self.messages:
+            if received_type == MSG_GAME_OVER:
+                raise ClockTimeout(self.p2symbol if value == "loss" else self.p1symbol)
+
+    def receiveData(self, message_type: int):
+        """A function to receive a message from player 2.
+
+        Returns the next message already read from player 1's socket, or reads from the socket until a whole frame has
+        arrived. Every frame in a read is kept, so messages that arrive together are not lost. Waits until the deadline
+        of player 2's move, if there is one.
+
+        Args:
+            message_type: the type of message expected from player 2
 
         Returns:
-            a string containing data sent from player 2.
+            the decoded value of the message sent from player 2.
+
+        Raises:
+            ConnectionError: an error that occurs when player 2 has disconnected.
+            ProtocolError: an error that occurs when the message is not of the expected type.
+            ClockTimeout: an error that occurs when the deadline passes first, or player 2 says a player has run out of
+            time.
         """
-        return self.p1socket.recv(1024).decode()
+        while not self.messages:
+            if self.getTurnLoop().waitForPeer(self.deadline) is False:
+                raise ClockTimeout(self.p2symbol)
+            self.readSocket()
+
+        received_type, value = self.messages.popleft()
+        if received_type != message_type:
+            raise ProtocolError(f"Expected message type {message_type}, received {received_type}")
+
+        return value
 
     def playerMove(self) -> tuple[int, int]:
         """A function to prompt the user to make a move and send it to player 2.
 
-        The user is prompted to enter a number 1-9 to indicate the space they would like to move. The function
-        checkMove() is then called for the user to input their move, and is then translated to the move's corresponding
-        row and column. The row and column string values are then sent to player 2.
+        The user is prompted to enter the number of the space they would like to move, counting from 1 across each row
+        of the board. The function checkMove() is then called for the user to input their move, and is then translated
+        to the move's corresponding row and column. The row and column are then sent to player 2.
 
         Returns:
             (row, column): a tuple containing the corresponding row and column of the move inputted by the user.
+
+        Raises:
+            ClockTimeout: an error that occurs when the move is not made before player 1's clock runs out.
         """
         print("Enter the number of the space you would like to move.")
-        print("1 | 2 | 3")
-        print("4 | 5 | 6")
-        print("7 | 8 | 9")
+        width = len(str(p1board.size ** 2))
+        for row in range(p1board.size):
+            print(" | ".join(str(row * p1board.size + column + 1).rjust(width) for column in range(p1board.size)))
 
+        self.deadline = self.clock.startTurn(self.p1symbol)
         row, column = self.checkMove()
-        self.sendData(f"{row}{column}")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ClockTimeout(self.p1symbol)
+        self.clock.endTurn()
+        self.deadline = None
+        self.sendData(encodeMove(row, column))
 
         return row, column
 
@@ -146,31 +288,43 @@ class Player1:
         """A function to prompt player 1 to enter their move and checks the input for validity.
 
         Loops until a valid input and move is inputted by player 1. Prompts the user to enter their move, and if the
-        value is a number 1-9 and if the space has not already been taken, then the corresponding row and column of the
-        move is returned as a tuple. The user is re-prompted to enter their move if they input an invalid move.
+        value is the number of a space on the board and if the space has not already been taken, then the corresponding
+        row and column of the move is returned as a tuple. The user is re-prompted to enter their move if they input an
+        invalid move. If player 1 is played by the computer, the computer player's move is returned instead. The moves
+        are read from the turn loop, so player 2 disconnecting or forfeiting is noticed while waiting.
 
         Returns:
             (row, column): a tuple containing the corresponding row and column of the move inputted by the user.
+
+        Raises:
+            ClockTimeout: an error that occurs when no valid move is entered before player 1's clock runs out.
         """
+        if self.engine is not None:
+            row, column = self.engine.chooseMove(p1board, self.p1symbol, self.p2symbol)
+            print(f"Your Move: {row * p1board.size + column + 1}")
+            if isinstance(self.engine, MCTSPlayer):
+                print(f"{self.engine.last_playouts} playouts, {self.engine.playouts_per_second:.0f} per second")
+            return row, column
+
         # Check if player move is a valid value
         valid_input = False
         valid_move = False
 
         while (valid_input and valid_move) is False:
-            move = input("Your Move: ")
+            move = self.getTurnLoop().readLine("Your Move: ", self.deadline, self.readSocket)
+            if move is None:
+                raise ClockTimeout(self.p1symbol)
 
             # checks if move is valid value
-            if move in ("1", "2", "3", "4", "5", "6", "7", "8", "9"):
+            if move.isdigit() and 1 <= int(move) <= p1board.size ** 2:
                 valid_input = True
 
             # if move is valid, is the space empty
             if valid_input is True:
-                decoded_move = p1board.decodeMove(int(move))
-                row = int(decoded_move[0])
-                column = int(decoded_move[1])
+                row, column = p1board.decodeMove(int(move))
 
                 # checks if space has not already been taken
-                if p1board.gameboard[row][column] == " ":
+                if p1board.checkMove(row, column) is True:
                     valid_move = True
                 else:
                     print("Invalid input, try again.\n")
@@ -181,16 +335,31 @@ class Player1:
 
         return row, column
 
-    def receiveMove(self) -> str:
+    def receiveMove(self) -> tuple[int, int]:
         """A function to receive a move from player 2.
 
-        Calls the receiveData() function to receive the move player 2 made, and prints it.
+        Calls the receiveData() function to receive the move player 2 made, checks that it is an empty space on the
+        board, and prints it. Player 2 has until the
+        deadline of player 1's clock, plus its grace time, to make the move. The tree of the mcts engine is moved down
+        to the position after the move, so its search is kept.
 
         Returns:
-            move: the space player 2 inputted that designates where they chose to move.
+            move: a tuple of the row and column of the space player 2 chose to move.
+
+        Raises:
+            ClockTimeout: an error that occurs when player 2 does not move before the deadline.
+            ProtocolError: an error that occurs when the move is not on the board or the space is taken.
         """
         print("\nWaiting for Player 2 to move...")
-        move = self.receiveData()
+        self.deadline = self.clock.startTurn(self.p2symbol, other_player=True)
+        move = self.receiveData(MSG_MOVE)
+        self.clock.endTurn()
+        self.deadline = None
+        row, column = move
+        if not (0 <= row < p1board.size and 0 <= column < p1board.size) or p1board.checkMove(row, column) is False:
+            raise ProtocolError(f"Invalid move from Player 2: {row},{column}")
+        if hasattr(self.engine, "advance"):
+            self.engine.advance(move)
 
         print()
         print("Player 2's move:")
@@ -205,13 +374,15 @@ class Player1:
         print("Game Start")
         p1board.resetGameBoard()
         p1board.updateGamesPlayed()
+        self.clock.startGame()
 
     def endGame(self, outcome: str) -> None:
         """A function to end the game once an outcome has been found.
 
         Based on the outcome of the game designated by the argument, prints the result, and increments the number of
         wins or losses for player 1. Calls playAgain() function to prompt player 1 if they would like to play again. If
-        the program has not quit after playAgain() is called, then a new game is started by calling startGame().
+        the program has not quit after playAgain() is called, then a new game is started by calling startGame(). After
+        a game lost on time or to a disconnection, the session is closed instead.
 
         Args:
             outcome: a string that dictates the result of the game, which is either a tie, a win, or a loss for
@@ -226,27 +397,78 @@ class Player1:
             print("You Lose\n")
             p1board.num_losses += 1
 
+        if self.stats_store is not None:
+            self.stats_store.recordGame(self.p1username, outcome)
+        if self.game_log is not None:
+            winner = {"win": self.p1symbol, "loss": self.p2symbol}.get(outcome, "")
+            self.game_log.writeGame(self.p1username, self.p2username, p1board, winner)
+
+        if self.session_over is True:
+            self.closeSession()
         self.playAgain()
         self.startGame()
 
     def playAgain(self) -> None:
         """A function to prompt the user if they would like to play again.
 
-        Loops until 'y' or 'n' is inputted. If the user inputs 'y', then 'Play Again' is sent to player 2. The loop is
-        broken and startGame() is called in endGame() function. If the user inputs 'n', then 'Fun Times' is sent to
-        player 2.
+        Loops until 'y' or 'n' is inputted. If the user inputs 'y', then a rematch message saying they will play again
+        is sent to player 2. The loop is broken and startGame() is called in endGame() function. If the user inputs 'n',
+        then a rematch message saying they are done is sent to player 2. If player 2 disconnects while the user is
+        deciding, the session is closed.
         """
 
         while True:
-            play_again = input("Play Again? (y/n)\n")
+            try:
+                play_again = self.getTurnLoop().readLine("Play Again? (y/n)\n", None, self.readSocket)
+            except ConnectionError:
+                print("\nPlayer 2 disconnected")
+                self.closeSession()
+
             if (play_again == "y") or (play_again == "Y"):
-                self.sendData("Play Again")
+                self.sendData(encodeRematch(True))
                 break
 
             if (play_again == "n") or (play_again == "N"):
-                self.sendData("Fun Times")
-                p1board.printStats()
-                quit()
+                self.sendData(encodeRematch(False))
+                self.closeSession()
+
+    def forfeitGame(self, loser: str) -> None:
+        """A function to end a game that a player lost on time, or that player 2 left.
+
+        Either player may decide that the player that is moving has run out of time, by their own clock. Player 2 is
+        told the result, so both record the same outcome even when the clocks are set differently or one of them only
+        sees the connection close. The game is recorded as a loss for the player that ran out of time, and the session
+        is closed.
+
+        Args:
+            loser: the symbol of the player that ran out of time or disconnected
+        """
+        self.deadline = None
+        self.session_over = True
+        outcome = "loss" if loser == self.p1symbol else "win"
+        if outcome == "loss":
+            print("\nYou ran out of time")
+        else:
+            print("\nPlayer 2 ran out of time or left the game")
+
+        try:
+            self.sendData(encodeGameOver(outcome))
+        except OSError:
+            pass
+        self.endGame(outcome)
+
+    def closeSession(self) -> None:
+        """A function to close the connection to player 2, print the stats of the session and quit."""
+        if self.turn_loop is not None:
+            self.turn_loop.close()
+        self.p1socket.close()
+        p1board.printStats(self.stats_store)
+        if self.stats_store is not None:
+            self.stats_store.close()
+        if self.game_log is not None:
+            self.game_log.close()
+        # quit() would close stdin first, which waits for the turn loop's keyboard thread to finish reading a line.
+        sys.exit()
 
     def checkBoard(self, symbol: str) -> bool:
         """A function to check if the board for a winning pattern or to check if the board is full.
@@ -275,8 +497,21 @@ class Player1:
         """A function to run the game of tic-tac-toe.
 
         Contains a while loop that continues to prompt player 1 and player 2 to take their turn. Continues for as long
-        as the game lasts.
+        as the game lasts. A player that runs out of time loses the game, and player 2 disconnecting or sending a
+        message that cannot be played loses it for them.
         """
+        try:
+            self.playTurns()
+        except ClockTimeout as timeout:
+            self.forfeitGame(timeout.symbol)
+        except ConnectionError:
+            self.forfeitGame(self.p2symbol)
+        except ProtocolError as error:
+            print(f"\n{error}")
+            self.forfeitGame(self.p2symbol)
+
+    def playTurns(self) -> None:
+        """A function to play the turns of player 1 and player 2 until a player runs out of time or disconnects."""
         while True:
             restart_loop = False
             # Player 1 turn
@@ -301,11 +536,92 @@ class Player1:
 
 
 if __name__ == "__main__":
-    player1 = Player1()
-    player1.attemptConnection()
-
-    p1board = Boardclass(current_player=player1.p1username, player_symbol=player1.p1symbol,
-                         other_symbol=player1.p2symbol)
+    parser = argparse.ArgumentParser(description="Play tic-tac-toe as player 1.")
+    parser.add_argument("--computer", action="store_true", help="let the computer choose player 1's moves")
+    parser.add_argument("--engine", choices=("perfect", "mcts", "tabular"), default="perfect",
+                        help="search the whole game, which only works on a 3x3 board, use Monte Carlo tree search, or "
+                             "play a 3x3 policy learned by rltrainer.py")
+    parser.add_argument("--move-time", type=float, default=1.0, help="the seconds the mcts engine searches each move")
+    parser.add_argument("--max-nodes", type=int, default=200000,
+                        help="the largest number of nodes in the mcts tree, which take about 220 bytes each")
+    parser.add_argument("--policy", default=DEFAULT_POLICY_PATH, help="the policy file the tabular engine plays")
+    parser.add_argument("--randomness", type=float, default=0.0,
+                        help="the chance of the tabular engine playing a random move instead of the policy's move")
+    parser.add_argument("--book", help="an opening book written by openingbook.py to load before playing")
+    parser.add_argument("--book-size", type=int,
+                        help="remember the engine's moves for this many positions (100000 when --book is given)")
+    parser.add_argument("--metrics-port", type=int, help="a local port to serve Prometheus metrics on at /metrics")
+    parser.add_argument("--trace", help="a JSON file to write a Chrome trace of the phases of each turn to")
+    parser.add_argument("--trace-sample", type=float, default=1.0, help="the fraction of turns to trace")
+    parser.add_argument("--size", type=int, default=3, help="the number of rows and columns of the board")
+    parser.add_argument("--win-length", type=int, default=3, help="the number of symbols in a row needed to win")
+    parser.add_argument("--render", choices=list(RENDERERS), default="full",
+                        help="draw the whole board after each move, only the spaces that change, or nothing")
+    parser.add_argument("--stats-db", help="an SQLite file to keep player 1's lifetime stats in")
+    parser.add_argument("--game-log", help="a file to append a record of each finished game to")
+    parser.add_argument("--lobby", help="the host:port of a lobby to be paired with a player 2 through")
+    parser.add_argument("--rating", type=int, default=1200, help="player 1's rating, used to pair them in the lobby")
+    parser.add_argument("--move-clock", type=float, default=120.0,
+                        help="the seconds each player has for a move before losing the game on time, or 0 for no limit")
+    parser.add_argument("--game-clock", type=float, default=0.0,
+                        help="the seconds each player has for all their moves in a game, or 0 for no limit")
+    args = parser.parse_args()
+
+    if args.computer and args.engine != "mcts" and (args.size, args.win_length) != (3, 3):
+        parser.error(f"the {args.engine} engine only plays on a 3x3 board with 3 in a row; use --engine mcts")
+    if args.max_nodes < 1:
+        parser.error("the mcts tree must be allowed at least 1 node")
+    if args.size > 255:
+        parser.error("the board size must be at most 255")
+    if not 1 <= args.win_length <= args.size:
+        parser.error("the win length must be between 1 and the board size")
+    if args.game_log and args.size * args.size > 256:
+        parser.error("the game log only records boards of up to 16x16")
+    if not 0 <= args.rating <= 65535:
+        parser.error("the rating must be between 0 and 65535")
+    if args.move_clock < 0 or args.game_clock < 0:
+        parser.error("the clocks must not be negative")
+
+    engine = None
+    if args.computer:
+        if args.engine == "mcts":
+            engine = MCTSPlayer(args.move_time, args.max_nodes)
+        elif args.engine == "tabular":
+            try:
+                engine = TabularPlayer(args.policy, args.randomness)
+            except (OSError, ValueError) as error:
+                parser.error(str(error))
+        else:
+            engine = ComputerPlayer()
+        if args.book or args.book_size:
+            engine = OpeningBook(engine, args.book_size or 100000, args.book)
+
+    player1 = Player1(computer=args.computer, engine=engine,
+                      stats_store=StatsStore(args.stats_db) if args.stats_db else None,
+                      game_log=GameLogWriter(args.game_log) if args.game_log else None,
+                      clock=GameClock(args.move_clock or None, args.game_clock or None), size=args.size,
+                      win_length=args.win_length)
+    if args.lobby:
+        lobby_host, _, lobby_port = args.lobby.rpartition(":")
+        player1.joinLobby((lobby_host, int(lobby_port)), args.rating)
+    else:
+        player1.attemptConnection()
+
+    renderer = RENDERERS[args.render]()
+    if (args.size, args.win_length) == (3, 3):
+        p1board = BitBoardclass(current_player=player1.p1username, player_symbol=player1.p1symbol,
+                                other_symbol=player1.p2symbol, renderer=renderer)
+    else:
+        p1board = Boardclass(current_player=player1.p1username, player_symbol=player1.p1symbol,
+                             other_symbol=player1.p2symbol, size=args.size, win_length=args.win_length,
+                             renderer=renderer)
+
+    if args.metrics_port:
+        metrics_registry = MetricsRegistry()
+        PlayerMetrics(metrics_registry).instrument(player1, p1board)
+        metrics_registry.serve("127.0.0.1", args.metrics_port)
+    if args.trace:
+        Tracer(args.trace, args.trace_sample).instrument(player1, p1board)
 
     player1.startGame()
     player1.runGame()
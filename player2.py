@@ -1,5 +1,22 @@
+import argparse
 import socket
-from gameboard import Boardclass
+import sys
+import time
+from collections import deque
+from computerplayer import ComputerPlayer
+from gameboard import BitBoardclass, Boardclass
+from gamelog import GameLogWriter
+from mcts import MCTSPlayer
+from metrics import MetricsRegistry, PlayerMetrics
+from openingbook import OpeningBook
+from protocol import (MSG_GAME_OVER, MSG_HELLO, MSG_MATCH, MSG_MOVE, MSG_REMATCH, FrameReader, ProtocolError,
+                      encodeGameOver, encodeHello, encodeJoin, encodeMove)
+from renderer import RENDERERS
+from spectator import SpectatorHub
+from statsstore import StatsStore
+from tabularplayer import DEFAULT_POLICY_PATH, TabularPlayer
+from tracing import Tracer
+from turnloop import ClockTimeout, GameClock, TurnLoop
 
 
 class Player2:
@@ -12,17 +29,39 @@ class Player2:
     to print at the end of the game session.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, computer: bool = False, engine=None, stats_store=None, game_log=None, spectators=None,
+                 clock=None, size: int = 3, win_length: int = 3) -> None:
         """Initializes player variables to store and use data throughout the game.
 
         Sets initial values for the player usernames, player 2's socket, and symbols of both players to store and use
-        the variables during the game.
+        the variables during the game, along with the reader that splits data received from player 1 into messages.
+        If computer is True, a computer player chooses player 2's moves, using the engine if one is given and the
+        perfect ComputerPlayer otherwise. If a StatsStore is given, the result of each game is added to player 2's
+        lifetime stats. If a GameLogWriter is given, each finished game is written
+        to the game log. If a SpectatorHub is given, the board and every move are sent to its spectators. If a GameClock
+        is given, each move must be made within its time limits, a player that runs out of time loses the game, and
+        player 1 must answer whether they will play again within its rematch time; the deadline of the turn being played
+        or of the rematch answer is kept in deadline. Player 2 also times player 1's moves with their own clock, giving
+        them grace seconds more, so a player 1 that stops playing without disconnecting still loses on time. The size
+        and win length of the board are sent to player 1, who must play on the same board.
         """
         self.p2username = ""
         self.p1username = ""
         self.p2socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.p2symbol = "O"
         self.p1symbol = "X"
+        self.engine = (engine if engine is not None else ComputerPlayer()) if computer else None
+        self.frame_reader = FrameReader()
+        self.messages = deque()
+        self.stats_store = stats_store
+        self.game_log = game_log
+        self.spectators = spectators
+        self.clock = clock if clock is not None else GameClock()
+        self.turn_loop = None
+        self.deadline = None
+        self.session_over = False
+        self.size = size
+        self.win_length = win_length
 
     def askForHostInfo(self) -> tuple:
         """Prompts user for host information of player 2.
@@ -49,57 +88,171 @@ class Player2:
         print('Connection Successful!\n')
         self.sendUsername()
 
+    def joinLobby(self, address: tuple, rating: int) -> None:
+        """A function to join a lobby and wait to be paired with a player 1.
+
+        Connects to the lobby, prompts the user for player 2's username, sends it and player 2's rating to join as
+        player 2, and waits for the lobby to send the username of the player 1 it was paired with. Both usernames are
+        then displayed on the screen, and the rest of the game is sent through the lobby, starting with the hellos that
+        check both players play on the same board. When the computer plays player 2, its username is 'computer'.
+
+        Args:
+            address: the host name or IP address and the port of the lobby
+            rating: player 2's rating, used to pair them with a player 1 of a similar rating
+        """
+        self.clientSocket = socket.create_connection(address)
+        self.clientAddress = address
+        print('Connection Successful!\n')
+
+        self.askForUsername()
+        self.sendData(encodeJoin(2, rating, self.p2username))
+        print("Waiting for the lobby to find a player 1...")
+        self.p1username = self.receiveData(MSG_MATCH)
+        size, win_length, _ = self.receiveData(MSG_HELLO)
+        self.sendData(encodeHello(self.p2username, self.size, self.win_length))
+        self.checkBoardSize(size, win_length)
+        print("\nPlayer 1:", self.p1username)
+        print("Player 2:", self.p2username)
+        print()
+
+    def askForUsername(self) -> None:
+        """A function to prompt the user for player 2's username.
+
+        Continues to loop until a valid alphanumeric username is inputted for player 2. When the computer plays player
+        2, its username is 'computer'.
+        """
+        invalid_user = self.engine is None
+        if invalid_user is False:
+            self.p2username = "computer"
+
+        while invalid_user is True:
+            self.p2username = input("Please enter an alphanumeric username for Player 2:\n")
+
+            if self.p2username.isalnum():
+                invalid_user = False
+
     def sendUsername(self) -> None:
         """A function to exchange usernames between players 1 and 2.
 
-        The username of player 1 is received. Both usernames are then displayed on the screen.
+        The username and board of player 1 are received, and player 2's username and board are sent back, so player 1
+        also learns when the boards differ. Both usernames are then displayed on the screen.
         """
         print("Waiting for Player 1 to send their username...")
-        self.p1username = self.receiveData()
+        size, win_length, self.p1username = self.receiveData(MSG_HELLO)
+        self.p2username = 'player2'
+        self.sendData(encodeHello(self.p2username, self.size, self.win_length))
+        self.checkBoardSize(size, win_length)
+
         print("\nPlayer 1:", self.p1username)
         print("Player 2: player2")
         print()
 
-        self.p2username = 'player2'
-        self.sendData(self.p2username)
+    def checkBoardSize(self, size: int, win_length: int) -> None:
+        """A function to refuse the game when player 1 plays on a different board than player 2.
 
-    def sendData(self, data: str) -> None:
-        """A function to send data strings to player 2.
+        Args:
+            size: the number of rows and columns of player 1's board
+            win_length: the number of symbols in a row player 1 needs to win
+
+        Raises:
+            SystemExit: an error that closes the program when the boards differ, after closing the connection.
+        """
+        if (size, win_length) != (self.size, self.win_length):
+            self.clientSocket.close()
+            self.p2socket.close()
+            sys.exit(f"Player 1 plays on a {size}x{size} board with {win_length} in a row, but player 2 plays on a "
+                     f"{self.size}x{self.size} board with {self.win_length} in a row; start both players with the same "
+                     f"--size and --win-length")
 
-        Uses player 1's socket to encode and send data to player 2.
+    def sendData(self, data: bytes) -> None:
+        """A function to send a message to player 1.
+
+        Uses player 2's socket to send a frame made by one of the encode functions in protocol.py to player 1.
 
         Args:
-            data: a string to send to player 2.
+            data: the bytes of the frame to send to player 1.
+        """
+        self.clientSocket.sendall(data)
+
+    def getTurnLoop(self) -> TurnLoop:
+        """A function to get the turn loop that waits for player 1 and the keyboard, creating it the first time."""
+        if self.turn_loop is None:
+            self.turn_loop = TurnLoop(self.clientSocket)
+
+        return self.turn_loop
+
+    def readSocket(self) -> None:
+        """A function to read the data waiting on player 2's socket and keep every whole frame in it.
+
+        Raises:
+            ConnectionError: an error that occurs when player 1 has disconnected.
+            ClockTimeout: an error that occurs when player 1 has sent the end of the game because a player ran out of
+            time.
         """
-        self.clientSocket.sendall(data.encode())
+        data = self.clientSocket.recv(4096)
+        if not data:
+            raise ConnectionError("Player 1 disconnected")
+        self.messages.extend(self.frame_reader.feed(data))
+
+        for received_type, value in self.messages:
+            if received_type == MSG_GAME_OVER:
+                raise ClockTimeout(self.p1symbol if value == "loss" else self.p2symbol)
 
-    def receiveData(self) -> str:
-        """A function to receive data from player 1.
+    def receiveData(self, message_type: int):
+        """A function to receive a message from player 1.
 
-        Uses player 2's socket to receive and decode data strings from player 2.
+        Returns the next message already read from player 2's socket, or reads from the socket until a whole frame has
+        arrived. Every frame in a read is kept, so messages that arrive together are not lost. Waits until the deadline
+        of player 1's move or of the rematch answer, if there is one.
+
+        Args:
+            message_type: the type of message expected from player 1
 
         Returns:
-            a string containing data sent from player 1.
+            the decoded value of the message sent from player 1.
+
+        Raises:
+            ConnectionError: an error that occurs when player 1 has disconnected.
+            ProtocolError: an error that occurs when the message is not of the expected type.
+            ClockTimeout: an error that occurs when the deadline passes first, or player 1 says a player has run out of
+            time.
         """
-        return self.clientSocket.recv(1024).decode()
+        while not self.messages:
+            if self.getTurnLoop().waitForPeer(self.deadline) is False:
+                raise ClockTimeout(self.p1symbol)
+            self.readSocket()
+
+        received_type, value = self.messages.popleft()
+        if received_type != message_type:
+            raise ProtocolError(f"Expected message type {message_type}, received {received_type}")
+
+        return value
 
     def playerMove(self) -> tuple:
         """A function to prompt the user to make a move and send it to player 2.
 
-        The user is prompted to enter a number 1-9 to indicate the space they would like to move. The function
-        checkMove() is then called for the user to input their move, and is then translated to the move's corresponding
-        row and column. The row and column string values are then sent to player 2.
+        The user is prompted to enter the number of the space they would like to move, counting from 1 across each row
+        of the board. The function checkMove() is then called for the user to input their move, and is then translated
+        to the move's corresponding row and column. The row and column are then sent to player 1.
 
         Returns:
             (row, column): a tuple containing the corresponding row and column of the move inputted by the user.
+
+        Raises:
+            ClockTimeout: an error that occurs when the move is not made before player 2's clock runs out.
         """
         print("Enter the number of the space you would like to move.")
-        print("1 | 2 | 3")
-        print("4 | 5 | 6")
-        print("7 | 8 | 9")
+        width = len(str(p2board.size ** 2))
+        for row in range(p2board.size):
+            print(" | ".join(str(row * p2board.size + column + 1).rjust(width) for column in range(p2board.size)))
 
+        self.deadline = self.clock.startTurn(self.p2symbol)
         row, column = self.checkMove()
-        self.sendData(f"{row}{column}")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ClockTimeout(self.p2symbol)
+        self.clock.endTurn()
+        self.deadline = None
+        self.sendData(encodeMove(row, column))
 
         return row, column
 
@@ -107,31 +260,43 @@ class Player2:
         """A function to prompt player 2 to enter their move and checks the input for validity.
 
         Loops until a valid input and move is inputted by player 1. Prompts the user to enter their move, and if the
-        value is a number 1-9 and if the space has not already been taken, then the corresponding row and column of the
-        move is returned as a tuple. The user is re-prompted to enter their move if they input an invalid move.
+        value is the number of a space on the board and if the space has not already been taken, then the corresponding
+        row and column of the move is returned as a tuple. The user is re-prompted to enter their move if they input an
+        invalid move. If player 2 is played by the computer, the computer player's move is returned instead. The moves
+        are read from the turn loop, so player 1 disconnecting or forfeiting is noticed while waiting.
 
         Returns:
             (row, column): a tuple containing the corresponding row and column of the move inputted by the user.
+
+        Raises:
+            ClockTimeout: an error that occurs when no valid move is entered before player 2's clock runs out.
         """
+        if self.engine is not None:
+            row, column = self.engine.chooseMove(p2board, self.p2symbol, self.p1symbol)
+            print(f"Your Move: {row * p2board.size + column + 1}")
+            if isinstance(self.engine, MCTSPlayer):
+                print(f"{self.engine.last_playouts} playouts, {self.engine.playouts_per_second:.0f} per second")
+            return row, column
+
         # Check if player move is a valid value
         valid_input = False
         valid_move = False
 
         while (valid_input and valid_move) is False:
-            move = input("Your Move: ")
+            move = self.getTurnLoop().readLine("Your Move: ", self.deadline, self.readSocket)
+            if move is None:
+                raise ClockTimeout(self.p2symbol)
 
             # checks if move is valid value
-            if move in ("1", "2", "3", "4", "5", "6", "7", "8", "9"):
+            if move.isdigit() and 1 <= int(move) <= p2board.size ** 2:
                 valid_input = True
 
             # if move is valid, is the space empty
             if valid_input is True:
-                decoded_move = p2board.decodeMove(int(move))
-                row = int(decoded_move[0])
-                column = int(decoded_move[1])
+                row, column = p2board.decodeMove(int(move))
 
                 # checks if space has not already been taken
-                if p2board.gameboard[row][column] == " ":
+                if p2board.checkMove(row, column) is True:
                     valid_move = True
                 else:
                     print("Invalid input, try again.\n")
@@ -142,16 +307,31 @@ class Player2:
 
         return row, column
 
-    def receiveMove(self) -> str:
+    def receiveMove(self) -> tuple[int, int]:
         """A function to receive a move from player 1.
 
-        Calls the receiveData() function to receive the move player 2 made, and prints it.
+        Calls the receiveData() function to receive the move player 1 made, checks that it is an empty space on the
+        board, and prints it. Player 1 has until the
+        deadline of player 2's clock, plus its grace time, to make the move. The tree of the mcts engine is moved down
+        to the position after the move, so its search is kept.
 
         Returns:
-            move: the space player 1 inputted that designates where they chose to move.
+            move: a tuple of the row and column of the space player 1 chose to move.
+
+        Raises:
+            ClockTimeout: an error that occurs when player 1 does not move before the deadline.
+            ProtocolError: an error that occurs when the move is not on the board or the space is taken.
         """
         print("\nWaiting for Player 1 to move...")
-        move = self.receiveData()
+        self.deadline = self.clock.startTurn(self.p1symbol, other_player=True)
+        move = self.receiveData(MSG_MOVE)
+        self.clock.endTurn()
+        self.deadline = None
+        row, column = move
+        if not (0 <= row < p2board.size and 0 <= column < p2board.size) or p2board.checkMove(row, column) is False:
+            raise ProtocolError(f"Invalid move from Player 1: {row},{column}")
+        if hasattr(self.engine, "advance"):
+            self.engine.advance(move)
 
         if p2board.boardIsFull() is True:
             p2board.num_ties += 1
@@ -172,13 +352,17 @@ class Player2:
         print("Game Start")
         p2board.resetGameBoard()
         p2board.updateGamesPlayed()
+        self.clock.startGame()
+        if self.spectators is not None:
+            self.spectators.publishBoard(p2board)
 
     def endGame(self, outcome: str) -> None:
         """A function to end the game once an outcome has been found.
 
         Based on the outcome of the game designated by the argument, prints the result, and increments the number of
-        wins or losses for player 2. Calls playAgain() function to prompt player 1 if they would like to play again. If
-        the program has not quit after playAgain() is called, then a new game is started by calling startGame().
+        wins or losses for player 2. Waits for player 1 to say whether they would like to play again, until the rematch
+        time of the clock runs out. If they will, a new game is started by calling startGame(). If they will not, do not
+        answer in time or disconnect, or the game was lost on time or to a disconnection, the session is closed.
 
         Args:
             outcome: a string that dictates the result of the game, which is either a tie, a win, or a loss for
@@ -193,15 +377,69 @@ class Player2:
             print("You Lose")
             p2board.num_losses += 1
 
+        if self.stats_store is not None:
+            self.stats_store.recordGame(self.p2username, outcome)
+        if self.game_log is not None:
+            winner = {"win": self.p2symbol, "loss": self.p1symbol}.get(outcome, "")
+            self.game_log.writeGame(self.p1username, self.p2username, p2board, winner)
+
+        if self.session_over is True:
+            self.closeSession()
+
         print("Waiting for Player 1...\n")
-        play_again = self.receiveData()
-        print(play_again)
-        if play_again == "Fun Times":
-            p2board.printStats()
-            quit()
-        elif play_again == "Play Again":
+        self.deadline = self.clock.rematchDeadline()
+        try:
+            play_again = self.receiveData(MSG_REMATCH)
+        except (ClockTimeout, ConnectionError):
+            print("Player 1 did not answer")
+            play_again = False
+        self.deadline = None
+
+        if play_again is False:
+            print("Fun Times")
+            self.closeSession()
+        else:
+            print("Play Again")
             self.startGame()
 
+    def forfeitGame(self, loser: str) -> None:
+        """A function to end a game that a player lost on time, or that player 1 left.
+
+        Either player may decide that the player that is moving has run out of time, by their own clock. Player 1 is
+        told the result, so both record the same outcome even when the clocks are set differently or one of them only
+        sees the connection close. The game is recorded as a loss for the player that ran out of time, and the session
+        is closed.
+
+        Args:
+            loser: the symbol of the player that ran out of time or disconnected
+        """
+        self.deadline = None
+        self.session_over = True
+        outcome = "loss" if loser == self.p2symbol else "win"
+        if outcome == "loss":
+            print("\nYou ran out of time")
+        else:
+            print("\nPlayer 1 ran out of time or left the game")
+
+        try:
+            self.sendData(encodeGameOver(outcome))
+        except OSError:
+            pass
+        self.endGame(outcome)
+
+    def closeSession(self) -> None:
+        """A function to close the connection to player 1, print the stats of the session and quit."""
+        if self.turn_loop is not None:
+            self.turn_loop.close()
+        self.clientSocket.close()
+        p2board.printStats(self.stats_store)
+        if self.stats_store is not None:
+            self.stats_store.close()
+        if self.game_log is not None:
+            self.game_log.close()
+        # quit() would close stdin first, which waits for the turn loop's keyboard thread to finish reading a line.
+        sys.exit()
+
     def checkBoard(self, symbol: str) -> bool:
         """A function to check if the board for a winning pattern or to check if the board is full.
 
@@ -229,8 +467,21 @@ class Player2:
         """A function to run the game of tic-tac-toe.
 
         Contains a while loop that continues to prompt player 1 and player 2 to take their turn. Continues for as long
-        as the game lasts.
+        as the game lasts. A player that runs out of time loses the game, and player 1 disconnecting or sending a
+        message that cannot be played loses it for them.
         """
+        try:
+            self.playTurns()
+        except ClockTimeout as timeout:
+            self.forfeitGame(timeout.symbol)
+        except ConnectionError:
+            self.forfeitGame(self.p1symbol)
+        except ProtocolError as error:
+            print(f"\n{error}")
+            self.forfeitGame(self.p1symbol)
+
+    def playTurns(self) -> None:
+        """A function to play the turns of player 1 and player 2 until a player runs out of time or disconnects."""
         while True:
             restart_loop = False
             # Player 1 turn
@@ -239,6 +490,8 @@ class Player2:
             p2board.last_player = self.p1username
             # update game board
             p2board.updateGameBoard(player1_move, self.p1symbol)
+            if self.spectators is not None:
+                self.spectators.publishMove(*player1_move, self.p1symbol)
             # check board for wins or ties
             if self.checkBoard(self.p1symbol) is True:
                 restart_loop = True
@@ -250,15 +503,102 @@ class Player2:
                 p2board.last_player = self.p2username
                 # update game board
                 p2board.updateGameBoard(player2_move, self.p2symbol)
+                if self.spectators is not None:
+                    self.spectators.publishMove(*player2_move, self.p2symbol)
                 # check board for wins or ties
                 self.checkBoard(self.p2symbol)
 
 if __name__ == '__main__':
-    player2 = Player2()
-    player2.attemptConnection()
-
-    p2board = Boardclass(current_player=player2.p2username, player_symbol=player2.p2symbol,
-                         other_symbol=player2.p1symbol)
+    parser = argparse.ArgumentParser(description="Play tic-tac-toe as player 2.")
+    parser.add_argument("--computer", action="store_true", help="let the computer choose player 2's moves")
+    parser.add_argument("--engine", choices=("perfect", "mcts", "tabular"), default="perfect",
+                        help="search the whole game, which only works on a 3x3 board, use Monte Carlo tree search, or "
+                             "play a 3x3 policy learned by rltrainer.py")
+    parser.add_argument("--move-time", type=float, default=1.0, help="the seconds the mcts engine searches each move")
+    parser.add_argument("--max-nodes", type=int, default=200000,
+                        help="the largest number of nodes in the mcts tree, which take about 220 bytes each")
+    parser.add_argument("--policy", default=DEFAULT_POLICY_PATH, help="the policy file the tabular engine plays")
+    parser.add_argument("--randomness", type=float, default=0.0,
+                        help="the chance of the tabular engine playing a random move instead of the policy's move")
+    parser.add_argument("--book", help="an opening book written by openingbook.py to load before playing")
+    parser.add_argument("--book-size", type=int,
+                        help="remember the engine's moves for this many positions (100000 when --book is given)")
+    parser.add_argument("--metrics-port", type=int, help="a local port to serve Prometheus metrics on at /metrics")
+    parser.add_argument("--trace", help="a JSON file to write a Chrome trace of the phases of each turn to")
+    parser.add_argument("--trace-sample", type=float, default=1.0, help="the fraction of turns to trace")
+    parser.add_argument("--size", type=int, default=3, help="the number of rows and columns of the board")
+    parser.add_argument("--win-length", type=int, default=3, help="the number of symbols in a row needed to win")
+    parser.add_argument("--render", choices=list(RENDERERS), default="full",
+                        help="draw the whole board after each move, only the spaces that change, or nothing")
+    parser.add_argument("--stats-db", help="an SQLite file to keep player 2's lifetime stats in")
+    parser.add_argument("--game-log", help="a file to append a record of each finished game to")
+    parser.add_argument("--lobby", help="the host:port of a lobby to be paired with a player 1 through")
+    parser.add_argument("--rating", type=int, default=1200, help="player 2's rating, used to pair them in the lobby")
+    parser.add_argument("--spectator-port", type=int, help="a port for spectators to watch the games on")
+    parser.add_argument("--move-clock", type=float, default=120.0,
+                        help="the seconds each player has for a move before losing the game on time, or 0 for no limit")
+    parser.add_argument("--game-clock", type=float, default=0.0,
+                        help="the seconds each player has for all their moves in a game, or 0 for no limit")
+    parser.add_argument("--rematch-timeout", type=float, default=120.0,
+                        help="the seconds to wait for player 1 to say whether they will play again, or 0 for no limit")
+    args = parser.parse_args()
+
+    if args.computer and args.engine != "mcts" and (args.size, args.win_length) != (3, 3):
+        parser.error(f"the {args.engine} engine only plays on a 3x3 board with 3 in a row; use --engine mcts")
+    if args.max_nodes < 1:
+        parser.error("the mcts tree must be allowed at least 1 node")
+    if args.size > 255:
+        parser.error("the board size must be at most 255")
+    if not 1 <= args.win_length <= args.size:
+        parser.error("the win length must be between 1 and the board size")
+    if args.game_log and args.size * args.size > 256:
+        parser.error("the game log only records boards of up to 16x16")
+    if not 0 <= args.rating <= 65535:
+        parser.error("the rating must be between 0 and 65535")
+    if args.move_clock < 0 or args.game_clock < 0 or args.rematch_timeout < 0:
+        parser.error("the clocks must not be negative")
+
+    engine = None
+    if args.computer:
+        if args.engine == "mcts":
+            engine = MCTSPlayer(args.move_time, args.max_nodes)
+        elif args.engine == "tabular":
+            try:
+                engine = TabularPlayer(args.policy, args.randomness)
+            except (OSError, ValueError) as error:
+                parser.error(str(error))
+        else:
+            engine = ComputerPlayer()
+        if args.book or args.book_size:
+            engine = OpeningBook(engine, args.book_size or 100000, args.book)
+
+    player2 = Player2(computer=args.computer, engine=engine,
+                      stats_store=StatsStore(args.stats_db) if args.stats_db else None,
+                      game_log=GameLogWriter(args.game_log) if args.game_log else None,
+                      spectators=SpectatorHub("0.0.0.0", args.spectator_port) if args.spectator_port else None,
+                      clock=GameClock(args.move_clock or None, args.game_clock or None, args.rematch_timeout or None),
+                      size=args.size, win_length=args.win_length)
+    if args.lobby:
+        lobby_host, _, lobby_port = args.lobby.rpartition(":")
+        player2.joinLobby((lobby_host, int(lobby_port)), args.rating)
+    else:
+        player2.attemptConnection()
+
+    renderer = RENDERERS[args.render]()
+    if (args.size, args.win_length) == (3, 3):
+        p2board = BitBoardclass(current_player=player2.p2username, player_symbol=player2.p2symbol,
+                                other_symbol=player2.p1symbol, renderer=renderer)
+    else:
+        p2board = Boardclass(current_player=player2.p2username, player_symbol=player2.p2symbol,
+                             other_symbol=player2.p1symbol, size=args.size, win_length=args.win_length,
+                             renderer=renderer)
+
+    if args.metrics_port:
+        metrics_registry = MetricsRegistry()
+        PlayerMetrics(metrics_registry).instrument(player2, p2board)
+        metrics_registry.serve("127.0.0.1", args.metrics_port)
+    if args.trace:
+        Tracer(args.trace, args.trace_sample).instrument(player2, p2board)
 
     player2.startGame()
     player2.runGame()
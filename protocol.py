@@ -0,0 +1,180 @@
+import struct
+
+# Every frame starts with a header of the length of the rest of the frame and the message type.
+FRAME_HEADER = struct.Struct("!HB")
+
+MSG_HELLO = 1
+MSG_MOVE = 2
+MSG_GAME_OVER = 3
+MSG_REMATCH = 4
+MSG_STATS = 5
+MSG_JOIN = 6
+MSG_MATCH = 7
+MSG_SNAPSHOT = 8
+
+OUTCOMES = ("tie", "win", "loss")
+STATS = struct.Struct("!IIII")
+# A join message starts with the player number the client plays as and its rating, followed by its username.
+JOIN = struct.Struct("!BH")
+# A hello message starts with the size and win length of the player's board, followed by its username.
+HELLO = struct.Struct("!BB")
+# The codes of the spaces of a snapshot, which are packed 4 to a byte.
+SNAPSHOT_SYMBOLS = (" ", "X", "O")
+
+
+class ProtocolError(Exception):
+    """An error that occurs when a frame cannot be read."""
+
+
+def encodeFrame(message_type: int, payload: bytes = b"") -> bytes:
+    """A function to put a payload into a frame.
+
+    Args:
+        message_type: the type of the message
+        payload: the bytes of the message
+
+    Returns:
+        the frame, starting with the length of the type and payload.
+    """
+    return FRAME_HEADER.pack(len(payload) + 1, message_type) + payload
+
+
+def encodeHello(username: str, size: int = 3, win_length: int = 3) -> bytes:
+    """A function to encode a player's username with the size and win length of the board they play on."""
+    return encodeFrame(MSG_HELLO, HELLO.pack(size, win_length) + username.encode())
+
+
+def encodeMove(row: int, column: int) -> bytes:
+    """A function to encode a move as one byte for the row and one byte for the column."""
+    return encodeFrame(MSG_MOVE, bytes((row, column)))
+
+
+def encodeGameOver(outcome: str) -> bytes:
+    """A function to encode the outcome of a game for the player sending it, which is either 'tie', 'win', or 'loss'.
+
+    Sent when a game ends on time, by the player that ran out of time or by a server that ended the game for them.
+    """
+    return encodeFrame(MSG_GAME_OVER, bytes((OUTCOMES.index(outcome),)))
+
+
+def encodeRematch(play_again: bool) -> bytes:
+    """A function to encode whether player 1 would like to play again."""
+    return encodeFrame(MSG_REMATCH, b"\x01" if play_again else b"\x00")
+
+
+def encodeStats(num_games: int, num_wins: int, num_losses: int, num_ties: int) -> bytes:
+    """A function to encode the stats of a player."""
+    return encodeFrame(MSG_STATS, STATS.pack(num_games, num_wins, num_losses, num_ties))
+
+
+def encodeJoin(role: int, rating: int, username: str) -> bytes:
+    """A function to encode a request to join the lobby as player 1 or 2 with a rating and a username."""
+    return encodeFrame(MSG_JOIN, JOIN.pack(role, rating) + username.encode())
+
+
+def encodeMatch(username: str) -> bytes:
+    """A function to encode the username of the opponent the lobby has paired a player with."""
+    return encodeFrame(MSG_MATCH, username.encode())
+
+
+def encodeSnapshot(size: int, win_length: int, spaces: bytes) -> bytes:
+    """A function to encode a whole board as its size, its win length and 2 bits for each space.
+
+    Args:
+        size: the number of rows and columns of the board
+        win_length: the number of symbols in a row needed to win
+        spaces: the code of each space in SNAPSHOT_SYMBOLS, counting across each row
+
+    Returns:
+        the frame of the snapshot.
+    """
+    packed = bytearray((len(spaces) + 3) // 4)
+    for space, code in enumerate(spaces):
+        packed[space >> 2] |= code << ((space & 3) << 1)
+
+    return encodeFrame(MSG_SNAPSHOT, bytes((size, win_length)) + packed)
+
+
+def decodePayload(message_type: int, payload: bytes):
+    """A function to decode the payload of a frame.
+
+    Args:
+        message_type: the type of the message
+        payload: the bytes of the message
+
+    Returns:
+        a (size, win_length, username) tuple for a hello, a (row, column) tuple for a move, the outcome string for a
+        game over, a boolean for a rematch, a (num_games, num_wins, num_losses, num_ties) tuple for stats, a (role,
+        rating, username) tuple for a join, the opponent's username for a match, or a (size, win_length, rows) tuple
+        for a snapshot, where rows is a list of lists of the symbol in each space.
+
+    Raises:
+        ProtocolError: an error that occurs when the message type is unknown or the payload has the wrong size.
+    """
+    try:
+        if message_type == MSG_HELLO:
+            return HELLO.unpack_from(payload) + (payload[HELLO.size:].decode(),)
+        if message_type == MSG_MOVE and len(payload) == 2:
+            return payload[0], payload[1]
+        if message_type == MSG_GAME_OVER and len(payload) == 1:
+            return OUTCOMES[payload[0]]
+        if message_type == MSG_REMATCH and len(payload) == 1:
+            return payload[0] == 1
+        if message_type == MSG_STATS:
+            return STATS.unpack(payload)
+        if message_type == MSG_JOIN:
+            return JOIN.unpack_from(payload) + (payload[JOIN.size:].decode(),)
+        if message_type == MSG_MATCH:
+            return payload.decode()
+        if message_type == MSG_SNAPSHOT and len(payload) == 2 + (payload[0] * payload[0] + 3) // 4:
+            size = payload[0]
+            return size, payload[1], [[SNAPSHOT_SYMBOLS[payload[2 + (space >> 2)] >> ((space & 3) << 1) & 3]
+                                       for space in range(row * size, (row + 1) * size)] for row in range(size)]
+    except (UnicodeDecodeError, IndexError, struct.error) as error:
+        raise ProtocolError(f"Invalid payload for message type {message_type}") from error
+
+    raise ProtocolError(f"Invalid message type {message_type} with {len(payload)} byte payload")
+
+
+class FrameReader:
+    """A class to split a stream of bytes into decoded messages.
+
+    Bytes are added as they are received, and every complete frame in them is decoded at once, so a single read can
+    hold many messages and a message can be split across reads.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the buffer of bytes that have not been decoded yet."""
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> list:
+        """A function to add received bytes and decode every complete frame.
+
+        Args:
+            data: the bytes received
+
+        Returns:
+            a list of (message_type, value) tuples, in the order they were sent.
+
+        Raises:
+            ProtocolError: an error that occurs when a frame cannot be decoded.
+        """
+        self.buffer += data
+        messages = []
+        start = 0
+
+        while len(self.buffer) - start >= FRAME_HEADER.size:
+            length, message_type = FRAME_HEADER.unpack_from(self.buffer, start)
+            if length == 0:
+                raise ProtocolError("Frame without a message type")
+
+            end = start + 2 + length
+            if end > len(self.buffer):
+                break
+
+            payload = bytes(self.buffer[start + FRAME_HEADER.size:end])
+            messages.append((message_type, decodePayload(message_type, payload)))
+            start = end
+
+        del self.buffer[:start]
+        return messages
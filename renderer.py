@@ -0,0 +1,98 @@
+import shutil
+import sys
+
+
+def formatGameBoard(board) -> str:
+    """A function to lay out a gameboard as text.
+
+    Args:
+        board: the gameboard object to lay out
+
+    Returns:
+        a string of each row of the board separated by a line, followed by an empty line.
+    """
+    line = "-" * (6 * board.size - 1) + "\n"
+    rows = ["  " + "  |  ".join(row) + "\n" for row in board.gameboard]
+
+    return line.join(rows) + "\n"
+
+
+class NullRenderer:
+    """A class to skip drawing the board, for games nobody is watching."""
+
+    def drawBoard(self, board) -> None:
+        """A function that draws nothing when the board is reset."""
+
+    def drawMove(self, board, row: int, column: int) -> None:
+        """A function that draws nothing when a move is made."""
+
+
+class BufferedRenderer:
+    """A class to draw the whole board after every change with a single write."""
+
+    def __init__(self, stream=None) -> None:
+        """Initializes the stream the board is written to, which defaults to the standard output."""
+        self.stream = stream
+
+    def drawBoard(self, board) -> None:
+        """A function to write the whole board.
+
+        Args:
+            board: the gameboard object to draw
+        """
+        (self.stream or sys.stdout).write(formatGameBoard(board))
+
+    def drawMove(self, board, row: int, column: int) -> None:
+        """A function to write the whole board after a move.
+
+        Args:
+            board: the gameboard object to draw
+            row: the row of the move
+            column: the column of the move
+        """
+        self.drawBoard(board)
+
+
+class DiffRenderer:
+    """A class to draw the board once and then only redraw the spaces that change.
+
+    Uses terminal escape codes to clear the screen, draw the board at the top, and keep the rest of the output scrolling
+    below it. Each move then moves the cursor to its space, writes the symbol and moves the cursor back.
+    """
+
+    def __init__(self, stream=None) -> None:
+        """Initializes the stream the board is written to, which defaults to the standard output."""
+        self.stream = stream
+
+    def drawBoard(self, board) -> None:
+        """A function to clear the screen and draw the whole board at the top of it.
+
+        Args:
+            board: the gameboard object to draw
+        """
+        stream = self.stream or sys.stdout
+        height = 2 * board.size
+        bottom = shutil.get_terminal_size().lines
+
+        stream.write(f"\x1b[r\x1b[2J\x1b[H{formatGameBoard(board)}\x1b[{height + 1};{bottom}r\x1b[{height + 1};1H")
+        stream.flush()
+
+    def drawMove(self, board, row: int, column: int) -> None:
+        """A function to redraw the space of a move.
+
+        Args:
+            board: the gameboard object to draw
+            row: the row of the move
+            column: the column of the move
+        """
+        stream = self.stream or sys.stdout
+
+        stream.write(f"\x1b7\x1b[{2 * row + 1};{6 * column + 3}H{board.gameboard[row][column]}\x1b8")
+        stream.flush()
+
+
+RENDERERS = {
+    "full": BufferedRenderer,
+    "diff": DiffRenderer,
+    "none": NullRenderer
+}
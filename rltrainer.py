@@ -0,0 +1,263 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from computerplayer import SYMMETRY_MASKS, solvePosition
+from endgame import BASE3_MASKS, NO_MOVE, TABLE_SIZE
+from gameboard import FULL_MASK, WINNING_POSITIONS, boardSymmetries
+from tabularplayer import DEFAULT_POLICY_PATH, POLICY_HEADER
+
+# Positions are numbered in base 3 from the view of the player to move: each space counts as 0 when empty, 1 when held
+# by the player to move and 2 when held by the other player, with space (row * 3 + column) as the digit for 3 ** space.
+POWERS = 3 ** np.arange(9, dtype=np.int32)
+DIGITS = (np.arange(TABLE_SIZE)[:, None] // POWERS) % 3
+OWN_MASKS = ((DIGITS == 1) << np.arange(9)).sum(axis=1)
+OTHER_MASKS = ((DIGITS == 2) << np.arange(9)).sum(axis=1)
+
+# For every position number, the index of the symmetry that gives the same key as positionKey(), and the number of the
+# position after that symmetry, which is the row of the Q-table the position shares with its rotations and reflections.
+SYMMETRY_KEYS = (np.array(SYMMETRY_MASKS)[:, OWN_MASKS] << 9) | np.array(SYMMETRY_MASKS)[:, OTHER_MASKS]
+SYMMETRIES = SYMMETRY_KEYS.argmin(axis=0)
+CANONICAL = (np.array(BASE3_MASKS)[SYMMETRY_KEYS.min(axis=0) >> 9]
+             + 2 * np.array(BASE3_MASKS)[SYMMETRY_KEYS.min(axis=0) & FULL_MASK])
+
+# The space each space is moved to by each symmetry, the empty spaces of every position and the winning sets of spaces.
+PERMUTATIONS = np.array(boardSymmetries(3))
+EMPTY = DIGITS == 0
+WINNING = np.array(WINNING_POSITIONS)
+BITS = 1 << np.arange(9)
+SWAP = np.array([0, 2, 1], dtype=np.int8)
+
+# The Q-table of the worker processes, attached to the shared memory of the trainer by attachTable().
+WORKER_TABLE = None
+
+
+def attachTable(name: str) -> None:
+    """A function to attach a worker process to the shared memory holding the Q-table.
+
+    Args:
+        name: the name of the shared memory block
+    """
+    global WORKER_TABLE
+
+    memory = shared_memory.SharedMemory(name=name)
+    WORKER_TABLE = (memory, np.ndarray((TABLE_SIZE, 9), dtype=np.float32, buffer=memory.buf))
+
+
+def greedySpaces(table: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """A function to find the empty space with the highest Q-value in each of a set of canonical positions.
+
+    Args:
+        table: the Q-table
+        rows: the canonical position numbers
+
+    Returns:
+        an array of the best space of each position, on the canonical board.
+    """
+    values = np.where(EMPTY[rows], table[rows], -np.inf)
+    return values.argmax(axis=1)
+
+
+def selfPlay(table: np.ndarray, num_games: int, epsilon: float, alpha: float, rng: np.random.Generator) -> None:
+    """A function to play a batch of games against itself and update the Q-table after every move.
+
+    All the games of the batch are played at once, one move at a time. Each move is the empty space with the highest
+    Q-value, or a random empty space with probability epsilon. The Q-value of the move is moved by alpha toward 1 if
+    the move wins, 0 if it fills the board, and otherwise minus the highest Q-value of the other player in the position
+    after it. When several games make the same move from the same canonical position, the update uses their average.
+
+    Args:
+        table: the Q-table, which is changed in place
+        num_games: the number of games in the batch
+        epsilon: the chance of making a random move
+        alpha: the learning rate
+        rng: the random number generator
+    """
+    boards = np.zeros((num_games, 9), dtype=np.int8)
+    games = np.arange(num_games)
+
+    while len(games) > 0:
+        cells = boards[games]
+        indexes = cells @ POWERS
+        rows = CANONICAL[indexes]
+        symmetries = SYMMETRIES[indexes]
+        permutations = PERMUTATIONS[symmetries]
+
+        # Q-values are stored for the canonical board, so each space is read from the space a symmetry moves it to.
+        values = table[rows[:, None], permutations] + rng.random(cells.shape, dtype=np.float32) * 1e-6
+        values[cells != 0] = -np.inf
+        spaces = values.argmax(axis=1)
+
+        explore = np.flatnonzero(rng.random(len(games)) < epsilon)
+        if len(explore) > 0:
+            keys = rng.random((len(explore), 9), dtype=np.float32)
+            keys[cells[explore] != 0] = -1.0
+            spaces[explore] = keys.argmax(axis=1)
+
+        cells[np.arange(len(games)), spaces] = 1
+        won = WINNING[(cells == 1) @ BITS]
+        full = (cells != 0).all(axis=1)
+
+        cells = SWAP[cells]
+        next_rows = CANONICAL[cells @ POWERS]
+        next_values = np.where(EMPTY[next_rows], table[next_rows], -np.inf).max(axis=1)
+        targets = np.where(won, 1.0, np.where(full, 0.0, -next_values))
+
+        updated, inverse = np.unique(rows * 9 + permutations[np.arange(len(games)), spaces], return_inverse=True)
+        counts = np.bincount(inverse)
+        updated_rows, updated_spaces = np.divmod(updated, 9)
+        errors = np.bincount(inverse, targets) / counts - table[updated_rows, updated_spaces]
+        table[updated_rows, updated_spaces] += alpha * errors
+
+        boards[games] = cells
+        games = games[~(won | full)]
+
+
+def trainChunk(task: tuple) -> int:
+    """A function to play a chunk of self-play batches in a worker process.
+
+    Every worker updates the same Q-table in shared memory without a lock, so workers learn from each other's games
+    as they play. An update that races with another only loses one step of learning.
+
+    Args:
+        task: a tuple of the number of batches, the number of games in each batch, epsilon, alpha and the seed of the
+        random number generator
+
+    Returns:
+        the number of games played.
+    """
+    num_batches, batch_size, epsilon, alpha, seed = task
+    rng = np.random.default_rng(seed)
+
+    for _ in range(num_batches):
+        selfPlay(WORKER_TABLE[1], batch_size, epsilon, alpha, rng)
+
+    return num_batches * batch_size
+
+
+def optimalMoves() -> tuple[np.ndarray, np.ndarray]:
+    """A function to find the best moves of every canonical position that can be reached in a game.
+
+    Returns:
+        (rows, optimal): a tuple of the canonical numbers of the positions where the game is not over and, for each, a
+        boolean array of the spaces whose moves keep the value of the position with perfect play.
+    """
+    rows = []
+    optimal = []
+    seen = set()
+    stack = [(0, 0)]
+
+    while stack:
+        own, other = stack.pop()
+        row = int(CANONICAL[BASE3_MASKS[own] + 2 * BASE3_MASKS[other]])
+        if row in seen or WINNING_POSITIONS[other] or own | other == FULL_MASK:
+            continue
+        seen.add(row)
+
+        # The best moves are worked out on the canonical board, where the Q-values of the position are stored.
+        own, other = int(OWN_MASKS[row]), int(OTHER_MASKS[row])
+        value = solvePosition(own, other)
+        moves = np.zeros(9, dtype=bool)
+        for space in range(9):
+            bit = 1 << space
+            if not (own | other) & bit:
+                moves[space] = -solvePosition(other, own | bit) == value
+                stack.append((other, own | bit))
+
+        rows.append(row)
+        optimal.append(moves)
+
+    return np.array(rows), np.array(optimal)
+
+
+def trainPolicy(num_games: int, batch_size: int = 2048, epsilon: float = 0.2, alpha: float = 0.5,
+                processes: int = None, seed: int = 0, target: float = 1.0) -> tuple[np.ndarray, list]:
+    """A function to learn a Q-table for 3x3 tic-tac-toe with batched self-play on every core.
+
+    The Q-table is a dense (3 ** 9, 9) array in shared memory, with a row for each canonical position number and a
+    column for each space of the canonical board. Training runs in rounds, with every worker playing one chunk of
+    batches per round. After each round the greedy move of every reachable position is compared with perfect play, and
+    training stops early once the fraction of positions played perfectly reaches the target.
+
+    Args:
+        num_games: the largest number of games to play
+        batch_size: the number of games in each self-play batch
+        epsilon: the chance of making a random move during training
+        alpha: the learning rate
+        processes: the number of worker processes, which defaults to the number of cores
+        seed: the seed of the random number generators
+        target: the fraction of positions played perfectly at which training stops
+
+    Returns:
+        (table, history): a tuple of a copy of the Q-table and a list of the (games played, seconds, fraction of
+        positions played perfectly) after each round.
+    """
+    processes = processes or os.cpu_count()
+    rows, optimal = optimalMoves()
+    memory = shared_memory.SharedMemory(create=True, size=TABLE_SIZE * 9 * 4)
+    table = np.ndarray((TABLE_SIZE, 9), dtype=np.float32, buffer=memory.buf)
+    table[:] = 0.0
+
+    history = []
+    games_played = 0
+    batches_per_chunk = 8
+    start = time.perf_counter()
+
+    try:
+        with ProcessPoolExecutor(processes, initializer=attachTable, initargs=(memory.name,)) as executor:
+            while games_played < num_games:
+                tasks = [(batches_per_chunk, batch_size, epsilon, alpha, seed + games_played + worker)
+                         for worker in range(processes)]
+                games_played += sum(executor.map(trainChunk, tasks))
+
+                agreement = optimal[np.arange(len(rows)), greedySpaces(table, rows)].mean()
+                history.append((games_played, time.perf_counter() - start, float(agreement)))
+                if agreement >= target:
+                    break
+
+        return table.copy(), history
+
+    finally:
+        del table
+        memory.close()
+        memory.unlink()
+
+
+def exportPolicy(table: np.ndarray, path: str = DEFAULT_POLICY_PATH) -> None:
+    """A function to write the greedy move of every canonical position to a policy file for TabularPlayer.
+
+    The file is the policy header followed by one byte for each position number, holding the best space of the
+    canonical board, or NO_MOVE when the board is full.
+
+    Args:
+        table: the Q-table
+        path: the file to write the policy to
+    """
+    rows = np.arange(TABLE_SIZE)
+    moves = np.where(EMPTY.any(axis=1), greedySpaces(table, rows), NO_MOVE).astype(np.uint8)
+
+    with open(path, "wb") as policy_file:
+        policy_file.write(POLICY_HEADER)
+        policy_file.write(moves.tobytes())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learn a tic-tac-toe policy with batched self-play on every core.")
+    parser.add_argument("--output", default=DEFAULT_POLICY_PATH, help="the file to write the policy to")
+    parser.add_argument("--games", type=int, default=5000000, help="the largest number of self-play games")
+    parser.add_argument("--batch-size", type=int, default=2048, help="the number of games played at once")
+    parser.add_argument("--epsilon", type=float, default=0.2, help="the chance of a random move during training")
+    parser.add_argument("--alpha", type=float, default=0.5, help="the learning rate")
+    parser.add_argument("--target", type=float, default=1.0,
+                        help="stop once this fraction of positions is played perfectly; lower it for weaker bots")
+    parser.add_argument("--processes", type=int, help="the number of worker processes, by default one per core")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random number generators")
+    args = parser.parse_args()
+
+    q_table, rounds = trainPolicy(args.games, args.batch_size, args.epsilon, args.alpha, args.processes, args.seed,
+                                  args.target)
+    for played, seconds, perfect in rounds:
+        print(f"{played:>10} games  {seconds:6.2f}s  {perfect:.1%} of positions played perfectly")
+    exportPolicy(q_table, args.output)
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import time
+from endgame import EndgameTable
+from gameboard import Boardclass
+from gameserver import GameServer
+from statsstore import StatsStore
+
+
+def bindReusePort(host: str, port: int) -> socket.socket:
+    """A function to open a listening socket that other processes can bind to the same port.
+
+    Args:
+        host: the host name or IP address to listen on
+        port: the port to listen on
+
+    Returns:
+        the non-blocking listening socket.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(4096)
+    sock.setblocking(False)
+
+    return sock
+
+
+async def serveShard(index: int, options: tuple, reports: multiprocessing.Queue, stopping) -> None:
+    """A function to run the game server of one worker and report its stats until the host stops.
+
+    Args:
+        index: the number of the worker
+        options: a tuple of the host, the port, the endgame table file or None, the server's username, the stats
+        database file or None, the seconds between reports, and the move, game and rematch time limits of player 1
+        reports: the queue the stats of the worker are put on
+        stopping: the event set by the host when the workers should stop
+    """
+    host, port, endgame_table, username, stats_db, report_interval, move_time, game_time, rematch_time = options
+    game_server = GameServer(EndgameTable(endgame_table) if endgame_table else None, username,
+                             StatsStore(stats_db) if stats_db else None, move_time, game_time, rematch_time)
+    serving = asyncio.create_task(game_server.serve(host, port, bindReusePort(host, port)))
+
+    def report() -> None:
+        stats = game_server.stats
+        reports.put((index, stats.num_games, stats.num_wins, stats.num_losses, stats.num_ties,
+                     len(game_server.matches)))
+
+    try:
+        while not stopping.is_set():
+            await asyncio.sleep(report_interval)
+            if serving.done():
+                serving.result()
+            report()
+
+    finally:
+        serving.cancel()
+        report()
+        if game_server.stats_store is not None:
+            game_server.stats_store.close()
+
+
+def runShard(index: int, options: tuple, reports: multiprocessing.Queue, stopping) -> None:
+    """A function run by each worker process to serve games until the host stops.
+
+    Ctrl+C is ignored by the workers, so the host can stop them and collect their last stats.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(serveShard(index, options, reports, stopping))
+
+
+class ShardedHost:
+    """A class to host games on one port with a worker process for each core.
+
+    Each worker runs its own GameServer with its own listening socket bound with SO_REUSEPORT, so the kernel spreads
+    new connections between the workers and each worker owns its matches and game states outright, with nothing
+    shared or locked between processes while games are played. Workers put their stats on a queue every few seconds,
+    which the host adds up.
+    """
+
+    def __init__(self, host: str, port: int, workers: int = None, endgame_table: str = None, username: str = "server",
+                 stats_db: str = None, report_interval: float = 1.0, move_time: float = None, game_time: float = None,
+                 rematch_time: float = None) -> None:
+        """Initializes the host variables.
+
+        Args:
+            host: the host name or IP address to listen on
+            port: the port to listen on
+            workers: the number of worker processes, which defaults to the number of cores
+            endgame_table: an endgame table written by endgame.py, which every worker maps into memory
+            username: the username sent to each player
+            stats_db: an SQLite file to keep each player's lifetime stats in
+            report_interval: the seconds between the stats reports of each worker
+            move_time: the seconds player 1 has for each move, or None for no limit
+            game_time: the seconds player 1 has for all their moves in a game, or None for no limit
+            rematch_time: the seconds to wait for player 1 to say whether they will play again, or None for no limit
+
+        Raises:
+            OSError: an error that occurs when the system does not support SO_REUSEPORT.
+        """
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise OSError("SO_REUSEPORT is not supported on this system")
+
+        self.username = username
+        self.options = (host, port, endgame_table, username, stats_db, report_interval, move_time, game_time,
+                        rematch_time)
+        self.num_workers = workers or os.cpu_count()
+        self.reports = multiprocessing.Queue()
+        self.stopping = multiprocessing.Event()
+        self.workers = []
+        self.latest = {}
+
+    def start(self) -> None:
+        """A function to start the worker processes.
+
+        The port is bound once before the workers start, so a port that is taken is reported here instead of in
+        every worker.
+
+        Raises:
+            OSError: an error that occurs when the host and port cannot be bound.
+        """
+        bindReusePort(*self.options[:2]).close()
+
+        for index in range(self.num_workers):
+            worker = multiprocessing.Process(target=runShard, args=(index, self.options, self.reports, self.stopping),
+                                             daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def collectStats(self, timeout: float = 0.0) -> Boardclass:
+        """A function to read the reports the workers have sent and add up their latest stats.
+
+        Args:
+            timeout: the seconds to wait for the first report
+
+        Returns:
+            a gameboard object holding the number of games, wins, losses and ties of every worker together.
+        """
+        try:
+            report = self.reports.get(timeout=timeout) if timeout else self.reports.get_nowait()
+            while True:
+                self.latest[report[0]] = report[1:]
+                report = self.reports.get_nowait()
+        except queue.Empty:
+            pass
+
+        stats = Boardclass(current_player=self.username)
+        for num_games, num_wins, num_losses, num_ties, _ in self.latest.values():
+            stats.num_games += num_games
+            stats.num_wins += num_wins
+            stats.num_losses += num_losses
+            stats.num_ties += num_ties
+
+        return stats
+
+    def activeMatches(self) -> int:
+        """A function to get the number of matches running in every worker at their last reports."""
+        return sum(report[4] for report in self.latest.values())
+
+    def stop(self) -> Boardclass:
+        """A function to stop the workers and collect their last stats.
+
+        Returns:
+            a gameboard object holding the stats of every worker together.
+        """
+        self.stopping.set()
+        deadline = time.monotonic() + 5
+        while any(worker.is_alive() for worker in self.workers) and time.monotonic() < deadline:
+            self.collectStats(0.1)
+        for worker in self.workers:
+            worker.join(0.1)
+
+        return self.collectStats()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host tic-tac-toe games on one port with a process for each core.")
+    parser.add_argument("--host", default="0.0.0.0", help="the host name or IP address to listen on")
+    parser.add_argument("--port", type=int, default=5000, help="the port to listen on")
+    parser.add_argument("--workers", type=int, help="the number of worker processes, by default one per core")
+    parser.add_argument("--username", default="server", help="the username sent to each player")
+    parser.add_argument("--endgame-table", help="an endgame table written by endgame.py to choose moves from")
+    parser.add_argument("--stats-db", help="an SQLite file to keep each player's lifetime stats in")
+    parser.add_argument("--report-interval", type=float, default=1.0, help="the seconds between stats reports")
+    parser.add_argument("--move-clock", type=float, default=60.0,
+                        help="the seconds player 1 has for a move before losing the game on time, or 0 for no limit")
+    parser.add_argument("--game-clock", type=float, default=0.0,
+                        help="the seconds player 1 has for all their moves in a game, or 0 for no limit")
+    parser.add_argument("--rematch-timeout", type=float, default=60.0,
+                        help="the seconds to wait for player 1 to say whether they will play again, or 0 for no limit")
+    args = parser.parse_args()
+
+    if args.move_clock < 0 or args.game_clock < 0 or args.rematch_timeout < 0:
+        parser.error("the clocks must not be negative")
+
+    try:
+        sharded_host = ShardedHost(args.host, args.port, args.workers, args.endgame_table, args.username,
+                                   args.stats_db, args.report_interval, args.move_clock or None,
+                                   args.game_clock or None, args.rematch_timeout or None)
+        sharded_host.start()
+    except OSError as error:
+        parser.error(str(error))
+
+    print(f"Serving games on {args.host}:{args.port} with {sharded_host.num_workers} workers")
+
+    try:
+        last_games = 0
+        last_time = time.monotonic()
+        while any(worker.is_alive() for worker in sharded_host.workers):
+            time.sleep(args.report_interval)
+            host_stats = sharded_host.collectStats()
+            now = time.monotonic()
+            finished = host_stats.num_wins + host_stats.num_losses + host_stats.num_ties
+            print(f"Games: {finished}  {(finished - last_games) / (now - last_time):.0f} per second  "
+                  f"Active matches: {sharded_host.activeMatches()}")
+            last_games = finished
+            last_time = now
+        print("Every worker has stopped")
+    except KeyboardInterrupt:
+        pass
+
+    sharded_host.stop().printStats()
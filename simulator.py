@@ -0,0 +1,164 @@
+import argparse
+import itertools
+import time
+import numpy as np
+from gameboard import WIN_MASKS, Boardclass
+
+# A (9, 8) matrix with a 1 where space (row * 3 + column) is part of each of the eight winning lines.
+LINE_MATRIX = np.array([[(line >> space) & 1 for line in WIN_MASKS] for space in range(9)], dtype=np.float32)
+
+
+class RandomPolicy:
+    """A class to choose a random empty space in every game of a batch.
+
+    Draws a random order of the nine spaces for each game from a table of every permutation, and moves to the space for
+    the current turn. When the other player's policy has already taken that space, picks a random empty space for those
+    games instead, so the moves stay uniformly random whatever the other player does.
+    """
+
+    permutations = None
+
+    def __init__(self, rng: np.random.Generator) -> None:
+        """Initializes the policy and builds the table of permutations the first time it is needed.
+
+        Sets the random number generator, and the boards and orders of the spaces of the batch being played.
+        """
+        if RandomPolicy.permutations is None:
+            spaces = itertools.chain.from_iterable(itertools.permutations(range(9)))
+            RandomPolicy.permutations = np.fromiter(spaces, dtype=np.int8).reshape(-1, 9)
+
+        self.rng = rng
+        self.boards = None
+        self.orders = None
+
+    def chooseSpaces(self, boards: np.ndarray, turn: int) -> np.ndarray:
+        """A function to choose the space to move to in each game.
+
+        Args:
+            boards: the (N, 9) array of boards
+            turn: the number of moves already made in each game
+
+        Returns:
+            an array of the space to move to in each game.
+        """
+        if boards is not self.boards:
+            self.boards = boards
+            self.orders = self.permutations[self.rng.integers(0, len(self.permutations), len(boards))]
+
+        games = np.arange(len(boards))
+        spaces = self.orders[:, turn].astype(np.intp)
+
+        taken = np.flatnonzero(boards[games, spaces] != 0)
+        if len(taken) > 0:
+            keys = self.rng.random((len(taken), 9), dtype=np.float32)
+            keys[boards[taken] != 0] = -1.0
+            spaces[taken] = keys.argmax(axis=1)
+
+        return spaces
+
+
+class BatchSimulator:
+    """A class to play a batch of games at once without printing or sockets.
+
+    Stores every board as a row of a (N, 9) int8 array, with 1 for X, -1 for O and 0 for an empty space, numbering the
+    spaces as row * 3 + column. Each turn applies one move to every game still being played, and checks every board for
+    a win with a single matrix product against the eight winning lines.
+    """
+
+    def __init__(self, num_games: int) -> None:
+        """Initializes the arrays of boards and results for the batch.
+
+        Sets up the empty boards, the result of each game, which is 1 when X wins, -1 when O wins and 0 otherwise,
+        which games are still being played, and the number of turns played.
+        """
+        self.boards = np.zeros((num_games, 9), dtype=np.int8)
+        self.results = np.zeros(num_games, dtype=np.int8)
+        self.active = np.ones(num_games, dtype=bool)
+        self.turn = 0
+
+    def applyMoves(self, spaces: np.ndarray) -> None:
+        """A function to make a move in every game still being played and check for wins.
+
+        X moves on even turns and O on odd turns. Games that are over ignore their move.
+
+        Args:
+            spaces: an array of the space to move to in each game
+        """
+        player = 1 if self.turn % 2 == 0 else -1
+        games = np.flatnonzero(self.active)
+
+        self.boards[games, spaces[games]] = player
+        self.turn += 1
+
+        if self.turn >= 5:
+            line_totals = self.boards.astype(np.float32) @ LINE_MATRIX
+            # Each row of 8 booleans is read as one 64-bit number, which is nonzero when any line is complete.
+            winners = self.active & ((line_totals == 3 * player).view(np.uint64).ravel() != 0)
+            self.results[winners] = player
+            self.active &= ~winners
+
+    def run(self, x_policy, o_policy) -> dict:
+        """A function to play every game in the batch to the end.
+
+        Args:
+            x_policy: the policy choosing X's moves, with a chooseSpaces(boards, turn) function like RandomPolicy
+            o_policy: the policy choosing O's moves
+
+        Returns:
+            the stats of the batch for X; see stats().
+        """
+        while self.turn < 9 and self.active.any():
+            policy = x_policy if self.turn % 2 == 0 else o_policy
+            self.applyMoves(policy.chooseSpaces(self.boards, self.turn))
+
+        return self.stats()
+
+    def stats(self) -> dict:
+        """A function to count the results of the batch for X.
+
+        Returns:
+            a dictionary of num_games, num_wins, num_losses and num_ties, named like the stats of Boardclass.
+        """
+        wins = int(np.count_nonzero(self.results == 1))
+        losses = int(np.count_nonzero(self.results == -1))
+
+        return {"num_games": len(self.results), "num_wins": wins, "num_losses": losses,
+                "num_ties": len(self.results) - wins - losses}
+
+
+def simulateRandomGames(num_games: int, batch_size: int = 65536, seed: int = None) -> dict:
+    """A function to play games where both players move randomly.
+
+    Args:
+        num_games: the number of games to play
+        batch_size: the number of games played at once
+        seed: the seed of the random number generator
+
+    Returns:
+        a dictionary of num_games, num_wins, num_losses and num_ties for X.
+    """
+    rng = np.random.default_rng(seed)
+    policy = RandomPolicy(rng)
+    totals = {"num_games": 0, "num_wins": 0, "num_losses": 0, "num_ties": 0}
+
+    for start in range(0, num_games, batch_size):
+        stats = BatchSimulator(min(batch_size, num_games - start)).run(policy, policy)
+        for field, count in stats.items():
+            totals[field] += count
+
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play random tic-tac-toe games without printing the boards.")
+    parser.add_argument("--games", type=int, default=1000000, help="the number of games to play")
+    parser.add_argument("--batch-size", type=int, default=65536, help="the number of games played at once")
+    parser.add_argument("--seed", type=int, help="the seed of the random number generator")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    results = simulateRandomGames(args.games, args.batch_size, args.seed)
+    elapsed = time.perf_counter() - start_time
+
+    Boardclass(current_player="X", **results).printStats()
+    print(f"Games per second: {results['num_games'] / elapsed:.0f}")
@@ -0,0 +1,276 @@
+import argparse
+import selectors
+import socket
+import threading
+from gameboard import Boardclass
+from protocol import MSG_MOVE, MSG_SNAPSHOT, SNAPSHOT_SYMBOLS, FrameReader, encodeMove, encodeSnapshot
+from renderer import RENDERERS
+
+
+class Spectator:
+    """A class to hold the connection of one spectator and the frames waiting to be sent to it."""
+
+    def __init__(self, connection: socket.socket) -> None:
+        """Initializes the spectator variables.
+
+        Sets the spectator's socket, its queue of frames not yet sent, the number of bytes already sent of the first
+        frame in the queue, and the number of times it has been skipped ahead to a snapshot since it last caught up.
+        """
+        self.connection = connection
+        self.pending = []
+        self.sent = 0
+        self.skips = 0
+
+
+class SpectatorHub:
+    """A class to send the moves of the games played by player 2 to any number of spectators.
+
+    Spectators connect to a port of their own. Each one is first sent a snapshot of the whole board, and then each move
+    is encoded once and the same frame is written to every spectator without blocking. A spectator that cannot keep up
+    has its queued moves replaced by a snapshot of the latest board, and is dropped if it falls behind again too many
+    times before catching up, so the players never wait for a spectator. A background thread accepts spectators,
+    notices when they leave, sends the rest of any frame that did not fit into a socket, and closes the connections of
+    dropped spectators, since only that thread may change the selector while it waits in select().
+    """
+
+    def __init__(self, host: str, port: int, max_pending: int = 64, max_skips: int = 3) -> None:
+        """Opens the spectator port and starts the thread that serves it.
+
+        Args:
+            host: the host name or IP address to listen on
+            port: the port to listen on
+            max_pending: the number of frames that can wait to be sent to a spectator before it is skipped ahead
+            max_skips: the number of times a spectator can be skipped ahead before it is dropped
+        """
+        self.max_pending = max_pending
+        self.max_skips = max_skips
+        self.spectators = {}
+        self.dropped = []
+        self.lock = threading.Lock()
+        self.size = 3
+        self.win_length = 3
+        self.spaces = bytearray(9)
+        self.snapshot = None
+
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.wakeup_receiver, self.wakeup_sender = socket.socketpair()
+        self.wakeup_receiver.setblocking(False)
+        self.wakeup_sender.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.selector.register(self.wakeup_receiver, selectors.EVENT_READ)
+
+        self.thread = threading.Thread(target=self.serveSpectators, daemon=True)
+        self.thread.start()
+
+    def publishBoard(self, board: Boardclass) -> None:
+        """A function to send the whole board to every spectator, at the start of each game.
+
+        Args:
+            board: the gameboard object of the game being played
+        """
+        with self.lock:
+            self.size = board.size
+            self.win_length = board.win_length
+            self.spaces = bytearray(SNAPSHOT_SYMBOLS.index(space) for row in board.gameboard for space in row)
+            self.snapshot = None
+            self.broadcast(self.getSnapshot())
+
+    def publishMove(self, row: int, column: int, symbol: str) -> None:
+        """A function to send a move to every spectator.
+
+        Args:
+            row: the row of the move
+            column: the column of the move
+            symbol: the symbol of the player that made the move
+        """
+        with self.lock:
+            self.spaces[row * self.size + column] = SNAPSHOT_SYMBOLS.index(symbol)
+            self.snapshot = None
+            self.broadcast(encodeMove(row, column))
+
+    def getSnapshot(self) -> bytes:
+        """A function to get the frame of the latest board, which is only encoded again after the board changes."""
+        if self.snapshot is None:
+            self.snapshot = encodeSnapshot(self.size, self.win_length, self.spaces)
+
+        return self.snapshot
+
+    def broadcast(self, frame: bytes) -> None:
+        """A function to queue a frame for every spectator and send as much of it as fits straight away.
+
+        Must be called while holding the lock.
+
+        Args:
+            frame: the frame to send, which is shared by every spectator
+        """
+        waiting = False
+        for spectator in list(self.spectators.values()):
+            if len(spectator.pending) >= self.max_pending:
+                self.skipAhead(spectator)
+            else:
+                spectator.pending.append(frame)
+            self.sendPending(spectator)
+            waiting = waiting or bool(spectator.pending)
+
+        if waiting:
+            self.wakeHub()
+
+    def wakeHub(self) -> None:
+        """A function to wake the background thread from select(), so it picks up new frames and dropped spectators."""
+        try:
+            self.wakeup_sender.send(b"\x00")
+        except BlockingIOError:
+            pass
+
+    def skipAhead(self, spectator: Spectator) -> None:
+        """A function to replace the frames queued for a spectator that has fallen behind with the latest board.
+
+        Any frame that has been partly sent is kept so the spectator's stream stays whole. A spectator that has been
+        skipped ahead too many times is dropped instead.
+        """
+        spectator.skips += 1
+        if spectator.skips > self.max_skips:
+            self.dropSpectator(spectator)
+            return
+
+        spectator.pending = spectator.pending[:1] if spectator.sent else []
+        spectator.pending.append(self.getSnapshot())
+
+    def sendPending(self, spectator: Spectator) -> None:
+        """A function to send as many queued frames to a spectator as its socket will take without waiting.
+
+        A spectator that has been sent every queued frame has caught up, so its count of skips starts again.
+        """
+        try:
+            while spectator.pending:
+                frame = spectator.pending[0]
+                spectator.sent += spectator.connection.send(memoryview(frame)[spectator.sent:])
+                if spectator.sent < len(frame):
+                    return
+                spectator.pending.pop(0)
+                spectator.sent = 0
+            spectator.skips = 0
+        except BlockingIOError:
+            pass
+        except OSError:
+            self.dropSpectator(spectator)
+
+    def dropSpectator(self, spectator: Spectator) -> None:
+        """A function to stop sending to a spectator and have the background thread disconnect it.
+
+        Must be called while holding the lock.
+        """
+        if self.spectators.get(spectator.connection.fileno()) is spectator:
+            del self.spectators[spectator.connection.fileno()]
+            self.dropped.append(spectator)
+            self.wakeHub()
+
+    def closeDropped(self) -> None:
+        """A function run by the background thread to disconnect the dropped spectators. Must be called while holding
+        the lock."""
+        for spectator in self.dropped:
+            self.selector.unregister(spectator.connection)
+            spectator.connection.close()
+        self.dropped = []
+
+    def serveSpectators(self) -> None:
+        """A function run by the background thread to accept spectators, notice when they leave, and finish sending
+        frames that did not fit into their sockets.
+        """
+        while True:
+            with self.lock:
+                self.closeDropped()
+                for spectator in self.spectators.values():
+                    events = selectors.EVENT_READ | (selectors.EVENT_WRITE if spectator.pending else 0)
+                    if self.selector.get_key(spectator.connection).events != events:
+                        self.selector.modify(spectator.connection, events, spectator)
+
+            for key, events in self.selector.select():
+                if key.fileobj is self.wakeup_receiver:
+                    while True:
+                        try:
+                            self.wakeup_receiver.recv(4096)
+                        except BlockingIOError:
+                            break
+
+                elif key.fileobj is self.listener:
+                    try:
+                        connection, _ = self.listener.accept()
+                    except BlockingIOError:
+                        continue
+                    connection.setblocking(False)
+                    spectator = Spectator(connection)
+                    with self.lock:
+                        self.spectators[connection.fileno()] = spectator
+                        self.selector.register(connection, selectors.EVENT_READ, spectator)
+                        spectator.pending.append(self.getSnapshot())
+                        self.sendPending(spectator)
+
+                else:
+                    with self.lock:
+                        spectator = key.data
+                        if self.spectators.get(spectator.connection.fileno()) is not spectator:
+                            continue
+                        if events & selectors.EVENT_READ:
+                            try:
+                                left = not spectator.connection.recv(4096)
+                            except BlockingIOError:
+                                left = False
+                            except OSError:
+                                left = True
+                            if left:
+                                self.dropSpectator(spectator)
+                                continue
+                        if events & selectors.EVENT_WRITE:
+                            self.sendPending(spectator)
+
+
+def watchGame(address: tuple, renderer) -> None:
+    """A function to connect to a spectator port and draw the games played there until it closes.
+
+    Args:
+        address: the host name or IP address and the port of the spectator port
+        renderer: the renderer that draws the board
+    """
+    connection = socket.create_connection(address)
+    frame_reader = FrameReader()
+    board = None
+
+    while True:
+        data = connection.recv(4096)
+        if not data:
+            print("The game has ended")
+            return
+
+        for message_type, value in frame_reader.feed(data):
+            if message_type == MSG_SNAPSHOT:
+                size, win_length, rows = value
+                board = Boardclass(size=size, win_length=win_length, renderer=renderer)
+                board.clearGameBoard()
+                board.gameboard = rows
+                board.empty_spaces = sum(row.count(" ") for row in rows)
+                renderer.drawBoard(board)
+
+            elif message_type == MSG_MOVE and board is not None:
+                symbol = "X" if board.empty_spaces % 2 == board.size * board.size % 2 else "O"
+                board.updateGameBoard(value, symbol)
+                if board.winner:
+                    print(f"{board.winner} Wins!\n")
+                elif board.empty_spaces == 0:
+                    print("Tied Game\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch the games played by a player 2 started with --spectator-port.")
+    parser.add_argument("address", help="the host:port of the spectator port")
+    parser.add_argument("--render", choices=list(RENDERERS), default="full",
+                        help="draw the whole board after each move, or only the spaces that change")
+    args = parser.parse_args()
+
+    host, _, port = args.address.rpartition(":")
+    try:
+        watchGame((host, int(port)), RENDERERS[args.render]())
+    except KeyboardInterrupt:
+        pass
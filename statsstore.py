@@ -0,0 +1,141 @@
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+OUTCOME_FIELDS = {"win": "num_wins", "loss": "num_losses", "tie": "num_ties"}
+
+
+class StatsStore:
+    """A class to keep the lifetime stats of each username in an SQLite database.
+
+    Finished games are put on a queue and written by a background thread, which groups them into batches and commits
+    each batch at once, so ending a game never waits for the disk. The database uses write-ahead logging so the stats
+    can be read while a batch is being written. Connections wait for a database locked by another process, such as
+    the other workers of a sharded host, and a batch that still cannot be written is tried again a few times before it
+    is given up, so the writer thread never stops and flush() never waits forever.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 0.5, timeout: float = 10.0,
+                 retries: int = 3) -> None:
+        """Initializes the store, creates the stats table if needed, and starts the thread that writes to it.
+
+        Args:
+            path: the file of the database
+            batch_size: the largest number of games written in one commit
+            flush_interval: the longest time in seconds a game waits before it is written
+            timeout: the seconds a connection waits for the database to be unlocked
+            retries: the number of times a batch is tried again after an error
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.retries = retries
+        self.updates = queue.Queue()
+
+        connection = sqlite3.connect(path, timeout=timeout)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS stats (username TEXT PRIMARY KEY, num_games INTEGER NOT NULL, "
+                           "num_wins INTEGER NOT NULL, num_losses INTEGER NOT NULL, num_ties INTEGER NOT NULL)")
+        connection.commit()
+        connection.close()
+
+        self.writer = threading.Thread(target=self.writeUpdates, daemon=True)
+        self.writer.start()
+
+    def recordGame(self, username: str, outcome: str) -> None:
+        """A function to add a finished game to the stats of a username without waiting for it to be written.
+
+        Args:
+            username: the username of the player
+            outcome: a string that dictates the result of the game for the player, which is either a tie, a win, or a
+            loss
+        """
+        self.updates.put((username, outcome))
+
+    def writeUpdates(self) -> None:
+        """A function run by the writer thread to write queued games in batches until the store is closed."""
+        connection = sqlite3.connect(self.path, timeout=self.timeout)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        closed = False
+
+        while not closed:
+            batch = [self.updates.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.updates.get(timeout=self.flush_interval if len(batch) == 1 else 0))
+            except queue.Empty:
+                pass
+
+            try:
+                totals = {}
+                for update in batch:
+                    if update is None:
+                        closed = True
+                        continue
+                    username, outcome = update
+                    counts = totals.setdefault(username, {"num_wins": 0, "num_losses": 0, "num_ties": 0})
+                    counts[OUTCOME_FIELDS[outcome]] += 1
+
+                self.writeBatch(connection, totals)
+
+            finally:
+                for _ in batch:
+                    self.updates.task_done()
+
+        connection.close()
+
+    def writeBatch(self, connection: sqlite3.Connection, totals: dict) -> None:
+        """A function to add the totals of a batch of games to the stats, trying again when the write fails.
+
+        Args:
+            connection: the writer thread's connection to the database
+            totals: a dictionary mapping each username to its num_wins, num_losses and num_ties in the batch
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                connection.executemany(
+                    "INSERT INTO stats VALUES (?, ?, ?, ?, ?) ON CONFLICT(username) DO UPDATE SET "
+                    "num_games = num_games + excluded.num_games, num_wins = num_wins + excluded.num_wins, "
+                    "num_losses = num_losses + excluded.num_losses, num_ties = num_ties + excluded.num_ties",
+                    [(username, sum(counts.values()), counts["num_wins"], counts["num_losses"], counts["num_ties"])
+                     for username, counts in totals.items()]
+                )
+                connection.commit()
+                return
+
+            except sqlite3.Error as error:
+                connection.rollback()
+                if attempt == self.retries:
+                    print(f"Could not write a batch of stats to {self.path}: {error}", file=sys.stderr)
+                    return
+                time.sleep(0.1 * 2 ** attempt)
+
+    def flush(self) -> None:
+        """A function to wait until every game recorded so far has been written."""
+        self.updates.join()
+
+    def getTotals(self, username: str) -> dict:
+        """A function to read the lifetime stats of a username, including every game recorded so far.
+
+        Args:
+            username: the username of the player
+
+        Returns:
+            a dictionary of num_games, num_wins, num_losses and num_ties, named like the stats of Boardclass.
+        """
+        self.flush()
+
+        connection = sqlite3.connect(self.path, timeout=self.timeout)
+        row = connection.execute("SELECT num_games, num_wins, num_losses, num_ties FROM stats WHERE username = ?",
+                                 (username,)).fetchone()
+        connection.close()
+
+        return dict(zip(("num_games", "num_wins", "num_losses", "num_ties"), row or (0, 0, 0, 0)))
+
+    def close(self) -> None:
+        """A function to write every game recorded so far and stop the writer thread."""
+        self.updates.put(None)
+        self.writer.join()
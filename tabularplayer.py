@@ -0,0 +1,61 @@
+import random
+from computerplayer import positionKey, symmetryOrders
+from endgame import BASE3_MASKS, NO_MOVE, TABLE_SIZE
+from gameboard import FULL_MASK, Boardclass
+
+DEFAULT_POLICY_PATH = "policy.bin"
+POLICY_HEADER = b"TTTPOL\x01\x00"
+
+
+class TabularPlayer:
+    """A class to create a computer player that plays a policy learned by rltrainer.py.
+
+    The policy file holds one byte for each position numbered in base 3 from the view of the player to move, with the
+    best space of the position's canonical board. Each move is a lookup of the canonical position of the board from
+    positionKey(), turned back into a space of the real board. Policies trained for fewer games, or played with some
+    randomness, make weaker players than ComputerPlayer.
+    """
+
+    def __init__(self, path: str = DEFAULT_POLICY_PATH, randomness: float = 0.0, seed: int = None) -> None:
+        """Loads the policy file.
+
+        Args:
+            path: the policy file written by rltrainer.py
+            randomness: the chance of playing a random empty space instead of the policy's move
+            seed: the seed of the random number generator, for repeatable games
+
+        Raises:
+            ValueError: an error that occurs when the file is not a policy file.
+        """
+        with open(path, "rb") as policy_file:
+            data = policy_file.read()
+
+        if len(data) != len(POLICY_HEADER) + TABLE_SIZE or data[:len(POLICY_HEADER)] != POLICY_HEADER:
+            raise ValueError(f"{path} is not a policy file")
+
+        self.moves = data[len(POLICY_HEADER):]
+        self.randomness = randomness
+        self.rng = random.Random(seed)
+        self.last_score = 0
+
+    def chooseMove(self, board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+        """A function to choose the move for a player on a 3x3 board.
+
+        Args:
+            board: the gameboard object of the game being played
+            symbol: the symbol of the player to move
+            other_symbol: the symbol of the other player
+
+        Returns:
+            (row, column): a tuple containing the row and column of the move.
+        """
+        if self.randomness and self.rng.random() < self.randomness:
+            spaces = [(row, column) for row in range(3) for column in range(3) if board.checkMove(row, column) is True]
+            return self.rng.choice(spaces)
+
+        key, symmetry = positionKey(board, symbol, other_symbol)
+        space = self.moves[BASE3_MASKS[key >> 9] + 2 * BASE3_MASKS[key & FULL_MASK]]
+        if space == NO_MOVE:
+            raise ValueError("The board is full")
+
+        return divmod(symmetryOrders(3)[symmetry][space], 3)
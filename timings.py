@@ -0,0 +1,16 @@
+def summarize(samples: list) -> dict:
+    """A function to summarize a list of timings.
+
+    Args:
+        samples: the timings, in nanoseconds
+
+    Returns:
+        a dictionary of the number of samples, the mean and the 50th, 90th, 99th and 100th percentiles, in nanoseconds.
+    """
+    samples = sorted(samples)
+
+    def percentile(fraction: float) -> float:
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    return {"count": len(samples), "mean_ns": sum(samples) / len(samples), "p50_ns": percentile(0.50),
+            "p90_ns": percentile(0.90), "p99_ns": percentile(0.99), "max_ns": samples[-1]}
@@ -0,0 +1,260 @@
+import argparse
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from computerplayer import ComputerPlayer, boardMasks
+from gameboard import FULL_MASK, WIN_MASKS, BitBoardclass, Boardclass
+from renderer import NullRenderer
+
+# The engines of each worker process, created the first time a worker plays with them.
+WORKER_ENGINES = {}
+
+
+class RandomStrategy:
+    """A class to choose a random empty space."""
+
+    def __init__(self) -> None:
+        """Initializes the random number generator and the score of the last move chosen."""
+        self.rng = random.Random()
+        self.last_score = 0
+
+    def chooseMove(self, board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+        """A function to choose a random empty space on the board.
+
+        Returns:
+            (row, column): a tuple containing the row and column of the move.
+        """
+        spaces = [(row, column) for row in range(board.size) for column in range(board.size)
+                  if board.checkMove(row, column) is True]
+
+        return self.rng.choice(spaces)
+
+
+class FirstFreeStrategy:
+    """A class to choose the first empty space, counting across each row."""
+
+    def __init__(self) -> None:
+        """Initializes the score of the last move chosen."""
+        self.last_score = 0
+
+    def chooseMove(self, board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+        """A function to choose the first empty space on the board.
+
+        Returns:
+            (row, column): a tuple containing the row and column of the move.
+        """
+        for row in range(board.size):
+            for column in range(board.size):
+                if board.checkMove(row, column) is True:
+                    return row, column
+
+
+class HeuristicStrategy:
+    """A class to choose moves on a 3x3 board with simple rules.
+
+    Wins if it can, blocks the other player from winning, and otherwise takes the center, then a corner, then any other
+    space.
+    """
+
+    PREFERRED_SPACES = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+    def __init__(self) -> None:
+        """Initializes the score of the last move chosen."""
+        self.last_score = 0
+
+    def chooseMove(self, board: Boardclass, symbol: str, other_symbol: str) -> tuple[int, int]:
+        """A function to choose a move using the rules of the strategy.
+
+        Returns:
+            (row, column): a tuple containing the row and column of the move.
+        """
+        own, other = boardMasks(board, symbol, other_symbol)
+        free = ~(own | other) & FULL_MASK
+
+        for mask in (own, other):
+            for line in WIN_MASKS:
+                missing = line & ~mask
+                if missing & free == missing and missing != 0 and missing & (missing - 1) == 0:
+                    return divmod(missing.bit_length() - 1, 3)
+
+        for space in self.PREFERRED_SPACES:
+            if free & (1 << space):
+                return divmod(space, 3)
+
+
+STRATEGIES = {
+    "random": RandomStrategy,
+    "first": FirstFreeStrategy,
+    "heuristic": HeuristicStrategy,
+    "perfect": ComputerPlayer
+}
+
+
+def playGame(board: Boardclass, x_engine, o_engine) -> int:
+    """A function to play one game between two engines without printing the board.
+
+    Args:
+        board: the gameboard object to play on
+        x_engine: the engine choosing X's moves, which moves first
+        o_engine: the engine choosing O's moves
+
+    Returns:
+        1 if X wins, -1 if O wins, and 0 for a tie.
+    """
+    board.clearGameBoard()
+    engines = ((x_engine, "X", "O"), (o_engine, "O", "X"))
+
+    for turn in itertools.count():
+        engine, symbol, other_symbol = engines[turn % 2]
+        row, column = engine.chooseMove(board, symbol, other_symbol)
+        board.placeMove(row, column, symbol)
+
+        if board.isWinner(symbol) is True:
+            return 1 if symbol == "X" else -1
+        if board.boardIsFull() is True:
+            return 0
+
+
+def playChunk(task: tuple) -> tuple:
+    """A function to play a chunk of games between two strategies in a worker process.
+
+    Each worker keeps its own engines and its own gameboard object, so nothing is shared between processes.
+
+    Args:
+        task: a tuple of the name of X's strategy, the name of O's strategy, the number of games, and the seed of the
+        random number generators
+
+    Returns:
+        a tuple of the two strategy names and X's number of wins, losses and ties.
+    """
+    x_name, o_name, num_games, seed = task
+    for name in (x_name, o_name):
+        if name not in WORKER_ENGINES:
+            WORKER_ENGINES[name] = STRATEGIES[name]()
+        if isinstance(WORKER_ENGINES[name], RandomStrategy):
+            WORKER_ENGINES[name].rng.seed(f"{seed}-{name}")
+
+    board = BitBoardclass(renderer=NullRenderer())
+    wins = losses = ties = 0
+    for _ in range(num_games):
+        result = playGame(board, WORKER_ENGINES[x_name], WORKER_ENGINES[o_name])
+        if result == 1:
+            wins += 1
+        elif result == -1:
+            losses += 1
+        else:
+            ties += 1
+
+    return x_name, o_name, wins, losses, ties
+
+
+def computeElo(scores: dict, names: list, iterations: int = 200) -> dict:
+    """A function to find the Elo ratings that best fit the results of the tournament.
+
+    Starting every strategy at 1500, repeatedly moves each rating by the difference between the points it scored and
+    the points its ratings predict, so the ratings do not depend on the order the games were played in.
+
+    Args:
+        scores: a dictionary mapping each (name, opponent) pair to the points the strategy scored, counting a tie as
+        half a point, and the number of games played
+        names: the names of the strategies
+        iterations: the number of times every rating is updated
+
+    Returns:
+        a dictionary mapping each strategy name to its rating.
+    """
+    ratings = {name: 1500.0 for name in names}
+
+    for _ in range(iterations):
+        updates = {}
+        for name in names:
+            difference = 0.0
+            games = 0
+            for opponent in names:
+                points, played = scores.get((name, opponent), (0.0, 0))
+                if played == 0:
+                    continue
+                expected = 1 / (1 + 10 ** ((ratings[opponent] - ratings[name]) / 400))
+                difference += points - expected * played
+                games += played
+            updates[name] = 400 * difference / games if games else 0.0
+
+        for name in names:
+            ratings[name] += updates[name]
+
+    average = sum(ratings.values()) / len(ratings)
+    return {name: rating - average + 1500 for name, rating in ratings.items()}
+
+
+def runTournament(names: list, games_per_pairing: int, chunk_size: int = 1000, processes: int = None,
+                  seed: int = 0) -> dict:
+    """A function to play every strategy against every other strategy as both X and O.
+
+    Splits the games of each pairing into chunks, which are sent to a pool of worker processes so the games are spread
+    over every core without sending each game between processes.
+
+    Args:
+        names: the names of the strategies in STRATEGIES to play
+        games_per_pairing: the number of games played for each order of each pair of strategies
+        chunk_size: the number of games sent to a worker at once
+        processes: the number of worker processes, which defaults to the number of cores
+        seed: the seed of the random strategies
+
+    Returns:
+        a dictionary mapping each strategy name to a tuple of its Elo rating and a gameboard object holding its number
+        of games, wins, losses and ties.
+    """
+    tasks = []
+    for x_name, o_name in itertools.permutations(names, 2):
+        for start in range(0, games_per_pairing, chunk_size):
+            tasks.append((x_name, o_name, min(chunk_size, games_per_pairing - start), seed + len(tasks)))
+
+    stats = {name: Boardclass(current_player=name) for name in names}
+    scores = {}
+
+    with ProcessPoolExecutor(processes or os.cpu_count()) as executor:
+        for x_name, o_name, wins, losses, ties in executor.map(playChunk, tasks):
+            for name, opponent, won, lost in ((x_name, o_name, wins, losses), (o_name, x_name, losses, wins)):
+                stats[name].num_games += won + lost + ties
+                stats[name].num_wins += won
+                stats[name].num_losses += lost
+                stats[name].num_ties += ties
+
+                points, played = scores.get((name, opponent), (0.0, 0))
+                scores[(name, opponent)] = (points + won + ties / 2, played + won + lost + ties)
+
+    ratings = computeElo(scores, names)
+    return {name: (ratings[name], stats[name]) for name in names}
+
+
+def printRatings(table: dict) -> None:
+    """A function to print the ratings table, from the highest rating to the lowest.
+
+    Args:
+        table: the dictionary returned by runTournament()
+    """
+    print(f"{'Strategy':<12}{'Elo':>8}{'Games':>10}{'Wins':>10}{'Losses':>10}{'Ties':>10}")
+    for name, (rating, stats) in sorted(table.items(), key=lambda item: -item[1][0]):
+        print(f"{name:<12}{rating:>8.0f}{stats.num_games:>10}{stats.num_wins:>10}{stats.num_losses:>10}"
+              f"{stats.num_ties:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a round-robin tournament between tic-tac-toe strategies.")
+    parser.add_argument("strategies", nargs="*",
+                        help=f"the strategies to play, from {', '.join(STRATEGIES)}, which defaults to all of them")
+    parser.add_argument("--games", type=int, default=10000, help="the number of games for each pairing and order")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="the number of games sent to a worker at once")
+    parser.add_argument("--processes", type=int, help="the number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random strategies")
+    args = parser.parse_args()
+
+    strategies = args.strategies or list(STRATEGIES)
+    if len(strategies) < 2:
+        parser.error("at least 2 strategies are needed")
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            parser.error(f"unknown strategy {strategy}")
+
+    printRatings(runTournament(strategies, args.games, args.chunk_size, args.processes, args.seed))
@@ -0,0 +1,157 @@
+import atexit
+import json
+import os
+import random
+import threading
+import time
+
+
+class Tracer:
+    """A class to record how long each phase of a turn takes and write the spans as a Chrome trace.
+
+    instrument() replaces methods of a player, its gameboard object and its renderer with versions that record a span
+    each time they run, so a player without tracing runs exactly as before. The choice to record is made once per turn,
+    when the player starts to choose a move or starts to wait for the other player's move, and only the given fraction
+    of turns is recorded. The trace is written when the program exits, and can be opened in chrome://tracing or
+    Perfetto.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, seed: int = None) -> None:
+        """Initializes the tracer.
+
+        Args:
+            path: the JSON file to write the trace to
+            sample_rate: the fraction of turns to record
+            seed: the seed of the random number generator that picks the turns, for repeatable traces
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.rng = random.Random(seed)
+        self.sampling = False
+        self.spans = []
+        self.check_start = None
+        self.start_ns = time.perf_counter_ns()
+        self.closed = False
+        atexit.register(self.close)
+
+    def traced(self, name: str, function):
+        """A function to wrap a function so each call records a span while a turn is being recorded.
+
+        Args:
+            name: the name of the span
+            function: the function to wrap
+
+        Returns:
+            the wrapped function.
+        """
+        perf_counter_ns = time.perf_counter_ns
+        spans = self.spans
+
+        def wrapper(*args):
+            if self.sampling is False:
+                return function(*args)
+
+            start = perf_counter_ns()
+            try:
+                return function(*args)
+            finally:
+                spans.append((name, start, perf_counter_ns()))
+
+        return wrapper
+
+    def checked(self, function):
+        """A function to wrap checkBoard so each call records a check span, which ends early if the game ends.
+
+        Args:
+            function: the function to wrap
+
+        Returns:
+            the wrapped function.
+        """
+        def wrapper(*args):
+            if self.sampling is False:
+                return function(*args)
+
+            self.check_start = time.perf_counter_ns()
+            try:
+                return function(*args)
+            finally:
+                self.endCheck()
+
+        return wrapper
+
+    def endCheck(self) -> None:
+        """A function to record the check span being timed, if there is one."""
+        if self.check_start is not None:
+            self.spans.append(("check", self.check_start, time.perf_counter_ns()))
+            self.check_start = None
+
+    def endingCheck(self, function):
+        """A function to wrap endGame so the check span that called it ends before it starts.
+
+        Ending a game waits for the rematch answer, which would otherwise be counted as checking the board.
+
+        Args:
+            function: the function to wrap
+
+        Returns:
+            the wrapped function.
+        """
+        def wrapper(*args):
+            self.endCheck()
+            return function(*args)
+
+        return wrapper
+
+    def turn(self, name: str, function):
+        """A function to wrap a function that starts a turn, so each call decides whether the turn is recorded.
+
+        Args:
+            name: the name of the span
+            function: the function to wrap
+
+        Returns:
+            the wrapped function.
+        """
+        traced = self.traced(name, function)
+
+        def wrapper(*args):
+            self.sampling = self.rng.random() < self.sample_rate
+            return traced(*args)
+
+        return wrapper
+
+    def instrument(self, player, board) -> None:
+        """A function to record the phases of the turns of a player.
+
+        The spans are input for choosing a move, send and receive for messages, update for adding a move to the board,
+        render for drawing it, and check for checking the board, inside the playerMove and receiveMove spans of each
+        turn. Ending a game, with the wait for the rematch answer, is its own endGame span after the check span.
+
+        Args:
+            player: the Player1 or Player2 object to trace
+            board: the gameboard object the player plays on
+        """
+        player.playerMove = self.turn("playerMove", player.playerMove)
+        player.receiveMove = self.turn("receiveMove", player.receiveMove)
+        player.checkMove = self.traced("input", player.checkMove)
+        player.sendData = self.traced("send", player.sendData)
+        player.receiveData = self.traced("receive", player.receiveData)
+        player.checkBoard = self.checked(player.checkBoard)
+        player.endGame = self.endingCheck(self.traced("endGame", player.endGame))
+        board.updateGameBoard = self.traced("update", board.updateGameBoard)
+        board.renderer.drawMove = self.traced("render", board.renderer.drawMove)
+
+    def close(self) -> None:
+        """A function to write the recorded spans to the trace file, once."""
+        if self.closed is True:
+            return
+        self.closed = True
+
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [{"name": name, "cat": "game", "ph": "X", "ts": (start - self.start_ns) / 1000,
+                   "dur": (end - start) / 1000, "pid": pid, "tid": tid} for name, start, end in self.spans]
+
+        with open(self.path, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ns"}, trace_file)
@@ -0,0 +1,185 @@
+import selectors
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+
+class ClockTimeout(TimeoutError):
+    """An error raised when a player runs out of time, which loses them the game."""
+
+    def __init__(self, symbol: str) -> None:
+        """Initializes the error with the symbol of the player that ran out of time."""
+        super().__init__(f"{symbol} ran out of time")
+        self.symbol = symbol
+
+
+class GameClock:
+    """A class to keep the time limits of a game.
+
+    Each move has to be made within move_time seconds, and all the moves of a player in a game within game_time
+    seconds. A player waiting for the other player's move times it with their own clock and pushes its deadline back
+    by grace seconds, so a move sent just in time is not lost to the delay of the network. A limit of None means there
+    is no limit.
+    """
+
+    def __init__(self, move_time: float = None, game_time: float = None, rematch_time: float = None,
+                 grace: float = 2.0) -> None:
+        """Initializes the clock.
+
+        Args:
+            move_time: the seconds a player has for each move
+            game_time: the seconds a player has for all their moves in a game
+            rematch_time: the seconds player 2 waits for player 1 to answer whether they will play again
+            grace: the seconds added to the other player's deadline
+        """
+        self.move_time = move_time
+        self.game_time = game_time
+        self.rematch_time = rematch_time
+        self.grace = grace
+        self.remaining = {}
+        self.symbol = ""
+        self.turn_start = 0.0
+
+    def startGame(self) -> None:
+        """A function to give every player the whole game time again."""
+        self.remaining = {}
+
+    def startTurn(self, symbol: str, other_player: bool = False) -> float:
+        """A function to start the clock of a player's turn.
+
+        Args:
+            symbol: the symbol of the player to move
+            other_player: whether the player is the other player, whose deadline gets the grace time
+
+        Returns:
+            the time.monotonic() time the move has to be made by, or None if there is no limit.
+        """
+        self.symbol = symbol
+        self.turn_start = time.monotonic()
+        limits = [limit for limit in (self.move_time, self.remaining.get(symbol, self.game_time)) if limit is not None]
+        if not limits:
+            return None
+
+        return self.turn_start + max(0.0, min(limits)) + (self.grace if other_player else 0.0)
+
+    def endTurn(self) -> None:
+        """A function to take the time of the turn that just ended off the player's game time."""
+        if self.game_time is not None:
+            elapsed = time.monotonic() - self.turn_start
+            self.remaining[self.symbol] = self.remaining.get(self.symbol, self.game_time) - elapsed
+
+    def rematchDeadline(self) -> float:
+        """A function to get the time.monotonic() time an answer to play again has to arrive by, or None."""
+        return time.monotonic() + self.rematch_time if self.rematch_time is not None else None
+
+
+class TurnLoop:
+    """A class to wait for the other player's socket and the keyboard at the same time, until a deadline.
+
+    The socket is watched with a selector. Lines typed on the keyboard are read by a background thread, started the
+    first time a line is asked for, which wakes the selector through a socket pair, so waiting for a move also notices
+    at once when the other player disconnects or forfeits.
+    """
+
+    def __init__(self, connection: socket.socket) -> None:
+        """Initializes the selector for the socket of the other player and the socket pair of the keyboard thread.
+
+        Args:
+            connection: the socket connected to the other player
+        """
+        self.connection = connection
+        self.selector = selectors.DefaultSelector()
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.wakeup_reader.setblocking(False)
+        self.selector.register(connection, selectors.EVENT_READ)
+        self.selector.register(self.wakeup_reader, selectors.EVENT_READ)
+        self.lines = deque()
+        self.input_closed = False
+        self.input_thread = None
+
+    def readInput(self) -> None:
+        """A function run by the keyboard thread to queue each line typed until the input is closed."""
+        try:
+            for line in sys.stdin:
+                self.lines.append(line.rstrip("\r\n"))
+                self.wakeup_writer.send(b"\0")
+        finally:
+            self.input_closed = True
+            self.wakeup_writer.send(b"\0")
+
+    def wait(self, deadline: float, want_input: bool) -> set:
+        """A function to wait until the other player's socket can be read, or a line has been typed.
+
+        Args:
+            deadline: the time.monotonic() time to stop waiting at, or None to wait for as long as it takes
+            want_input: whether to stop for a typed line
+
+        Returns:
+            a set holding 'peer' if the socket can be read and 'input' if a line was typed or the input was closed,
+            which is empty when the deadline has passed.
+        """
+        while True:
+            ready = set()
+            if want_input and (self.lines or self.input_closed):
+                ready.add("input")
+            timeout = 0 if ready else None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            for key, _ in self.selector.select(timeout):
+                if key.fileobj is self.wakeup_reader:
+                    self.wakeup_reader.recv(4096)
+                else:
+                    ready.add("peer")
+            if want_input and (self.lines or self.input_closed):
+                ready.add("input")
+
+            if ready or (deadline is not None and time.monotonic() >= deadline):
+                return ready
+
+    def waitForPeer(self, deadline: float) -> bool:
+        """A function to wait until the other player's socket can be read.
+
+        Args:
+            deadline: the time.monotonic() time to stop waiting at, or None to wait for as long as it takes
+
+        Returns:
+            True if the socket can be read, or False if the deadline passed first.
+        """
+        return bool(self.wait(deadline, False))
+
+    def readLine(self, prompt: str, deadline: float, readPeer) -> str:
+        """A function to prompt the user and wait for a line to be typed, while watching the other player's socket.
+
+        Args:
+            prompt: the text printed before waiting
+            deadline: the time.monotonic() time to stop waiting at, or None to wait for as long as it takes
+            readPeer: a function called whenever the other player's socket can be read, which reads from it
+
+        Returns:
+            the line typed, or None if the deadline passed first.
+
+        Raises:
+            EOFError: an error that occurs when the input is closed, as with input().
+        """
+        if self.input_thread is None:
+            self.input_thread = threading.Thread(target=self.readInput, daemon=True)
+            self.input_thread.start()
+
+        print(prompt, end="", flush=True)
+        while True:
+            ready = self.wait(deadline, True)
+            if not ready:
+                return None
+            if "peer" in ready:
+                readPeer()
+            if "input" in ready:
+                if self.lines:
+                    return self.lines.popleft()
+                raise EOFError
+
+    def close(self) -> None:
+        """A function to stop watching the socket and close the socket pair."""
+        self.selector.close()
+        self.wakeup_reader.close()
+        self.wakeup_writer.close()